@@ -0,0 +1,287 @@
+"""
+Benchmark the film recommender on synthetic data.
+
+Generates users, films and interactions at a configurable size into a
+throw-away SQLite database, holds out part of every user's well-rated films,
+then for each recommender mode reports:
+
+- latency of `FilmService.get_recommendations` (p50 / p95 / mean, ms)
+- memory (tracemalloc peak per query pass, feature matrix size, process max RSS)
+- offline quality on the held-out ratings (hit-rate@k and NDCG@k)
+
+Modes differ only in the collaborative weight: `content` (0), `cf` (1) and
+`blend` (RECOMMEND.CF_WEIGHT). Results are printed as a table and can be
+written as JSON to track regressions over time.
+
+Usage:
+    python scripts/bench_recommend.py --users 2000 --films 5000 --output bench.json
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import date, datetime
+from typing import Dict, List, Set
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+import numpy as np
+from flask import Flask
+from sqlalchemy import insert
+from db import db
+from config import RECOMMEND_CF_WEIGHT
+from models.core_models import User, Film, Genre, Director
+from models.relations_models import FilmGenre, FilmDirector, FilmRating, FilmFavorite
+import services.film_feature_service as film_feature_module
+from services.film_feature_service import FilmFeatureService
+from services.item_cf_service import ItemCFService
+from services.film_service import FilmService
+
+MODES = {
+    "content": 0.0,
+    "cf": 1.0,
+    "blend": RECOMMEND_CF_WEIGHT,
+}
+LANGUAGES = ["en", "fr", "ja", "ko", "zh", "es", "de", "it"]
+# ratings at or above this count as relevant when held out
+RELEVANT_RATING = 7.0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Recommender latency and quality benchmark")
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--films", type=int, default=2000)
+    parser.add_argument("--genres", type=int, default=20)
+    parser.add_argument("--directors", type=int, default=400)
+    parser.add_argument("--ratings-per-user", type=int, default=30)
+    parser.add_argument("--favorites-per-user", type=int, default=5)
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction of relevant ratings held out per user")
+    parser.add_argument("--k", type=int, default=10, help="recommendation list length")
+    parser.add_argument("--queries", type=int, default=200, help="users queried per mode")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated subset of: " + ", ".join(MODES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write JSON results to this file ('-' for stdout)")
+    return parser.parse_args()
+
+
+def create_app(db_path: str) -> Flask:
+    """Create a Flask app bound to the benchmark database."""
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+
+def generate(args: argparse.Namespace, rng: random.Random) -> Dict[int, Set[int]]:
+    """Insert synthetic data and return the held-out relevant films per user.
+
+    Users prefer a few genres and directors; films matching them are rated
+    higher and more often, so both recommenders have a signal to find.
+    """
+    now = datetime.now()
+    db.session.execute(insert(Genre), [{"id": g, "name": f"genre-{g}"} for g in range(1, args.genres + 1)])
+    db.session.execute(insert(Director), [{"id": d, "name": f"director-{d}"} for d in range(1, args.directors + 1)])
+
+    film_genres: Dict[int, List[int]] = {}
+    film_director: Dict[int, int] = {}
+    films, genre_rows, director_rows = [], [], []
+    for f in range(1, args.films + 1):
+        genres = rng.sample(range(1, args.genres + 1), rng.randint(1, 3))
+        director = rng.randint(1, args.directors)
+        film_genres[f] = genres
+        film_director[f] = director
+        films.append({
+            "id": f, "title": f"film-{f}", "language": rng.choice(LANGUAGES),
+            "release_date": date(rng.randint(1970, 2024), rng.randint(1, 12), 1),
+            "rating": round(rng.uniform(3, 9), 1), "vote_count": rng.randint(0, 50000),
+        })
+        genre_rows.extend({"film_id": f, "genre_id": g} for g in genres)
+        director_rows.append({"film_id": f, "director_id": director})
+    db.session.execute(insert(Film), films)
+    db.session.execute(insert(FilmGenre), genre_rows)
+    db.session.execute(insert(FilmDirector), director_rows)
+
+    users, ratings, favorites = [], [], []
+    held_out: Dict[int, Set[int]] = {}
+    film_ids = list(range(1, args.films + 1))
+    for u in range(1, args.users + 1):
+        users.append({"id": u, "username": f"user-{u}", "email": f"user-{u}@bench.local",
+                      "password": "x", "created_at": now, "updated_at": now})
+        liked_genres = set(rng.sample(range(1, args.genres + 1), 2))
+        liked_directors = set(rng.sample(range(1, args.directors + 1), max(1, args.directors // 50)))
+
+        # mostly pick films that match the user's taste, plus some noise
+        matching = [f for f in rng.sample(film_ids, min(len(film_ids), args.ratings_per_user * 20))
+                    if liked_genres & set(film_genres[f]) or film_director[f] in liked_directors]
+        picked = set(matching[:int(args.ratings_per_user * 0.7)])
+        while len(picked) < min(args.ratings_per_user, len(film_ids)):
+            picked.add(rng.choice(film_ids))
+
+        user_ratings = []
+        for f in picked:
+            score = 4.0 + 2.5 * len(liked_genres & set(film_genres[f])) + (2.0 if film_director[f] in liked_directors else 0.0)
+            user_ratings.append((f, float(min(10, max(0, round(score + rng.gauss(0, 1.5)))))))
+
+        relevant = [f for f, r in user_ratings if r >= RELEVANT_RATING]
+        rng.shuffle(relevant)
+        hidden = set(relevant[:int(math.ceil(len(relevant) * args.holdout))]) if relevant else set()
+        if hidden:
+            held_out[u] = hidden
+
+        train = [(f, r) for f, r in user_ratings if f not in hidden]
+        ratings.extend({"user_id": u, "film_id": f, "rating": r} for f, r in train)
+        best = sorted(train, key=lambda x: -x[1])[:args.favorites_per_user]
+        favorites.extend({"user_id": u, "film_id": f} for f, r in best)
+
+    db.session.execute(insert(User), users)
+    db.session.execute(insert(FilmRating), ratings)
+    db.session.execute(insert(FilmFavorite), favorites)
+    db.session.commit()
+    return held_out
+
+
+def percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def ndcg_at_k(recommended: List[int], relevant: Set[int], k: int) -> float:
+    dcg = sum(1.0 / math.log2(i + 2) for i, f in enumerate(recommended[:k]) if f in relevant)
+    ideal = sum(1.0 / math.log2(i + 2) for i in range(min(len(relevant), k)))
+    return dcg / ideal if ideal else 0.0
+
+
+def run_mode(user_ids: List[int], held_out: Dict[int, Set[int]], k: int, cf_weight: float) -> Dict:
+    """Query every user once for latency/quality, then once more under tracemalloc."""
+    latencies, hits, ndcgs = [], [], []
+    for user_id in user_ids:
+        start = time.perf_counter()
+        films = FilmService.get_recommendations(user_id, limit=k, cf_weight=cf_weight)
+        latencies.append((time.perf_counter() - start) * 1000)
+        recommended = [f["id"] for f in films]
+        relevant = held_out[user_id]
+        hits.append(1.0 if relevant & set(recommended) else 0.0)
+        ndcgs.append(ndcg_at_k(recommended, relevant, k))
+        db.session.expunge_all()
+
+    tracemalloc.start()
+    peak_per_query = []
+    for user_id in user_ids[:50]:
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        FilmService.get_recommendations(user_id, limit=k, cf_weight=cf_weight)
+        peak_per_query.append(tracemalloc.get_traced_memory()[1] - base)
+        db.session.expunge_all()
+    tracemalloc.stop()
+
+    return {
+        "cf_weight": cf_weight,
+        "queries": len(user_ids),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "mean": round(float(np.mean(latencies)) if latencies else 0.0, 3),
+        },
+        "memory_kb": {
+            "peak_per_query_p50": round(percentile(peak_per_query, 50) / 1024, 1),
+            "peak_per_query_max": round(max(peak_per_query, default=0) / 1024, 1),
+        },
+        "quality": {
+            f"hit_rate@{k}": round(float(np.mean(hits)) if hits else 0.0, 4),
+            f"ndcg@{k}": round(float(np.mean(ndcgs)) if ndcgs else 0.0, 4),
+        },
+    }
+
+
+def max_rss_kb() -> int:
+    try:
+        import resource
+    except ImportError:  # not available on Windows
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def main() -> None:
+    args = parse_args()
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        raise SystemExit(f"Unknown mode(s): {', '.join(unknown)}")
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="filmhub-bench-") as tmp_dir:
+        app = create_app(os.path.join(tmp_dir, "bench.db"))
+        # keep the shared feature file of a real deployment untouched
+        film_feature_module.RECOMMEND_MATRIX_PATH = os.path.join(tmp_dir, "film_features.bin")
+
+        with app.app_context():
+            db.create_all()
+            start = time.perf_counter()
+            held_out = generate(args, rng)
+            generate_s = time.perf_counter() - start
+
+            start = time.perf_counter()
+            FilmFeatureService.build()
+            feature_build_s = time.perf_counter() - start
+            start = time.perf_counter()
+            ItemCFService.build()
+            cf_build_s = time.perf_counter() - start
+
+            film_ids, id_to_index, matrix, norms = FilmFeatureService.get_feature_index()
+            candidates = sorted(held_out)
+            rng.shuffle(candidates)
+            user_ids = candidates[:args.queries]
+
+            results = {
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "environment": {
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "platform": platform.platform(),
+                },
+                "params": {k: v for k, v in vars(args).items() if k not in ("output", "modes")},
+                "build": {
+                    "generate_s": round(generate_s, 3),
+                    "feature_matrix_s": round(feature_build_s, 3),
+                    "item_cf_s": round(cf_build_s, 3),
+                    "feature_matrix_shape": list(matrix.shape),
+                    "feature_matrix_mb": round((matrix.nbytes + norms.nbytes) / 2 ** 20, 3),
+                },
+                "modes": {},
+            }
+            for mode in modes:
+                results["modes"][mode] = run_mode(user_ids, held_out, args.k, MODES[mode])
+            results["max_rss_mb"] = round(max_rss_kb() / 1024, 1)
+
+            # drop the in-process caches built on the temporary database
+            FilmFeatureService._built = False
+            ItemCFService._built = False
+
+    print(f"users={args.users} films={args.films} queries={len(user_ids)} k={args.k} "
+          f"matrix={results['build']['feature_matrix_shape']} ({results['build']['feature_matrix_mb']} MB)")
+    print(f"{'mode':<8} {'p50 ms':>8} {'p95 ms':>8} {'peak KB':>9} {'hit@k':>7} {'ndcg@k':>7}")
+    for mode, r in results["modes"].items():
+        quality = list(r["quality"].values())
+        print(f"{mode:<8} {r['latency_ms']['p50']:>8} {r['latency_ms']['p95']:>8} "
+              f"{r['memory_kb']['peak_per_query_p50']:>9} {quality[0]:>7} {quality[1]:>7}")
+
+    if args.output == "-":
+        print(json.dumps(results, indent=2))
+    elif args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,11 @@ from blueprints.film_bp import film_bp
 from blueprints.post_bp import post_bp
 from blueprints.admin_bp import admin_bp
 from common.handler import register_exception_handlers
+from services.like_counter_service import LikeCounterService
+from services.log_service import LogService
+from services.live_stats_service import LiveStatsService
+from services.item_cf_service import ItemCFService
+from services.stat_counter_service import StatCounterService
 import os 
 
 def create_app():
@@ -36,6 +41,11 @@ def create_app():
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
     db.init_app(app)
+    LikeCounterService.init_app(app)
+    LogService.init_app(app)
+    LiveStatsService.init_app(app)
+    ItemCFService.init_app(app)
+    StatCounterService.init_app(app)
 
     # Static files directory paths
     current_dir = os.path.dirname(os.path.abspath(__file__))  # api/src
@@ -1,18 +1,39 @@
-from flask import Blueprint, jsonify, request
+import itertools
+import json
+import queue
+from flask import Blueprint, Response, jsonify, request, stream_with_context
 from common.result import Result
 from services.admin_service import AdminService
 from services.log_service import LogService
+from services.log_archive_service import LogArchiveService
+from services.export_service import ExportService
+from services.analytics_service import AnalyticsService
+from services.live_stats_service import LiveStatsService
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from functools import wraps
+from datetime import datetime, timedelta
+from common.exception import ValidationException
+from common.message import Message
+from common.uilts import CursorUtils
+from common.log_actions import LogActionUtils
+from config import LIVE_HEARTBEAT_SECONDS
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/api')
 
-def admin_required(f):
+def admin_required(f=None, locations=None):
     """
     Decorator to check if the current user is an admin.
+
+    Args:
+        locations: where the JWT may be sent, headers by default. Streams
+            opened with EventSource, which cannot set headers, also accept
+            it as the `jwt` query parameter.
     """
+    if f is None:
+        return lambda f: admin_required(f, locations)
+
     @wraps(f)
-    @jwt_required()
+    @jwt_required(locations=locations)
     def decorated_function(*args, **kwargs):
         user_id = get_jwt_identity()
         # Check if user exists and is admin
@@ -23,6 +44,29 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def _parse_datetime_arg(name):
+    """Parse an optional ISO datetime query parameter, in naive local time like the stored values."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValidationException(Message.DATETIME_INVALID)
+    if parsed.tzinfo is not None:
+        raise ValidationException(Message.DATETIME_INVALID)
+    return parsed
+
+def _parse_action_type_arg(name):
+    """Parse an optional log action type query parameter."""
+    value = request.args.get(name)
+    if not value:
+        return None
+    action_type = LogActionUtils.parse_type(value)
+    if action_type is None:
+        raise ValidationException(Message.LOG_ACTION_TYPE_INVALID)
+    return action_type
+
 # stats
 @admin_bp.route('/admin/stats', methods=['GET'])
 @admin_required
@@ -97,6 +141,7 @@ def get_top_active_users():
 
     Query Parameters:
         limit: int - Number of users to return (default: 10, max: 50)
+        days: int - Rank over the last 7 or 30 days instead of all time (optional)
 
     Returns:
         { "top_users": [{user_id, username, log_count}, ...] }
@@ -105,9 +150,83 @@ def get_top_active_users():
     if limit < 1 or limit > 50:
         limit = 10
 
-    top_users = AdminService.get_top_active_users(limit)
+    top_users = AdminService.get_top_active_users(limit, request.args.get('days', type=int))
     return jsonify(Result.success(data={'top_users': top_users})), 200
 
+@admin_bp.route('/admin/analytics/timeseries', methods=['GET'])
+@admin_required
+def get_timeseries():
+    """
+    Get time series of activity metrics, computed from daily rollups.
+
+    Query Parameters:
+        metrics: str - Comma-separated: dau, logs, signups, posts, comments, ratings
+                 or any log action type such as post_like (default: dau,signups,posts,comments,ratings)
+        since: str - ISO date, first day included (default: 30 days before until)
+        until: str - ISO date, first day excluded (default: tomorrow)
+        granularity: str - day, week or month (default: day)
+        window: int - Buckets in the trailing moving average (optional, max: 365)
+
+    Returns:
+        {
+            "granularity": str,
+            "buckets": [str],
+            "series": { metric: { "values": [...], "moving_average": [...], "delta": [...], "delta_pct": [...] } },
+            "lag": int
+        }
+    """
+    until = _parse_datetime_arg('until')
+    until = until.date() if until else datetime.now().date() + timedelta(days=1)
+    since = _parse_datetime_arg('since')
+    since = since.date() if since else until - timedelta(days=30)
+
+    metrics = [m.strip() for m in request.args.get('metrics', '').split(',') if m.strip()]
+    window = request.args.get('window', 0, type=int)
+    if window < 0 or window > 365:
+        window = 0
+
+    result = AnalyticsService.get_timeseries(
+        list(dict.fromkeys(metrics)) or list(AnalyticsService.DEFAULT_METRICS),
+        since, until,
+        granularity=request.args.get('granularity', 'day'),
+        window=window)
+    return jsonify(Result.success(data=result)), 200
+
+@admin_bp.route('/admin/stats/live', methods=['GET'])
+@admin_required(locations=['headers', 'query_string'])
+def stream_live_stats():
+    """
+    Stream dashboard metrics as server-sent events. The token may be passed
+    as ?jwt=<token>, since EventSource cannot set headers.
+
+    Events:
+        snapshot: { "stats": {total_users, total_posts, total_comments, total_films},
+                    "access": {today, this_hour, week, month, year, active_users_today} }
+            sent first, and again in place of a backlog the client fell behind on
+        delta: { group: { name: { "value": int, "delta": int } } } with the changed values only
+    A comment line is sent as heartbeat when nothing changed for HEARTBEAT_SECONDS.
+    """
+    subscriber = LiveStatsService.subscribe()
+
+    def generate():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    event, data = subscriber.get(timeout=LIVE_HEARTBEAT_SECONDS)
+                except queue.Empty:
+                    # keeps proxies from closing the connection and detects gone clients
+                    yield ': heartbeat\n\n'
+                    continue
+                yield f'event: {event}\ndata: {json.dumps(data)}\n\n'
+        finally:
+            LiveStatsService.unsubscribe(subscriber)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
 # film
 @admin_bp.route('/admin/films', methods=['POST'])
 @admin_required
@@ -392,7 +511,11 @@ def get_user_logs(user_id):
                 {
                     "id": int,
                     "user_id": int,
-                    "action": str,
+                    "action": str - readable message, rendered from the fields below,
+                    "action_type": str,
+                    "target_type": str,
+                    "target_id": int | null,
+                    "payload": dict,
                     "created_at": str
                 }
             ],
@@ -417,11 +540,16 @@ def get_user_logs(user_id):
 @admin_required
 def get_recent_logs():
     """
-    Get recent logs from all users with pagination.
+    Get recent logs from all users, newest first, with cursor pagination.
 
     Query Parameters:
-        page: int - Page number (default: 1)
+        cursor: str - next_cursor of the previous page
         per_page: int - Number of logs per page (default: 50, max: 100)
+        user_id: int - Only logs of this user (optional)
+        action_type: str - Only actions of this type, by name (e.g. post_like) or code (optional)
+        since: str - ISO datetime, only logs at or after it (optional)
+        until: str - ISO datetime, only logs before it (optional)
+        page: int - Legacy page number, used when no cursor is given
 
     Returns:
         {
@@ -431,24 +559,31 @@ def get_recent_logs():
                     "user_id": int,
                     "username": str,
                     "action": str,
+                    "action_type": str,
+                    "target_type": str,
+                    "target_id": int | null,
+                    "payload": dict,
                     "created_at": str
                 }
             ],
+            "has_more": bool,
+            "next_cursor": str | null,
             "total": int,
-            "pages": int,
-            "current_page": int
+            "total_exact": bool
         }
     """
-    page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 50, type=int)
-
-    # Validate parameters
-    if page < 1:
-        page = 1
     if per_page < 1 or per_page > 100:
         per_page = 50
 
-    result = LogService.get_recent_logs(page, per_page)
+    result = LogService.get_recent_logs(
+        cursor=request.args.get('cursor'),
+        per_page=per_page,
+        user_id=request.args.get('user_id', type=int),
+        action_type=_parse_action_type_arg('action_type'),
+        since=_parse_datetime_arg('since'),
+        until=_parse_datetime_arg('until'),
+        page=request.args.get('page', type=int))
 
     # Convert log tuples to dictionaries
     logs_data = []
@@ -459,9 +594,55 @@ def get_recent_logs():
 
     return jsonify(Result.success(data={
         'logs': logs_data,
+        'has_more': result['has_more'],
+        'next_cursor': result['next_cursor'],
         'total': result['total'],
-        'pages': result['pages'],
-        'current_page': result['current_page']
+        'total_exact': result['total_exact']
+    })), 200
+
+@admin_bp.route('/admin/logs/archive', methods=['GET'])
+@admin_required
+def get_archived_logs():
+    """
+    Read logs moved out of the logs table by retention, newest first.
+
+    Query Parameters:
+        user_id: int - Only logs of this user (optional)
+        since: str - ISO datetime, only logs at or after it (optional)
+        until: str - ISO datetime, only logs before it (optional)
+        cursor: str - next_cursor of the previous page
+        limit: int - Number of logs per page (default: 100, max: 1000)
+        format: "ndjson" to stream every matching log, one JSON object per line
+
+    Returns:
+        {
+            "logs": [ { "id": int, "user_id": int, "action": str, "action_type": str, ..., "created_at": str } ],
+            "has_more": bool,
+            "next_cursor": str | null
+        }
+    """
+    cursor = request.args.get('cursor')
+    logs = LogArchiveService.iter_logs(
+        since=_parse_datetime_arg('since'),
+        until=_parse_datetime_arg('until'),
+        user_id=request.args.get('user_id', type=int),
+        before=CursorUtils.decode(cursor) if cursor else None)
+
+    if request.args.get('format') == 'ndjson':
+        lines = (json.dumps(log, ensure_ascii=False) + '\n' for log in logs)
+        return Response(lines, mimetype='application/x-ndjson')
+
+    limit = request.args.get('limit', 100, type=int)
+    if limit < 1 or limit > 1000:
+        limit = 100
+    page = list(itertools.islice(logs, limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+    next_cursor = CursorUtils.encode(datetime.fromisoformat(page[-1]['created_at']), page[-1]['id']) if has_more else None
+    return jsonify(Result.success(data={
+        'logs': page,
+        'has_more': has_more,
+        'next_cursor': next_cursor
     })), 200
 
 @admin_bp.route('/admin/logs/stats', methods=['GET'])
@@ -473,11 +654,53 @@ def get_logs_stats():
     Returns:
         {
             "today": int,
+            "this_hour": int,
             "week": int,
             "month": int,
-            "year": int
+            "year": int,
+            "hourly": [{"hour": str, "count": int}] - last 24 hours, oldest first
         }
     """
     stats = LogService.get_access_stats()
     return jsonify(Result.success(data=stats)), 200
 
+# export
+@admin_bp.route('/admin/export/<string:entity>', methods=['GET'])
+@admin_required
+def export_data(entity):
+    """
+    Download a whole table as a file, streamed row by row.
+
+    Args:
+        entity: str - one of logs, users, posts, ratings
+
+    Query Parameters:
+        format: str - "csv" (default) or "ndjson"
+        since: str - ISO datetime, only rows created at or after it (optional, not for ratings)
+        until: str - ISO datetime, only rows created before it (optional, not for ratings)
+        user_id: int - Only rows of this user (optional)
+        gzip: "1" to compress the file on the fly (optional)
+
+    Returns:
+        The file as an attachment (text/csv, application/x-ndjson or application/gzip)
+    """
+    fmt = request.args.get('format', 'csv')
+    if fmt not in ExportService.FORMATS:
+        raise ValidationException(Message.EXPORT_FORMAT_INVALID)
+
+    columns, rows = ExportService.open(
+        entity,
+        since=_parse_datetime_arg('since'),
+        until=_parse_datetime_arg('until'),
+        user_id=request.args.get('user_id', type=int))
+    chunks = ExportService.to_csv(columns, rows) if fmt == 'csv' else ExportService.to_ndjson(columns, rows)
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    filename = f"{entity}-{datetime.now():%Y%m%d-%H%M%S}.{fmt}"
+
+    if request.args.get('gzip') in ('1', 'true'):
+        chunks = ExportService.gzip(chunks)
+        mimetype = 'application/gzip'
+        filename += '.gz'
+
+    return Response(stream_with_context(chunks), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename="{filename}"'})
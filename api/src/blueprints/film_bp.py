@@ -17,6 +17,22 @@ def get_film_by_id(film_id):
     film = FilmService.get_film_by_id(film_id, user_id=get_jwt_identity())
     return jsonify(Result.success(data=film)), 200
 
+@film_bp.route('/films/<int:film_id>/similar', methods=['GET'])
+@jwt_required()
+def get_similar_films(film_id):
+    """
+    Get films similar to a film ("more like this").
+
+    Args:
+        film_id: int
+        (no body) - optional 'limit' query param (default: 10)
+    """
+    limit = request.args.get('limit', 10, type=int)
+    if limit < 1 or limit > 50:
+        limit = 10
+    data = FilmService.get_similar_films(film_id, limit, user_id=get_jwt_identity())
+    return jsonify(Result.success(data=data)), 200
+
 @film_bp.route('/films', methods=['POST'])
 @jwt_required()
 def get_film_by_keyword():
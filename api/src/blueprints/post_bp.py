@@ -1,11 +1,23 @@
-from flask import Blueprint, request, jsonify
+import json
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_request
 from common.result import Result
+from common.exception import ValidationException
+from common.message import Message
 from services.post_service import PostService
+from config import TRENDING_TOP_K
 
 post_bp = Blueprint('post', __name__, url_prefix='/api')
 
 
+def _int_field(dto: dict, name: str, default: int):
+    """Read an optional integer from a JSON body, `default` when missing or empty."""
+    try:
+        return int(dto.get(name) or default)
+    except (TypeError, ValueError):
+        raise ValidationException(Message.PAGINATION_INVALID)
+
+
 @post_bp.route('/posts', methods=['POST'])
 @jwt_required()
 def create_post():
@@ -52,6 +64,38 @@ def update_post():
     return jsonify(Result.success()), 200
 
 
+@post_bp.route('/posts/trending', methods=['GET'])
+@jwt_required()
+def get_trending_posts():
+    """
+    Get trending posts, ranked by time-decayed likes, comments and recency.
+
+    Query params:
+        limit: int - Number of posts (default: 20, max: TRENDING.TOP_K)
+    Returns:
+        { "posts": [ {..., "trending_score": float}, ... ] }
+    """
+    limit = min(max(request.args.get('limit', 20, type=int), 1), TRENDING_TOP_K)
+    posts = PostService.get_trending_posts(get_jwt_identity(), limit)
+    return jsonify(Result.success(data={'posts': posts})), 200
+
+
+@post_bp.route('/tags/trending', methods=['GET'])
+@jwt_required()
+def get_trending_tags():
+    """
+    Get trending tags, ranked by the time-decayed activity of their posts.
+
+    Query params:
+        limit: int - Number of tags (default: 20, max: TRENDING.TOP_K)
+    Returns:
+        { "tags": [ { "tag_id": int, "name": str, "score": float }, ... ] }
+    """
+    limit = min(max(request.args.get('limit', 20, type=int), 1), TRENDING_TOP_K)
+    tags = PostService.get_trending_tags(limit)
+    return jsonify(Result.success(data={'tags': tags})), 200
+
+
 @post_bp.route('/posts/<int:post_id>', methods=['GET'])
 def get_post_by_id(post_id):
     """
@@ -68,29 +112,44 @@ def get_post_by_id(post_id):
 @jwt_required()
 def get_film_posts(film_id):
     """
-    Get posts related to a film.
+    Get posts about a film, newest first, with cursor pagination.
+
+    Body:
+        { "cursor": "<next_cursor of the previous page>", "per_page": 10 }
+        (legacy: { "page": 1, "per_page": 10 } when no cursor is given)
+    Returns:
+        { "posts": [...], "has_more": bool, "next_cursor": str | null }
     """
+    dto = request.get_json(silent=True) or {}
+    cursor = dto.get('cursor')
+    page = max(_int_field(dto, 'page', 1), 1)
+    per_page = min(max(_int_field(dto, 'per_page', 10), 1), 50)
+
     user_id = get_jwt_identity()
-    posts = PostService.get_film_posts(user_id, film_id)
-    return jsonify(Result.success(data={'posts': posts})), 200
+    posts, has_more, next_cursor = PostService.get_film_posts(user_id, film_id, page, per_page, cursor)
+    return jsonify(Result.success(data={'posts': posts, 'has_more': has_more, 'next_cursor': next_cursor})), 200
 
 
 @post_bp.route('/tags/<int:tag_id>/posts', methods=['POST'])
 @jwt_required()
 def get_tag_posts(tag_id):
     """
-    Get posts by tag with pagination.
+    Get posts by tag, newest first, with cursor pagination.
 
     Body:
-        { "page": 0, "page_size": 10 }
+        { "cursor": "<next_cursor of the previous page>", "page_size": 10 }
+        (legacy: { "page": 0, "page_size": 10 } when no cursor is given)
+    Returns:
+        { "posts": [...], "has_more": bool, "next_cursor": str | null }
     """
-    dto = request.get_json() or {}
-    page = dto.get('page', 0)
-    page_size = dto.get('page_size', 10)
+    dto = request.get_json(silent=True) or {}
+    cursor = dto.get('cursor')
+    page = max(_int_field(dto, 'page', 0), 0)
+    page_size = min(max(_int_field(dto, 'page_size', 10), 1), 50)
 
     user_id = get_jwt_identity()
-    posts, has_more = PostService.get_tag_posts(user_id, tag_id, page, page_size)
-    return jsonify(Result.success(data={'posts': posts, 'has_more': has_more})), 200
+    posts, has_more, next_cursor = PostService.get_tag_posts(user_id, tag_id, page, page_size, cursor)
+    return jsonify(Result.success(data={'posts': posts, 'has_more': has_more, 'next_cursor': next_cursor})), 200
 
 
 @post_bp.route('/posts/<int:post_id>/like', methods=['POST'])
@@ -164,8 +223,23 @@ def get_comment(comment_id):
 @jwt_required()
 def get_post_comments(post_id):
     """
-    Get comments of a post.
+    Get comments of a post, oldest first, with cursor pagination.
+
+    Query params:
+        cursor: str - next_cursor of the previous page
+        limit: int - Number of comments per page (default: 20, max: 100)
+        format: "ndjson" to stream every comment from the cursor on, one JSON
+                object per line (also chosen by Accept: application/x-ndjson)
+    Returns:
+        { "comments": [...], "has_more": bool, "next_cursor": str | null }
     """
     user_id = get_jwt_identity()
-    comments = PostService.get_post_comments(user_id, post_id)
-    return jsonify(Result.success(data=comments)), 200
\ No newline at end of file
+    cursor = request.args.get('cursor')
+    if request.args.get('format') == 'ndjson' or request.accept_mimetypes.best == 'application/x-ndjson':
+        comments = PostService.iter_post_comments(user_id, post_id, cursor)
+        lines = (json.dumps(comment, ensure_ascii=False) + '\n' for comment in comments)
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+    comments, has_more, next_cursor = PostService.get_post_comments(user_id, post_id, cursor, limit)
+    return jsonify(Result.success(data={'comments': comments, 'has_more': has_more, 'next_cursor': next_cursor})), 200
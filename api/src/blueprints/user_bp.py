@@ -224,6 +224,23 @@ def get_user_posts():
     posts = PostService.get_user_posts(get_jwt_identity(), offset, limit)
     return jsonify(Result.success(data={'posts': posts})), 200
 
+@user_bp.route('/users/me/feed', methods=['GET'])
+@jwt_required()
+def get_user_feed():
+    """
+    Get the newest posts across the tags the authenticated user follows.
+
+    Query params:
+        cursor: str - next_cursor of the previous page (optional)
+        limit: int - Number of posts to fetch (default: 20, max: 50)
+    """
+    cursor = request.args.get('cursor') or None
+    limit = min(max(request.args.get('limit', 20, type=int), 1), 50)
+
+    from services.post_service import PostService
+    posts, has_more, next_cursor = PostService.get_feed(get_jwt_identity(), cursor, limit)
+    return jsonify(Result.success(data={'posts': posts, 'has_more': has_more, 'next_cursor': next_cursor})), 200
+
 @user_bp.route('/users/me/comments', methods=['GET'])
 @jwt_required()
 def get_user_comments():
@@ -0,0 +1,197 @@
+import json
+import re
+from enum import IntEnum
+
+
+class LogTarget(IntEnum):
+    """Type of the entity a logged action refers to."""
+    NONE = 0
+    USER = 1
+    POST = 2
+    COMMENT = 3
+    FILM = 4
+    TAG = 5
+
+
+class LogAction(IntEnum):
+    """Action codes stored in logs.action_type. Codes are persisted, never reuse one."""
+    OTHER = 0  # free text in logs.action, written before structured logging
+
+    REGISTER = 1
+    SIGN_IN = 2
+
+    USER_UPDATE = 10
+    PASSWORD_CHANGE = 11
+    ACCOUNT_DELETE = 12
+    TAG_ADD = 13
+    TAG_REMOVE = 14
+    FAVORITE_ADD = 15
+    FAVORITE_REMOVE = 16
+    RATING_ADD = 17
+    RATING_UPDATE = 18
+
+    POST_CREATE = 20
+    POST_UPDATE = 21
+    POST_DELETE = 22
+    POST_LIKE = 23
+    POST_UNLIKE = 24
+    COMMENT_CREATE = 25
+    COMMENT_UPDATE = 26
+    COMMENT_DELETE = 27
+
+    ADMIN_FILM_ADD = 40
+    ADMIN_FILM_DELETE = 41
+    ADMIN_USER_DELETE = 42
+    ADMIN_POST_DELETE = 43
+    ADMIN_COMMENT_DELETE = 44
+
+
+# action -> (target type, message template); templates use {target_id} and payload keys
+ACTION_SPECS = {
+    LogAction.REGISTER: (LogTarget.NONE, "Registered successfully"),
+    LogAction.SIGN_IN: (LogTarget.NONE, "Signed in successfully"),
+    LogAction.USER_UPDATE: (LogTarget.NONE, "Updated user info successfully"),
+    LogAction.PASSWORD_CHANGE: (LogTarget.NONE, "Changed password successfully"),
+    LogAction.ACCOUNT_DELETE: (LogTarget.NONE, "Deleted account successfully"),
+    LogAction.TAG_ADD: (LogTarget.TAG, "Added tag {target_id} successfully"),
+    LogAction.TAG_REMOVE: (LogTarget.TAG, "Removed tag {target_id} successfully"),
+    LogAction.FAVORITE_ADD: (LogTarget.FILM, "Added favorite film {target_id}"),
+    LogAction.FAVORITE_REMOVE: (LogTarget.FILM, "Removed favorite film {target_id}"),
+    LogAction.RATING_ADD: (LogTarget.FILM, "Added rating {rating} for film {target_id}"),
+    LogAction.RATING_UPDATE: (LogTarget.FILM, "Updated rating for film {target_id} to {rating}"),
+    LogAction.POST_CREATE: (LogTarget.POST, "Created post {target_id}"),
+    LogAction.POST_UPDATE: (LogTarget.POST, "Updated post {target_id}"),
+    LogAction.POST_DELETE: (LogTarget.POST, "Deleted post {target_id}"),
+    LogAction.POST_LIKE: (LogTarget.POST, "Like post {target_id}"),
+    LogAction.POST_UNLIKE: (LogTarget.POST, "Unlike post {target_id}"),
+    LogAction.COMMENT_CREATE: (LogTarget.POST, "Create comment on post {target_id}"),
+    LogAction.COMMENT_UPDATE: (LogTarget.COMMENT, "Updated comment {target_id}"),
+    LogAction.COMMENT_DELETE: (LogTarget.COMMENT, "Delete comment {target_id}"),
+    LogAction.ADMIN_FILM_ADD: (LogTarget.FILM, "Admin added film {target_id}: {title}"),
+    LogAction.ADMIN_FILM_DELETE: (LogTarget.FILM, "Admin deleted film {target_id}: {title}"),
+    LogAction.ADMIN_USER_DELETE: (LogTarget.USER, "Admin deleted user {target_id}: {username}"),
+    LogAction.ADMIN_POST_DELETE: (LogTarget.POST, "Admin deleted post {target_id} by user {author_id}"),
+    LogAction.ADMIN_COMMENT_DELETE: (LogTarget.COMMENT, "Admin deleted comment {target_id} by user {author_id}"),
+}
+
+# payload strings longer than this are cut, so a row stays small
+PAYLOAD_VALUE_MAX = 64
+
+
+class _Fields(dict):
+    """Template fields; missing payload keys render as '?'."""
+
+    def __missing__(self, key):
+        return '?'
+
+
+class LogActionUtils:
+    """Encoding, rendering and legacy parsing of structured log actions."""
+
+    _legacy_patterns = None
+
+    @staticmethod
+    def parse_type(value):
+        """
+        Parse an action type given by name (case-insensitive) or code.
+
+        Returns:
+            LogAction or None
+        """
+        if value is None or value == '':
+            return None
+        try:
+            return LogAction(int(value))
+        except ValueError:
+            return LogAction.__members__.get(str(value).upper())
+
+    @staticmethod
+    def encode_payload(payload: dict):
+        """Serialize a payload to compact JSON, or None when empty."""
+        if not payload:
+            return None
+        payload = {key: value[:PAYLOAD_VALUE_MAX] if isinstance(value, str) else value
+                   for key, value in payload.items()}
+        return json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+
+    @staticmethod
+    def decode_payload(payload):
+        if not payload:
+            return {}
+        if isinstance(payload, dict):
+            return payload
+        try:
+            return json.loads(payload)
+        except ValueError:
+            return {}
+
+    @classmethod
+    def render(cls, action_type, target_id=None, payload=None, action: str = None):
+        """
+        Render the readable message of a log entry.
+
+        Args:
+            action_type: int code, 0 for free-text entries
+            target_id: int
+            payload: JSON str or dict
+            action: the free-text action of entries written before structured logging
+        Returns:
+            str
+        """
+        spec = ACTION_SPECS.get(action_type or 0)
+        if spec is None:
+            return action or ''
+        fields = _Fields(cls.decode_payload(payload))
+        fields['target_id'] = target_id
+        return spec[1].format_map(fields)
+
+    @classmethod
+    def describe(cls, action_type, target_type, target_id, payload, action: str = None):
+        """
+        Readable fields of a log entry, as returned by the admin endpoints.
+
+        Returns:
+            dict: { action, action_type, target_type, target_id, payload }
+        """
+        return {
+            'action': cls.render(action_type, target_id, payload, action),
+            'action_type': LogAction(action_type or 0).name.lower(),
+            'target_type': LogTarget(target_type or 0).name.lower(),
+            'target_id': target_id,
+            'payload': cls.decode_payload(payload),
+        }
+
+    @staticmethod
+    def _pattern(template: str):
+        pattern = re.escape(template)
+        pattern = pattern.replace(re.escape('{target_id}'), r'(?P<target_id>\d+)')
+        return re.compile('^' + re.sub(r'\\\{(\w+)\\\}', r'(?P<\1>.+?)', pattern) + '$')
+
+    @classmethod
+    def parse_legacy(cls, action: str):
+        """
+        Map a free-text action written before structured logging to its structured form.
+
+        Returns:
+            tuple: (LogAction, LogTarget, target_id or None, payload dict) or None if unknown
+        """
+        if cls._legacy_patterns is None:
+            cls._legacy_patterns = [(action_type, target_type, cls._pattern(template))
+                                    for action_type, (target_type, template) in ACTION_SPECS.items()]
+        for action_type, target_type, pattern in cls._legacy_patterns:
+            match = pattern.match(action or '')
+            if match:
+                fields = match.groupdict()
+                target_id = fields.pop('target_id', None)
+                payload = {key: cls._number(value) for key, value in fields.items()}
+                return action_type, target_type, int(target_id) if target_id else None, payload
+        return None
+
+    @staticmethod
+    def _number(value: str):
+        for cast in (int, float):
+            try:
+                return cast(value)
+            except ValueError:
+                continue
+        return value
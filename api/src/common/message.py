@@ -33,6 +33,17 @@ class Message:
 
     # generic / validation
     KEYWORD_REQUIRED = "Keyword is required"
+    CURSOR_INVALID = "Invalid cursor"
+    PAGINATION_INVALID = "Page and page size must be integers"
+    DATETIME_INVALID = "Invalid datetime, expected ISO 8601 without a timezone"
+    LOG_ACTION_TYPE_INVALID = "Unknown log action type"
+    ANALYTICS_METRIC_INVALID = "Unknown metric"
+    ANALYTICS_GRANULARITY_INVALID = "granularity must be day, week or month"
+    ANALYTICS_RANGE_INVALID = "Invalid range, since must be before until and the range within the allowed length"
+    LIVE_TOO_MANY_CLIENTS = "Too many live dashboards are open, try again later"
+    EXPORT_ENTITY_INVALID = "Export must be one of logs, users, posts, ratings"
+    EXPORT_FORMAT_INVALID = "Export format must be csv or ndjson"
+    EXPORT_TIME_RANGE_UNSUPPORTED = "This export has no time column, since/until are not supported"
 
     # tag
     TAG_NAME_REQUIRED = "Tag name is required"
@@ -1,9 +1,18 @@
 import re
+import base64
 import difflib
 import math
-from datetime import timedelta
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from flask_jwt_extended import create_access_token, decode_token
 from flask import current_app as app
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from db import db
+from common.exception import ValidationException
+from common.message import Message
 
 
 
@@ -61,6 +70,114 @@ class JWTUtils:
         except Exception:
             return None
 
+class LRUCache:
+    """Thread-safe bounded LRU cache with an optional per-entry TTL (seconds)."""
+
+    def __init__(self, capacity: int = 1024, ttl: float = None):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Get a value and mark it as recently used; expired entries are dropped."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        """Insert or replace a value, evicting the least recently used entry when full."""
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.capacity:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        """Remove a key and return its value."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return entry[1] if entry else default
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+
+class CursorUtils:
+    """Opaque keyset-pagination cursors over a (created_at, id) ordering."""
+
+    @staticmethod
+    def encode(created_at: datetime, item_id: int) -> str:
+        """Encode the sort key of the last item of a page."""
+        raw = f"{created_at.isoformat()}|{int(item_id)}".encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def decode(cursor: str):
+        """
+        Decode a cursor produced by encode.
+
+        Returns:
+            tuple: (created_at datetime, id int)
+        Raises:
+            ValidationException: malformed cursor, or one carrying a timezone
+                (stored datetimes are naive and cannot be compared with it)
+        """
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            created_at, item_id = base64.urlsafe_b64decode(padded).decode('utf-8').rsplit('|', 1)
+            created_at, item_id = datetime.fromisoformat(created_at), int(item_id)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise ValidationException(Message.CURSOR_INVALID)
+        if created_at.tzinfo is not None:
+            raise ValidationException(Message.CURSOR_INVALID)
+        return created_at, item_id
+
+
+class DBUtils:
+    """Dialect-specific statements for the SQLite and MySQL backends."""
+
+    @staticmethod
+    def increment_counters(model, key_columns, rows):
+        """
+        Add deltas to counter columns, inserting rows that do not exist yet,
+        in one upsert statement (ON CONFLICT on SQLite, ON DUPLICATE KEY on MySQL).
+        Runs in the caller's transaction.
+
+        Args:
+            model: mapped class whose primary key is key_columns
+            key_columns: list of key column names
+            rows: list of dicts with the key columns and the deltas of the counter columns
+        """
+        if not rows:
+            return
+        table = model.__table__
+        counters = [name for name in rows[0] if name not in key_columns]
+        if db.session.get_bind().dialect.name == 'mysql':
+            stmt = mysql_insert(table)
+            stmt = stmt.on_duplicate_key_update({name: table.c[name] + stmt.inserted[name] for name in counters})
+        else:
+            stmt = sqlite_insert(table)
+            stmt = stmt.on_conflict_do_update(index_elements=key_columns,
+                                              set_={name: table.c[name] + stmt.excluded[name] for name in counters})
+        db.session.execute(stmt, rows)
+
+
 class TrieNode:
     """Node for Trie data structure."""
 
@@ -51,3 +51,62 @@ print(f"{DB_URL}")
 JWT_SECRET_KEY = config.get('JWT', 'SECRET', fallback=None)
 JWT_ALGORITHM = config.get('JWT', 'ALGORITHM', fallback='HS256')
 JWT_ACCESS_EXPIRES_DAYS = config.get('JWT', 'ACCESS_EXPIRES_DAYS', fallback=7)
+
+# recommender settings
+RECOMMEND_CF_WEIGHT = config.getfloat('RECOMMEND', 'CF_WEIGHT', fallback=0.3)
+RECOMMEND_CF_TOP_K = config.getint('RECOMMEND', 'CF_TOP_K', fallback=20)
+# each worker patches its own co-occurrence matrix; rebuild it to pick up other workers' changes
+RECOMMEND_CF_REBUILD_SECONDS = config.getint('RECOMMEND', 'CF_REBUILD_SECONDS', fallback=600)
+RECOMMEND_SIMILAR_TOP_K = config.getint('RECOMMEND', 'SIMILAR_TOP_K', fallback=10)
+RECOMMEND_CACHE_SIZE = config.getint('RECOMMEND', 'CACHE_SIZE', fallback=10000)
+RECOMMEND_CACHE_TTL = config.getint('RECOMMEND', 'CACHE_TTL', fallback=600)
+# shared film feature matrix file, memory-mapped by every worker
+RECOMMEND_MATRIX_PATH = os.path.join(BASE_DIR, config.get('RECOMMEND', 'MATRIX_PATH', fallback='src/data/cache/film_features.bin'))
+
+# post settings
+POST_LIKE_BUFFERED = config.getboolean('POST', 'LIKE_BUFFERED', fallback=False)
+POST_LIKE_FLUSH_INTERVAL = config.getfloat('POST', 'LIKE_FLUSH_INTERVAL', fallback=2.0)
+POST_TAG_FEED_CACHE_SIZE = config.getint('POST', 'TAG_FEED_CACHE_SIZE', fallback=256)
+POST_TAG_FEED_CACHE_DEPTH = config.getint('POST', 'TAG_FEED_CACHE_DEPTH', fallback=200)
+POST_TAG_FEED_CACHE_TTL = config.getint('POST', 'TAG_FEED_CACHE_TTL', fallback=30)
+POST_TAG_NAME_CACHE_SIZE = config.getint('POST', 'TAG_NAME_CACHE_SIZE', fallback=2048)
+
+# log writer settings
+LOG_ASYNC = config.getboolean('LOG', 'ASYNC', fallback=True)
+LOG_QUEUE_SIZE = config.getint('LOG', 'QUEUE_SIZE', fallback=10000)
+LOG_BATCH_SIZE = config.getint('LOG', 'BATCH_SIZE', fallback=500)
+LOG_FLUSH_INTERVAL = config.getfloat('LOG', 'FLUSH_INTERVAL', fallback=1.0)
+LOG_PUT_TIMEOUT = config.getfloat('LOG', 'PUT_TIMEOUT', fallback=0.05)
+LOG_COUNT_CAP = config.getint('LOG', 'COUNT_CAP', fallback=10000)
+LOG_RETENTION_DAYS = config.getint('LOG', 'RETENTION_DAYS', fallback=0)
+# gzip NDJSON partitions of archived logs, one file per day
+LOG_ARCHIVE_DIR = os.path.join(BASE_DIR, config.get('LOG', 'ARCHIVE_DIR', fallback='src/data/archive/logs'))
+LOG_ARCHIVE_BATCH_SIZE = config.getint('LOG', 'ARCHIVE_BATCH_SIZE', fallback=5000)
+
+# user activity ranking settings
+ACTIVITY_TOP_K = config.getint('ACTIVITY', 'TOP_K', fallback=50)
+ACTIVITY_TOP_CACHE_TTL = config.getint('ACTIVITY', 'TOP_CACHE_TTL', fallback=60)
+
+# admin dashboard counter settings
+STATS_RECONCILE_SECONDS = config.getint('STATS', 'RECONCILE_SECONDS', fallback=3600)
+
+# admin analytics settings
+ANALYTICS_MAX_DAYS = config.getint('ANALYTICS', 'MAX_DAYS', fallback=3660)
+
+# live admin dashboard settings
+LIVE_INTERVAL = config.getfloat('LIVE', 'INTERVAL', fallback=2.0)
+LIVE_HEARTBEAT_SECONDS = config.getfloat('LIVE', 'HEARTBEAT_SECONDS', fallback=15.0)
+LIVE_BUFFER_SIZE = config.getint('LIVE', 'BUFFER_SIZE', fallback=32)
+LIVE_MAX_CLIENTS = config.getint('LIVE', 'MAX_CLIENTS', fallback=20)
+
+# admin export settings
+EXPORT_BATCH_SIZE = config.getint('EXPORT', 'BATCH_SIZE', fallback=1000)
+
+# trending settings
+TRENDING_HALF_LIFE_HOURS = config.getfloat('TRENDING', 'HALF_LIFE_HOURS', fallback=24.0)
+TRENDING_TOP_K = config.getint('TRENDING', 'TOP_K', fallback=100)
+TRENDING_WINDOW_DAYS = config.getint('TRENDING', 'WINDOW_DAYS', fallback=7)
+TRENDING_REBUILD_SECONDS = config.getint('TRENDING', 'REBUILD_SECONDS', fallback=0)
+TRENDING_POST_WEIGHT = config.getfloat('TRENDING', 'POST_WEIGHT', fallback=1.0)
+TRENDING_LIKE_WEIGHT = config.getfloat('TRENDING', 'LIKE_WEIGHT', fallback=1.0)
+TRENDING_COMMENT_WEIGHT = config.getfloat('TRENDING', 'COMMENT_WEIGHT', fallback=2.0)
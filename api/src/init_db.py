@@ -371,6 +371,11 @@ def init_database():
         else:
             print("film_favorites.csv does not exist, skipping import")
 
+        # Fill denormalized counters from the imported relations
+        from maintenance import reconcile_stat_counters, repair_comment_counts
+        repair_comment_counts()
+        reconcile_stat_counters()
+
         print("\nDatabase initialization completed successfully!")
 
         # Print statistics
@@ -0,0 +1,189 @@
+import os
+import sys
+import argparse
+from flask import Flask
+from sqlalchemy import delete, func, inspect, select, text, update
+
+# Ensure import path is correct
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from config import DB_URL
+from db import db
+from models.core_models import Log, Post
+from models.relations_models import PostComment, PostLike
+
+def create_app():
+    """Create Flask app for maintenance operations"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = DB_URL
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+def ensure_schema():
+    """Add columns and constraints missing from databases created before them"""
+    inspector = inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    # create tables added since the database was initialized
+    db.create_all()
+    if 'stat_counters' not in tables:
+        print("Added stat counters table")
+        reconcile_stat_counters()
+    if 'user_activity_counts' not in tables:
+        print("Added user activity tables")
+        rebuild_user_activity()
+
+    columns = {c['name'] for c in inspector.get_columns('posts')}
+    if 'comment_count' not in columns:
+        db.session.execute(text("ALTER TABLE posts ADD COLUMN comment_count INTEGER NOT NULL DEFAULT 0"))
+        db.session.commit()
+        print("Added posts.comment_count")
+
+    like_indexes = {i['name'] for i in inspector.get_indexes('post_likes')}
+    like_indexes |= {u['name'] for u in inspector.get_unique_constraints('post_likes')}
+    if 'uq_post_likes_post_user' not in like_indexes:
+        # keep the first like of each (post, user) pair before enforcing uniqueness
+        keep = (select(func.min(PostLike.id))
+                .group_by(PostLike.post_id, PostLike.user_id)
+                .subquery())
+        removed = db.session.execute(delete(PostLike).where(PostLike.id.not_in(select(keep)))).rowcount
+        db.session.execute(text("CREATE UNIQUE INDEX uq_post_likes_post_user ON post_likes (post_id, user_id)"))
+        db.session.commit()
+        print(f"Added unique index on post_likes (post_id, user_id), removed {removed} duplicate likes")
+
+    if 'ix_post_tags_tag_post' not in {i['name'] for i in inspector.get_indexes('post_tags')}:
+        db.session.execute(text("CREATE INDEX ix_post_tags_tag_post ON post_tags (tag_id, post_id)"))
+        db.session.commit()
+        print("Added index on post_tags (tag_id, post_id)")
+
+    if 'ix_posts_created_at' not in {i['name'] for i in inspector.get_indexes('posts')}:
+        db.session.execute(text("CREATE INDEX ix_posts_created_at ON posts (created_at)"))
+        db.session.commit()
+        print("Added index on posts (created_at)")
+
+    if 'ix_post_comments_post_comment' not in {i['name'] for i in inspector.get_indexes('post_comments')}:
+        db.session.execute(text("CREATE INDEX ix_post_comments_post_comment ON post_comments (post_id, comment_id)"))
+        db.session.commit()
+        print("Added index on post_comments (post_id, comment_id)")
+
+    if 'action_type' not in {c['name'] for c in inspector.get_columns('logs')}:
+        for column in ("action_type SMALLINT NOT NULL DEFAULT 0", "target_type SMALLINT NOT NULL DEFAULT 0",
+                       "target_id INTEGER", "payload VARCHAR(255)"):
+            db.session.execute(text(f"ALTER TABLE logs ADD COLUMN {column}"))
+        db.session.commit()
+        print("Added logs.action_type, target_type, target_id, payload")
+        structure_log_actions()
+
+    log_indexes = {i['name'] for i in inspector.get_indexes('logs')}
+    for name, columns in (('ix_logs_created_at', 'created_at'),
+                          ('ix_logs_user_created', 'user_id, created_at'),
+                          ('ix_logs_type_created', 'action_type, created_at')):
+        if name not in log_indexes:
+            db.session.execute(text(f"CREATE INDEX {name} ON logs ({columns})"))
+            db.session.commit()
+            print(f"Added index on logs ({columns})")
+    if 'ix_logs_action_created' in log_indexes:
+        # replaced by (action_type, created_at) once actions are structured
+        on_table = " ON logs" if db.engine.dialect.name == 'mysql' else ""
+        db.session.execute(text(f"DROP INDEX ix_logs_action_created{on_table}"))
+        db.session.commit()
+        print("Dropped index on logs (action, created_at)")
+
+    # after the structured action columns exist, the per-action rollup reads them
+    if 'log_daily_counts' not in tables or 'log_daily_action_counts' not in tables:
+        print("Added log rollup tables")
+        rebuild_log_rollups()
+
+def archive_logs():
+    """Move logs older than LOG.RETENTION_DAYS into the gzip archive"""
+    from services.log_archive_service import LogArchiveService
+    result = LogArchiveService.archive()
+    print(f"Archived {result['archived']} logs from {result['days']} days, deleted {result['deleted']} from the logs table")
+    return result
+
+def rebuild_log_rollups():
+    """Recompute the hourly and daily log rollups from the logs table"""
+    from services.log_service import LogService
+    counted = LogService.rebuild_rollups()
+    print(f"Rebuilt log rollups from {counted} logs")
+    return counted
+
+def rebuild_user_activity():
+    """Recompute the per-user activity counters from the logs table and the log archive"""
+    from services.activity_service import ActivityService
+    counted = ActivityService.rebuild()
+    print(f"Rebuilt user activity counters from {counted} logs")
+    return counted
+
+def structure_log_actions(batch_size=5000):
+    """Convert free-text log actions written before structured logging, in id order and batches"""
+    from common.log_actions import LogActionUtils
+    converted = unknown = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(Log.id, Log.action)
+            .where(Log.id > last_id, Log.action_type == 0, Log.action != '')
+            .order_by(Log.id)
+            .limit(batch_size)).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        updates = []
+        for log_id, action in rows:
+            parsed = LogActionUtils.parse_legacy(action)
+            if parsed is None:
+                unknown += 1
+                continue
+            action_type, target_type, target_id, payload = parsed
+            updates.append({'id': log_id, 'action': '', 'action_type': int(action_type),
+                            'target_type': int(target_type), 'target_id': target_id,
+                            'payload': LogActionUtils.encode_payload(payload)})
+        if updates:
+            db.session.execute(update(Log), updates)
+        db.session.commit()
+        converted += len(updates)
+    print(f"Structured {converted} log actions, kept {unknown} unrecognized ones as text")
+    return converted
+
+def reconcile_stat_counters():
+    """Reset the admin dashboard totals to real counts"""
+    from services.stat_counter_service import StatCounterService
+    counts = StatCounterService.reconcile()
+    print(f"Reconciled stat counters: {counts}")
+    return counts
+
+def repair_comment_counts():
+    """Recompute posts.comment_count from post_comments with one UPDATE"""
+    counts = (select(func.count(PostComment.id))
+              .where(PostComment.post_id == Post.id)
+              .scalar_subquery())
+    result = db.session.execute(update(Post).values(comment_count=counts))
+    db.session.commit()
+    print(f"Repaired comment_count on {result.rowcount} posts")
+    return result.rowcount
+
+COMMANDS = {
+    'archive-logs': archive_logs,
+    'rebuild-log-rollups': rebuild_log_rollups,
+    'rebuild-user-activity': rebuild_user_activity,
+    'reconcile-stat-counters': reconcile_stat_counters,
+    'repair-comment-counts': repair_comment_counts,
+    'structure-log-actions': structure_log_actions,
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="FilmHub database maintenance")
+    parser.add_argument('command', choices=sorted(COMMANDS) + ['upgrade'])
+    args = parser.parse_args(argv)
+
+    app = create_app()
+    with app.app_context():
+        ensure_schema()
+        if args.command in COMMANDS:
+            COMMANDS[args.command]()
+
+if __name__ == '__main__':
+    main()
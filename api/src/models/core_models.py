@@ -1,5 +1,6 @@
 from db import db
 from datetime import datetime
+from common.log_actions import LogActionUtils
 
 # user
 class User(db.Model):
@@ -96,12 +97,15 @@ class Director(db.Model):
 # post
 class Post(db.Model):
     __tablename__ = 'posts'
+    __table_args__ = (db.Index('ix_posts_created_at', 'created_at'),)
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     title = db.Column(db.String(256), nullable=False)
     content = db.Column(db.Text)
     like_count = db.Column(db.Integer, default=0)
+    # denormalized count of post_comments rows, kept in sync by PostService
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.now(), nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.now(), onupdate=datetime.now(), nullable=False)
 
@@ -112,6 +116,7 @@ class Post(db.Model):
             'title': self.title,
             'content': self.content,
             'like_count': self.like_count,
+            'comment_count': self.comment_count or 0,
             'created_at': self.updated_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
         }
@@ -126,22 +131,13 @@ class Comment(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.now(), nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.now(), onupdate=datetime.now(), nullable=False)
 
-    def to_dict(self):
-        # Get post info through PostComment relationship
-        from models.relations_models import PostComment
-        from db import db
-
-        post_comment = db.session.query(PostComment).filter_by(comment_id=self.id).first()
-        post_title = None
-        if post_comment:
-            post = db.session.query(Post).get(post_comment.post_id)
-            post_title = post.title if post else None
-
+    def to_dict(self, post_id=None, post_title=None):
+        # post fields come from the caller (see CommentProjectionService), not from lazy queries here
         return {
             'id': self.id,
             'user_id': self.user_id,
             'content': self.content,
-            'post_id': post_comment.post_id if post_comment else None,
+            'post_id': post_id,
             'post_title': post_title,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
@@ -150,16 +146,66 @@ class Comment(db.Model):
 # log
 class Log(db.Model):
     __tablename__ = 'logs'
+    __table_args__ = (db.Index('ix_logs_created_at', 'created_at'),
+                      db.Index('ix_logs_user_created', 'user_id', 'created_at'),
+                      db.Index('ix_logs_type_created', 'action_type', 'created_at'))
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    action = db.Column(db.String(128), nullable=False)
+    # free text of entries written before structured logging, empty otherwise
+    action = db.Column(db.String(128), nullable=False, default='')
+    action_type = db.Column(db.SmallInteger, nullable=False, default=0, server_default='0')  # LogAction
+    target_type = db.Column(db.SmallInteger, nullable=False, default=0, server_default='0')  # LogTarget
+    target_id = db.Column(db.Integer)
+    payload = db.Column(db.String(255))  # compact JSON
     created_at = db.Column(db.DateTime, default=datetime.now(), nullable=False)
 
     def to_dict(self):
         return {
             'id': self.id,
             'user_id': self.user_id,
-            'action': self.action,
+            **LogActionUtils.describe(self.action_type, self.target_type, self.target_id, self.payload, self.action),
             'created_at': self.created_at.isoformat()
-        }
\ No newline at end of file
+        }
+
+# log rollups, maintained by LogService
+class LogHourlyCount(db.Model):
+    __tablename__ = 'log_hourly_counts'
+
+    bucket = db.Column(db.DateTime, primary_key=True)  # start of the hour
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class LogDailyCount(db.Model):
+    __tablename__ = 'log_daily_counts'
+
+    day = db.Column(db.Date, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class LogDailyActionCount(db.Model):
+    __tablename__ = 'log_daily_action_counts'
+
+    day = db.Column(db.Date, primary_key=True)
+    action_type = db.Column(db.SmallInteger, primary_key=True)  # LogAction
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+# per-user activity counters, maintained by ActivityService from the log writer
+class UserActivityCount(db.Model):
+    __tablename__ = 'user_activity_counts'
+    __table_args__ = (db.Index('ix_user_activity_counts_count', 'count'),)
+
+    user_id = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class UserDailyActivity(db.Model):
+    __tablename__ = 'user_daily_activity'
+
+    day = db.Column(db.Date, primary_key=True)
+    user_id = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+# dashboard totals, maintained by StatCounterService
+class StatCounter(db.Model):
+    __tablename__ = 'stat_counters'
+
+    name = db.Column(db.String(32), primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
@@ -27,6 +27,7 @@ class FilmDirector(db.Model):
 # post_tag
 class PostTag(db.Model):
     __tablename__ = 'post_tags'
+    __table_args__ = (db.Index('ix_post_tags_tag_post', 'tag_id', 'post_id'),)
 
     id = db.Column(db.Integer, primary_key=True)
     post_id = db.Column(db.Integer, db.ForeignKey('posts.id'), nullable=False)
@@ -52,6 +53,7 @@ class FilmFavorite(db.Model):
 # post_comment
 class PostComment(db.Model):
     __tablename__ = 'post_comments'
+    __table_args__ = (db.Index('ix_post_comments_post_comment', 'post_id', 'comment_id'),)
 
     id = db.Column(db.Integer, primary_key=True)
     post_id = db.Column(db.Integer, db.ForeignKey('posts.id'), nullable=False)
@@ -60,6 +62,7 @@ class PostComment(db.Model):
 # post_like
 class PostLike(db.Model):
     __tablename__ = 'post_likes'
+    __table_args__ = (db.UniqueConstraint('post_id', 'user_id', name='uq_post_likes_post_user'),)
 
     id = db.Column(db.Integer, primary_key=True)
     post_id = db.Column(db.Integer, db.ForeignKey('posts.id'), nullable=False)
@@ -0,0 +1,118 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+from sqlalchemy import func
+from db import db
+from models.core_models import Log, User, UserActivityCount, UserDailyActivity
+from common.uilts import DBUtils, LRUCache
+from config import ACTIVITY_TOP_K, ACTIVITY_TOP_CACHE_TTL
+
+
+class ActivityService:
+    """
+    Per-user activity counters, so rankings never aggregate the logs table.
+
+    The log writer adds every batch to two tables in the same transaction as
+    the insert: user_activity_counts (all-time count per user, indexed on
+    count) and user_daily_activity (count per day and user). The all-time
+    top-k is read from the count index; the 7 and 30 day rankings sum at most
+    that many days of daily rows. Each ranking is cached per worker for
+    ACTIVITY.TOP_CACHE_TTL seconds, so dashboard loads mostly read nothing.
+    """
+
+    WINDOWS = (7, 30)
+
+    # window days (0 = all time) -> [(user_id, username, count)], best first
+    _top = LRUCache(len(WINDOWS) + 1, ACTIVITY_TOP_CACHE_TTL)
+
+    @classmethod
+    def record(cls, entries):
+        """
+        Count log entries into the activity tables, in the caller's transaction.
+
+        Args:
+            entries: list of dicts with user_id and created_at
+        """
+        users = Counter(e['user_id'] for e in entries)
+        days = Counter((e['created_at'].date(), e['user_id']) for e in entries)
+        cls._increment(users, days)
+
+    @classmethod
+    def _increment(cls, users: Counter, days: Counter):
+        DBUtils.increment_counters(UserActivityCount, ['user_id'],
+                                   [{'user_id': user_id, 'count': n} for user_id, n in sorted(users.items())])
+        DBUtils.increment_counters(UserDailyActivity, ['day', 'user_id'],
+                                   [{'day': day, 'user_id': user_id, 'count': n}
+                                    for (day, user_id), n in sorted(days.items())])
+
+    @classmethod
+    def remove_user(cls, user_id: int):
+        """Delete a user's counters, in the caller's transaction."""
+        db.session.query(UserActivityCount).filter_by(user_id=user_id).delete(synchronize_session=False)
+        db.session.query(UserDailyActivity).filter_by(user_id=user_id).delete(synchronize_session=False)
+        cls._top.clear()
+
+    @classmethod
+    def get_top_users(cls, limit: int = 10, days: int = None):
+        """
+        Most active users, all time or over the last `days` days (today included).
+
+        Args:
+            limit: int - at most ACTIVITY.TOP_K
+            days: optional int, one of WINDOWS; None ranks all time
+        Returns:
+            list of dicts: [{user_id, username, log_count}, ...]
+        """
+        window = days if days in cls.WINDOWS else 0
+        ranking = cls._top.get(window)
+        if ranking is None:
+            ranking = cls._query_top(window, ACTIVITY_TOP_K)
+            cls._top.set(window, ranking)
+        return [{'user_id': user_id, 'username': username, 'log_count': count}
+                for user_id, username, count in ranking[:limit]]
+
+    @classmethod
+    def _query_top(cls, window: int, k: int):
+        if window:
+            first_day = date.today() - timedelta(days=window - 1)
+            total = func.sum(UserDailyActivity.count)
+            rows = db.session.query(UserDailyActivity.user_id, User.username, total)\
+                .join(User, User.id == UserDailyActivity.user_id)\
+                .filter(UserDailyActivity.day >= first_day)\
+                .group_by(UserDailyActivity.user_id, User.username)\
+                .order_by(total.desc(), UserDailyActivity.user_id)\
+                .limit(k).all()
+        else:
+            rows = db.session.query(UserActivityCount.user_id, User.username, UserActivityCount.count)\
+                .join(User, User.id == UserActivityCount.user_id)\
+                .order_by(UserActivityCount.count.desc(), UserActivityCount.user_id)\
+                .limit(k).all()
+        return [(user_id, username, int(count)) for user_id, username, count in rows]
+
+    @classmethod
+    def rebuild(cls, batch_size: int = 10000):
+        """
+        Recompute both activity tables from the logs table and the log
+        archive. Only counts are kept in memory. Run it while the app is idle,
+        like LogService.rebuild_rollups.
+
+        Args:
+            batch_size: rows streamed per round trip
+        Returns:
+            int: number of logs counted
+        """
+        from services.log_archive_service import LogArchiveService
+
+        users, days = Counter(), Counter()
+        for user_id, created_at in db.session.query(Log.user_id, Log.created_at).yield_per(batch_size):
+            users[user_id] += 1
+            days[(created_at.date(), user_id)] += 1
+        for row in LogArchiveService.iter_logs():
+            users[row['user_id']] += 1
+            days[(datetime.fromisoformat(row['created_at']).date(), row['user_id'])] += 1
+
+        db.session.query(UserActivityCount).delete(synchronize_session=False)
+        db.session.query(UserDailyActivity).delete(synchronize_session=False)
+        cls._increment(users, days)
+        db.session.commit()
+        cls._top.clear()
+        return sum(users.values())
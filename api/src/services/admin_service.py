@@ -6,6 +6,12 @@ import os
 from flask import current_app as app
 from werkzeug.utils import secure_filename
 from services.log_service import LogService
+from common.log_actions import LogAction
+from services.item_cf_service import ItemCFService
+from services.film_feature_service import FilmFeatureService
+from services.like_counter_service import LikeCounterService
+from services.stat_counter_service import StatCounterService
+from services.live_stats_service import LiveStatsService
 
 class AdminService:
 
@@ -17,7 +23,7 @@ class AdminService:
         Returns:
             int: Total user count
         """
-        return db.session.query(User).count()
+        return StatCounterService.get_totals()['users']
 
     @classmethod
     def get_total_posts(cls):
@@ -27,7 +33,7 @@ class AdminService:
         Returns:
             int: Total post count
         """
-        return db.session.query(Post).count()
+        return StatCounterService.get_totals()['posts']
 
     @classmethod
     def get_total_comments(cls):
@@ -37,7 +43,7 @@ class AdminService:
         Returns:
             int: Total comment count
         """
-        return db.session.query(Comment).count()
+        return StatCounterService.get_totals()['comments']
 
     @classmethod
     def get_total_films(cls):
@@ -47,57 +53,43 @@ class AdminService:
         Returns:
             int: Total film count
         """
-        return db.session.query(Film).count()
+        return StatCounterService.get_totals()['films']
 
     @classmethod
     def get_admin_stats(cls):
         """
-        Get all admin statistics in one call.
+        Get all admin statistics in one call. Totals come from the
+        stat_counters table (one read), not from COUNT(*) queries.
 
         Returns:
             dict: Statistics data
         """
+        totals = StatCounterService.get_totals()
         return {
-            'total_users': cls.get_total_users(),
-            'total_posts': cls.get_total_posts(),
-            'total_comments': cls.get_total_comments(),
-            'total_films': cls.get_total_films()
+            'total_users': totals['users'],
+            'total_posts': totals['posts'],
+            'total_comments': totals['comments'],
+            'total_films': totals['films'],
+            'like_counter': LikeCounterService.stats(),
+            'log_writer': LogService.writer_stats(),
+            'live_stats': LiveStatsService.stats()
         }
 
     @classmethod
-    def get_top_active_users(cls, limit=10):
+    def get_top_active_users(cls, limit=10, days=None):
         """
-        Get top active users based on log activity.
+        Get top active users based on log activity, from the precomputed
+        activity counters.
 
         Args:
             limit: int - Number of top users to return
+            days: int - Rank over the last 7 or 30 days instead of all time (optional)
 
         Returns:
             list of dicts: [{user_id, username, log_count}, ...]
         """
-        from sqlalchemy import func
-
-        # Query top users by log count
-        top_users = (db.session.query(
-            User.id.label('user_id'),
-            User.username,
-            func.count(Log.id).label('log_count')
-        )
-        .join(Log, User.id == Log.user_id)
-        .group_by(User.id, User.username)
-        .order_by(func.count(Log.id).desc())
-        .limit(limit)
-        .all())
-
-        result = []
-        for row in top_users:
-            result.append({
-                'user_id': row.user_id,
-                'username': row.username,
-                'log_count': int(row.log_count)
-            })
-
-        return result
+        from services.activity_service import ActivityService
+        return ActivityService.get_top_users(limit, days)
 
     @classmethod
     def add_film(cls, dto: dict):
@@ -157,8 +149,10 @@ class AdminService:
                     film_director = FilmDirector(film_id=film.id, director_id=director_id)
                     db.session.add(film_director)
 
+        StatCounterService.add(films=1)
         db.session.commit()
-        LogService.log_action(1, f"Admin added film {film.id}: {film.title}")  # 使用0作为admin用户ID
+        FilmFeatureService.add_film(film.id)
+        LogService.log_action(1, LogAction.ADMIN_FILM_ADD, film.id, {'title': film.title})  # 使用0作为admin用户ID
         return film
 
     @classmethod
@@ -276,9 +270,14 @@ class AdminService:
 
         # Finally delete the film
         db.session.delete(film)
+        StatCounterService.add(films=-1)
         db.session.commit()
+        ItemCFService.remove_film(film_id)
+        FilmFeatureService.remove_film(film_id)
+        from services.post_service import PostService
+        PostService.forget_film(film_id)
 
-        LogService.log_action(1, f"Admin deleted film {film_id}: {film.title}")  # 使用0作为admin用户ID
+        LogService.log_action(1, LogAction.ADMIN_FILM_DELETE, film_id, {'title': film.title})  # 使用0作为admin用户ID
         return True
 
     @classmethod
@@ -549,21 +548,22 @@ class AdminService:
                 except Exception as e:
                     pass
 
+        from services.post_service import PostService
+
         # Delete related records first
-        # Delete user posts (will cascade delete comments and likes)
+        # Delete tags, comments and likes of the user's posts
         user_posts = db.session.query(Post).filter_by(user_id=user_id).all()
         post_ids = [post.id for post in user_posts]
-
-        # Delete post tags for user's posts
         from models.relations_models import PostTag
-        if post_ids:
-            db.session.query(PostTag).filter(PostTag.post_id.in_(post_ids)).delete()
+        affected_tag_ids = {r[0] for r in db.session.query(PostTag.tag_id).filter(PostTag.post_id.in_(post_ids)).all()} if post_ids else set()
+        PostService._delete_post_children(post_ids)
 
         # Delete user posts
-        db.session.query(Post).filter_by(user_id=user_id).delete()
+        removed_posts = db.session.query(Post).filter_by(user_id=user_id).delete()
 
-        # Delete user comments
-        db.session.query(Comment).filter_by(user_id=user_id).delete()
+        # Delete user comments on other posts, updating their comment_count
+        comment_ids = [r[0] for r in db.session.query(Comment.id).filter_by(user_id=user_id).all()]
+        PostService._delete_comments(comment_ids)
 
         # Delete user ratings
         from models.relations_models import FilmRating
@@ -577,10 +577,20 @@ class AdminService:
         from models.relations_models import UserTag
         db.session.query(UserTag).filter_by(user_id=user_id).delete()
 
+        # Delete activity counters
+        from services.activity_service import ActivityService
+        ActivityService.remove_user(user_id)
+
         # Finally delete the user
         db.session.delete(user)
+        StatCounterService.add(users=-1, posts=-removed_posts)
         db.session.commit()
-        LogService.log_action(1, f"Admin deleted user {user_id}: {user.username}")  # 使用0作为admin用户ID
+        ItemCFService.refresh_user(user_id)
+        from services.tag_feed_service import TagFeedService
+        from services.trending_service import TrendingService
+        TagFeedService.invalidate(affected_tag_ids)
+        TrendingService.remove_posts(post_ids)
+        LogService.log_action(1, LogAction.ADMIN_USER_DELETE, user_id, {'username': user.username})  # 使用0作为admin用户ID
         return True
 
     @classmethod
@@ -610,14 +620,11 @@ class AdminService:
         # Get total count for this user
         total = db.session.query(Post).filter_by(user_id=user_id).count()
 
-        # Get paginated posts
-        posts = db.session.query(Post).filter_by(user_id=user_id).order_by(Post.created_at.desc()).offset(offset).limit(per_page).all()
+        # Get paginated post ids
+        post_ids = db.session.query(Post.id).filter_by(user_id=user_id).order_by(Post.created_at.desc()).offset(offset).limit(per_page).all()
 
-        # Enrich post data
-        post_dicts = []
-        for post in posts:
-            post_dict = PostService._build_post_dict(post.id, user_id)
-            post_dicts.append(post_dict)
+        # Enrich post data in one batch
+        post_dicts = PostService.build_post_dicts([r[0] for r in post_ids], user_id)
 
         total_pages = (total + per_page - 1) // per_page
 
@@ -645,11 +652,19 @@ class AdminService:
         if not post:
             raise ValueError("Post not found")
 
-        # Delete post will cascade delete related comments and likes
+        # Delete related tags, comments and likes, then the post
+        from services.post_service import PostService
+        from services.tag_feed_service import TagFeedService
+        from services.trending_service import TrendingService
+        tag_ids = PostService._get_tag_ids(post_id)
+        PostService._delete_post_children([post_id])
         db.session.delete(post)
+        StatCounterService.add(posts=-1)
         db.session.commit()
+        TagFeedService.remove_post(post_id, tag_ids)
+        TrendingService.remove_posts([post_id])
 
-        LogService.log_action(1, f"Admin deleted post {post_id} by user {post.user_id}")  # 使用0作为admin用户ID
+        LogService.log_action(1, LogAction.ADMIN_POST_DELETE, post_id, {'author_id': post.user_id})  # 使用0作为admin用户ID
         return True
 
     @classmethod
@@ -677,44 +692,27 @@ class AdminService:
         # Get total count for this user
         total = db.session.query(Comment).filter_by(user_id=user_id).count()
 
-        # Get paginated comments
-        comments = db.session.query(Comment).filter_by(user_id=user_id).order_by(Comment.created_at.desc()).offset(offset).limit(per_page).all()
+        # Get paginated comments with their authors and posts in one query
+        from services.comment_projection_service import CommentProjectionService
+        rows = CommentProjectionService.get_user_comment_rows(user_id, offset, per_page)
 
-        # Convert to dicts and enrich with user info and post info
         comment_dicts = []
-        for comment in comments:
+        for comment, post_id, post_title, user in rows:
             comment_dict = {
                 'comment_id': comment.id,
                 'user_id': comment.user_id,
                 'content': comment.content,
                 'created_at': comment.created_at.isoformat() if comment.created_at else None,
-                'updated_at': comment.updated_at.isoformat() if comment.updated_at else None
+                'updated_at': comment.updated_at.isoformat() if comment.updated_at else None,
+                'post_id': post_id,
+                'post_title': post_title if post_title is not None else 'Unknown Post',
             }
-
-            # Add user info
-            user = db.session.query(User).get(comment.user_id)
             if user:
                 comment_dict['user_info'] = {
                     'id': user.id,
                     'username': user.username,
                     'avatar_url': user.avatar_url
                 }
-
-            # Add post info through PostComment relationship
-            from models.relations_models import PostComment
-            post_comment = db.session.query(PostComment).filter_by(comment_id=comment.id).first()
-            if post_comment:
-                post = db.session.query(Post).get(post_comment.post_id)
-                if post:
-                    comment_dict['post_id'] = post.id
-                    comment_dict['post_title'] = post.title
-                else:
-                    comment_dict['post_id'] = post_comment.post_id
-                    comment_dict['post_title'] = 'Unknown Post'
-            else:
-                comment_dict['post_id'] = None
-                comment_dict['post_title'] = 'Unknown Post'
-
             comment_dicts.append(comment_dict)
 
         total_pages = (total + per_page - 1) // per_page
@@ -743,9 +741,11 @@ class AdminService:
         if not comment:
             raise ValueError("Comment not found")
 
-        # Delete comment
-        db.session.delete(comment)
+        # Delete comment with its post relation, updating the post's comment_count
+        from services.post_service import PostService
+        author_id = comment.user_id
+        PostService._delete_comments([comment_id])
         db.session.commit()
 
-        LogService.log_action(1, f"Admin deleted comment {comment_id} by user {comment.user_id}")  # 使用0作为admin用户ID
+        LogService.log_action(1, LogAction.ADMIN_COMMENT_DELETE, comment_id, {'author_id': author_id})  # 使用0作为admin用户ID
         return True
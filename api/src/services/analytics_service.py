@@ -0,0 +1,174 @@
+import numpy as np
+from datetime import date
+from sqlalchemy import func
+from db import db
+from models.core_models import LogDailyCount, LogDailyActionCount, UserDailyActivity
+from common.exception import ValidationException
+from common.message import Message
+from common.log_actions import LogAction, LogActionUtils
+from config import ANALYTICS_MAX_DAYS
+
+
+class AnalyticsService:
+    """
+    Time series for the admin dashboard, computed from daily rollups.
+
+    Each metric is read as at most one row per day from a rollup table:
+    - log_daily_action_counts for event counts
+    - user_daily_activity for daily active users
+    - log_daily_counts for all logged actions
+    The rows are scattered into a dense NumPy vector with one slot per day.
+    Week and month buckets, trailing moving averages and period-over-period
+    deltas are vector operations on it. A multi-year range therefore costs a
+    few thousand array elements per metric, whatever the traffic.
+    """
+
+    # named metrics counted from the per-action rollup; any other LogAction name works too
+    EVENT_METRICS = {
+        'signups': LogAction.REGISTER,
+        'posts': LogAction.POST_CREATE,
+        'comments': LogAction.COMMENT_CREATE,
+        'ratings': LogAction.RATING_ADD,
+    }
+    DEFAULT_METRICS = ('dau', 'signups', 'posts', 'comments', 'ratings')
+    GRANULARITIES = ('day', 'week', 'month')
+
+    @classmethod
+    def get_timeseries(cls, metrics, since: date, until: date, granularity: str = 'day', window: int = 0):
+        """
+        Bucketed time series of several metrics.
+
+        Counts are summed per bucket. 'dau' is averaged over the days of a
+        bucket, since daily active users do not add up across days. Buckets
+        start on the day, the Monday or the first of the month; the first and
+        last bucket may be partial.
+
+        Args:
+            metrics: list of str - dau, logs, signups, posts, comments, ratings or a log action type name
+            since: date - first day, included
+            until: date - last day, excluded
+            granularity: day, week or month
+            window: int - buckets in the trailing moving average, 0 for none
+        Returns:
+            dict: {
+                'granularity': str,
+                'buckets': [ISO date of each bucket start],
+                'series': { metric: {
+                    'values': [...],
+                    'moving_average': [...] (when window > 1),
+                    'delta': [...] - change against `lag` buckets before, None without history,
+                    'delta_pct': [...]
+                } },
+                'lag': int - 7 for day (week over week), 1 for week and month
+            }
+        """
+        if granularity not in cls.GRANULARITIES:
+            raise ValidationException(Message.ANALYTICS_GRANULARITY_INVALID)
+        days = (until - since).days
+        if days < 1 or days > ANALYTICS_MAX_DAYS:
+            raise ValidationException(Message.ANALYTICS_RANGE_INVALID)
+        readers = [cls._reader(metric) for metric in metrics]
+
+        starts = cls._bucket_starts(since, days, granularity)
+        lengths = np.diff(np.append(starts, days))
+        lag = 7 if granularity == 'day' else 1
+
+        series = {}
+        for metric, reader in zip(metrics, readers):
+            daily = cls._daily_vector(reader(since, until), since, days)
+            values = np.add.reduceat(daily, starts)
+            if metric == 'dau':
+                values = values / lengths
+            entry = {'values': cls._to_list(values)}
+            if window > 1:
+                entry['moving_average'] = cls._to_list(cls._moving_average(values, window))
+            entry['delta'], entry['delta_pct'] = cls._delta(values, lag)
+            series[metric] = entry
+
+        buckets = (np.datetime64(since, 'D') + starts).astype(str).tolist()
+        return {'granularity': granularity, 'buckets': buckets, 'series': series, 'lag': lag}
+
+    @classmethod
+    def _reader(cls, metric: str):
+        """Resolve a metric name to a function (since, until) -> [(day, value)]."""
+        if metric == 'dau':
+            return cls._read_dau
+        if metric == 'logs':
+            return cls._read_logs
+        action_type = cls.EVENT_METRICS.get(metric) or LogActionUtils.parse_type(metric)
+        if action_type is None or action_type == LogAction.OTHER or metric.isdigit():
+            raise ValidationException(Message.ANALYTICS_METRIC_INVALID)
+        return lambda since, until: cls._read_action(action_type, since, until)
+
+    @staticmethod
+    def _read_dau(since: date, until: date):
+        # one row per (day, user): the row count of a day is its active users
+        return db.session.query(UserDailyActivity.day, func.count())\
+            .filter(UserDailyActivity.day >= since, UserDailyActivity.day < until)\
+            .group_by(UserDailyActivity.day).all()
+
+    @staticmethod
+    def _read_logs(since: date, until: date):
+        return db.session.query(LogDailyCount.day, LogDailyCount.count)\
+            .filter(LogDailyCount.day >= since, LogDailyCount.day < until).all()
+
+    @staticmethod
+    def _read_action(action_type: LogAction, since: date, until: date):
+        return db.session.query(LogDailyActionCount.day, LogDailyActionCount.count)\
+            .filter(LogDailyActionCount.day >= since, LogDailyActionCount.day < until,
+                    LogDailyActionCount.action_type == int(action_type)).all()
+
+    @staticmethod
+    def _daily_vector(rows, since: date, days: int):
+        """Dense float vector with one slot per day, zero where a day has no row."""
+        daily = np.zeros(days)
+        if rows:
+            offsets = (np.array([day for day, _ in rows], dtype='datetime64[D]') - np.datetime64(since, 'D')).astype(int)
+            daily[offsets] = np.array([value for _, value in rows], dtype=float)
+        return daily
+
+    @staticmethod
+    def _bucket_starts(since: date, days: int, granularity: str):
+        """Offsets (in days from `since`) at which buckets start."""
+        if granularity == 'day':
+            return np.arange(days)
+        day_numbers = np.datetime64(since, 'D') + np.arange(days)
+        if granularity == 'week':
+            # 1970-01-01 was a Thursday: shift so that Monday is 0
+            keys = (day_numbers.astype(int) - 4) // 7
+        else:
+            keys = day_numbers.astype('datetime64[M]').astype(int)
+        return np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+
+    @staticmethod
+    def _moving_average(values, window: int):
+        """Trailing mean over up to `window` buckets (fewer at the start of the range)."""
+        sums = np.concatenate(([0.0], np.cumsum(values)))
+        index = np.arange(len(values))
+        low = np.maximum(0, index + 1 - window)
+        return (sums[index + 1] - sums[low]) / (index + 1 - low)
+
+    @classmethod
+    def _delta(cls, values, lag: int):
+        """Change against the bucket `lag` positions earlier, absolute and in percent."""
+        delta = np.full(len(values), np.nan)
+        pct = np.full(len(values), np.nan)
+        if len(values) > lag:
+            previous = values[:-lag]
+            delta[lag:] = values[lag:] - previous
+            with np.errstate(divide='ignore', invalid='ignore'):
+                pct[lag:] = np.where(previous > 0, delta[lag:] / previous * 100, np.nan)
+        return cls._to_list(delta), cls._to_list(pct)
+
+    @staticmethod
+    def _to_list(values):
+        """JSON-ready list: whole numbers as int, others rounded, NaN as None."""
+        result = []
+        for value in np.round(values, 2).tolist():
+            if value != value:
+                result.append(None)
+            elif float(value).is_integer():
+                result.append(int(value))
+            else:
+                result.append(value)
+        return result
@@ -0,0 +1,65 @@
+from db import db
+from models.core_models import Comment, Post, User
+from models.relations_models import PostComment
+
+
+class CommentProjectionService:
+    """
+    Comments with their post and author, read for a whole page in one joined
+    query (comments -> post_comments -> posts, comments -> users) instead of
+    separate lookups per comment.
+    """
+
+    @classmethod
+    def _query(cls):
+        return db.session.query(Comment, PostComment.post_id, Post.title, User)\
+            .outerjoin(PostComment, PostComment.comment_id == Comment.id)\
+            .outerjoin(Post, Post.id == PostComment.post_id)\
+            .outerjoin(User, User.id == Comment.user_id)
+
+    @classmethod
+    def get_user_comment_rows(cls, user_id: int, offset: int = 0, limit: int = 20):
+        """
+        Get a page of a user's comments, newest first.
+
+        Args:
+            user_id: int
+            offset: int
+            limit: int
+        Returns:
+            list: [(Comment, post_id or None, post_title or None, User or None)]
+        """
+        return cls._query()\
+            .filter(Comment.user_id == user_id)\
+            .order_by(Comment.created_at.desc(), Comment.id.desc())\
+            .offset(offset)\
+            .limit(limit)\
+            .all()
+
+    @classmethod
+    def get_user_comments(cls, user_id: int, offset: int = 0, limit: int = 20):
+        """
+        Get a page of a user's comments as dicts, newest first.
+
+        Args:
+            user_id: int
+            offset: int
+            limit: int
+        Returns:
+            list of dict: comment fields with user_info, post_id and post_title
+        """
+        return [cls.to_dict(*row) for row in cls.get_user_comment_rows(user_id, offset, limit)]
+
+    @staticmethod
+    def to_dict(comment, post_id, post_title, user):
+        """Serialize one projected row."""
+        return {
+            "comment_id": comment.id,
+            "user_id": comment.user_id,
+            "user_info": user.to_dict() if user else {},
+            "content": comment.content,
+            "post_id": post_id,
+            "post_title": post_title,
+            "created_at": comment.created_at.isoformat() if comment.created_at else None,
+            "updated_at": comment.updated_at.isoformat() if comment.updated_at else None,
+        }
@@ -0,0 +1,148 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime
+from sqlalchemy import select
+from db import db
+from models.core_models import Film, Log, Post, User
+from models.relations_models import FilmRating
+from common.exception import ValidationException
+from common.message import Message
+from common.log_actions import LogActionUtils
+from config import EXPORT_BATCH_SIZE
+
+# rows encoded before a chunk is handed to the response
+_CHUNK_ROWS = 500
+
+
+class ExportService:
+    """
+    Streaming exports of whole tables for admins.
+
+    Rows are read through a server-side cursor (yield_per) and encoded as
+    CSV or NDJSON chunk by chunk, optionally gzip-compressed as they are
+    written, so memory use does not depend on the size of the table.
+    """
+
+    ENTITIES = ('logs', 'users', 'posts', 'ratings')
+    FORMATS = ('csv', 'ndjson')
+
+    @classmethod
+    def _select(cls, entity: str):
+        """
+        Returns:
+            tuple: (select statement, time column or None, user column, id column)
+        """
+        if entity == 'logs':
+            stmt = select(Log.id, Log.user_id, User.username, Log.action_type, Log.target_type, Log.target_id,
+                          Log.payload, Log.action, Log.created_at)\
+                .outerjoin(User, User.id == Log.user_id)
+            return stmt, Log.created_at, Log.user_id, Log.id
+        if entity == 'users':
+            # never exports password hashes
+            stmt = select(User.id, User.username, User.email, User.bio, User.avatar_url,
+                          User.created_at, User.updated_at)
+            return stmt, User.created_at, User.id, User.id
+        if entity == 'posts':
+            stmt = select(Post.id, Post.user_id, Post.title, Post.content, Post.like_count,
+                          Post.comment_count, Post.created_at, Post.updated_at)
+            return stmt, Post.created_at, Post.user_id, Post.id
+        if entity == 'ratings':
+            stmt = select(FilmRating.id, FilmRating.user_id, FilmRating.film_id,
+                          Film.title.label('film_title'), FilmRating.rating)\
+                .outerjoin(Film, Film.id == FilmRating.film_id)
+            return stmt, None, FilmRating.user_id, FilmRating.id
+        raise ValidationException(Message.EXPORT_ENTITY_INVALID)
+
+    @classmethod
+    def open(cls, entity: str, since: datetime = None, until: datetime = None, user_id: int = None):
+        """
+        Build an export query. Arguments are validated here, before any row is streamed.
+
+        Args:
+            entity: one of ENTITIES
+            since: datetime - only rows created at or after this time
+            until: datetime - only rows created before this time
+            user_id: int - only rows of this user
+        Returns:
+            tuple: (column names list, generator of row tuples)
+        """
+        stmt, time_column, user_column, id_column = cls._select(entity)
+        if time_column is None and (since or until):
+            raise ValidationException(Message.EXPORT_TIME_RANGE_UNSUPPORTED)
+
+        if since:
+            stmt = stmt.where(time_column >= since)
+        if until:
+            stmt = stmt.where(time_column < until)
+        if user_id is not None:
+            stmt = stmt.where(user_column == user_id)
+        order = (time_column, id_column) if time_column is not None else (id_column,)
+        stmt = stmt.order_by(*order)
+        if entity == 'logs':
+            return cls.LOG_COLUMNS, cls._describe_logs(cls._stream(stmt))
+        return list(stmt.selected_columns.keys()), cls._stream(stmt)
+
+    LOG_COLUMNS = ['id', 'user_id', 'username', 'action_type', 'target_type', 'target_id', 'payload',
+                   'action', 'created_at']
+
+    @staticmethod
+    def _describe_logs(rows):
+        """Render structured log rows: type names and the readable message."""
+        for log_id, user_id, username, action_type, target_type, target_id, payload, action, created_at in rows:
+            fields = LogActionUtils.describe(action_type, target_type, target_id, payload, action)
+            yield (log_id, user_id, username, fields['action_type'], fields['target_type'], target_id,
+                   payload, fields['action'], created_at)
+
+    @staticmethod
+    def _stream(stmt):
+        result = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        try:
+            for rows in result.partitions():
+                yield from rows
+        finally:
+            result.close()
+
+    @staticmethod
+    def _value(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+    @classmethod
+    def to_csv(cls, columns, rows):
+        """Encode rows as CSV with a header line. Yields str chunks."""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for i, row in enumerate(rows, 1):
+            writer.writerow([cls._value(value) for value in row])
+            if i % _CHUNK_ROWS == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    @classmethod
+    def to_ndjson(cls, columns, rows):
+        """Encode rows as one JSON object per line. Yields str chunks."""
+        lines = []
+        for row in rows:
+            lines.append(json.dumps({column: cls._value(value) for column, value in zip(columns, row)},
+                                    ensure_ascii=False))
+            if len(lines) == _CHUNK_ROWS:
+                yield '\n'.join(lines) + '\n'
+                lines = []
+        if lines:
+            yield '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def gzip(chunks):
+        """Compress str chunks into a gzip stream as they are produced. Yields bytes."""
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode('utf-8'))
+            if data:
+                yield data
+        yield compressor.flush()
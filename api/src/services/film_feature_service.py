@@ -0,0 +1,527 @@
+import os
+import json
+import struct
+import threading
+from contextlib import contextmanager
+import numpy as np
+from sqlalchemy import func
+from db import db
+from models.core_models import Film, Genre, Director
+from models.relations_models import FilmGenre, FilmDirector
+from config import RECOMMEND_SIMILAR_TOP_K, RECOMMEND_MATRIX_PATH
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, no lock between workers
+    fcntl = None
+
+
+class FilmIdIndex:
+    """
+    Read-only film id -> row mapping over the sorted film id array, so workers
+    share the id column of the mapped file instead of each building a dict.
+    """
+
+    def __init__(self, film_ids):
+        self._film_ids = film_ids
+
+    def get(self, film_id, default=None):
+        film_id = int(film_id)
+        row = int(np.searchsorted(self._film_ids, film_id))
+        if row < len(self._film_ids) and self._film_ids[row] == film_id:
+            return row
+        return default
+
+    def __getitem__(self, film_id):
+        row = self.get(film_id)
+        if row is None:
+            raise KeyError(film_id)
+        return row
+
+    def __contains__(self, film_id):
+        return self.get(film_id) is not None
+
+    def __len__(self):
+        return len(self._film_ids)
+
+
+class FilmFeatureService:
+    """
+    Cached film feature matrix shared by the recommenders.
+
+    Every film is encoded once (genre, language and director one-hot plus a
+    normalized release year) into a dense matrix kept with its row norms and
+    film id <-> row mappings. A top-k "more like this" list is precomputed per
+    film from it and stored compactly as (film_id, neighbor_ids[], scores[]).
+
+    Catalog changes patch the cache instead of rebuilding it: an added film is
+    scored against every row once and inserted into the lists it beats, and a
+    removed film only triggers a recompute for the films that listed it.
+
+    The arrays (float32 features) live in one versioned binary file that every
+    worker maps read-only with np.memmap, so the memory is paid once per host.
+    Writers publish a new version by writing a temp file and renaming it over
+    the old one; readers notice the new inode on their next access and remap.
+    Patches read the current file, modify it and replace it, so writers hold an
+    exclusive flock on a sidecar lock file and remap the latest version first;
+    otherwise two workers patching at once would lose one of the changes.
+
+    File layout: MAGIC, uint64 header length, JSON header (version, year
+    parameters, vocabularies, array offsets), then 64-byte aligned arrays.
+    """
+
+    # rows scored per matmul block when computing neighbor lists
+    BLOCK_SIZE = 1024
+    MAGIC = b'FHFEAT01'
+    ALIGNMENT = 64
+    ARRAYS = ('film_ids', 'matrix', 'norms', 'similar_ids', 'similar_scores')
+
+    _lock = threading.RLock()
+    _file_lock_depth = 0                       # nesting of _file_lock in the thread holding _lock
+    _built = False
+    _file_stat = None                          # (inode, mtime_ns, size) of the mapped file
+    _version = 0                               # bumped on every catalog change
+    _film_ids = np.empty(0, dtype=np.int64)   # row -> film id (sorted)
+    _id_to_index = FilmIdIndex(_film_ids)      # film id -> row
+    _matrix = np.zeros((0, 0), dtype=np.float32)  # (n, d) features
+    _norms = np.zeros(0, dtype=np.float32)        # (n,) row norms
+    _genre_index = {}                          # genre id -> column
+    _language_index = {}                       # language -> column
+    _director_index = {}                       # director id -> column
+    _year_column = 0
+    _min_year = 2000
+    _year_range = 1
+    _similar_ids = np.empty((0, 0), dtype=np.int64)       # (n, k) film ids, -1 padded
+    _similar_scores = np.empty((0, 0), dtype=np.float32)  # (n, k) cosine scores
+
+    @classmethod
+    def build(cls):
+        """
+        (Re)build the feature matrix and all similar-film lists from the database.
+        """
+        # vocabularies: genre, language, director one-hot + 1 normalized year column
+        genres = db.session.query(Genre.id).order_by(Genre.id).all()
+        genre_index = {g[0]: i for i, g in enumerate(genres)}
+
+        languages = db.session.query(Film.language).filter(Film.language.isnot(None)).distinct().all()
+        languages = sorted(lang[0] for lang in languages if lang[0])
+        language_index = {lang: len(genre_index) + i for i, lang in enumerate(languages)}
+
+        directors = db.session.query(Director.id).order_by(Director.id).all()
+        offset = len(genre_index) + len(language_index)
+        director_index = {d[0]: offset + i for i, d in enumerate(directors)}
+
+        year_column = offset + len(director_index)
+        total_features = year_column + 1
+
+        films = db.session.query(Film.id, Film.language, Film.release_date).order_by(Film.id).all()
+        years = [f.release_date.year for f in films if f.release_date]
+        if years:
+            min_year = min(years)
+            year_range = max(years) - min_year if max(years) > min_year else 1
+        else:
+            min_year = 2000  # default fallback
+            year_range = 1
+
+        # relations in two queries instead of two per film
+        film_genres = {}
+        for film_id, genre_id in db.session.query(FilmGenre.film_id, FilmGenre.genre_id).all():
+            film_genres.setdefault(film_id, []).append(genre_id)
+        film_directors = {}
+        for film_id, director_id in db.session.query(FilmDirector.film_id, FilmDirector.director_id).all():
+            film_directors.setdefault(film_id, []).append(director_id)
+
+        film_ids = np.array([f.id for f in films], dtype=np.int64)
+        matrix = np.zeros((len(films), total_features), dtype=np.float32)
+        for row, film in enumerate(films):
+            cls._encode(matrix[row], genre_index, language_index, director_index, year_column,
+                        min_year, year_range, film.language, film.release_date,
+                        film_genres.get(film.id, []), film_directors.get(film.id, []))
+
+        norms = np.linalg.norm(matrix, axis=1)
+        similar_ids, similar_scores = cls._top_k_rows(np.arange(len(films)), film_ids, matrix, norms)
+
+        with cls._lock, cls._file_lock():
+            cls._genre_index = genre_index
+            cls._language_index = language_index
+            cls._director_index = director_index
+            cls._year_column = year_column
+            cls._min_year = min_year
+            cls._year_range = year_range
+            cls._publish(film_ids, matrix, norms, similar_ids, similar_scores)
+
+    @classmethod
+    def _ensure_built(cls):
+        """Map the shared file on first use or after another worker replaced it."""
+        if cls._built and cls._stat() == cls._file_stat:
+            return
+        with cls._lock:
+            if cls._built and cls._stat() == cls._file_stat:
+                return
+            # a file left from an earlier run must still describe the catalog
+            if not cls._load(validate=not cls._built):
+                cls.build()
+
+    @classmethod
+    @contextmanager
+    def _file_lock(cls):
+        """
+        Hold the writer lock shared by all workers on this host. Must be
+        entered with the lock held; nested use is a no-op.
+        """
+        if cls._file_lock_depth or fcntl is None:
+            cls._file_lock_depth += 1
+            try:
+                yield
+            finally:
+                cls._file_lock_depth -= 1
+            return
+        os.makedirs(os.path.dirname(RECOMMEND_MATRIX_PATH), exist_ok=True)
+        with open(f"{RECOMMEND_MATRIX_PATH}.lock", 'a+b') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            cls._file_lock_depth = 1
+            try:
+                yield
+            finally:
+                cls._file_lock_depth = 0
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    @classmethod
+    def _sync(cls):
+        """Map the version another worker published since our last load. Must hold the file lock."""
+        if cls._stat() != cls._file_stat and not cls._load():
+            cls.build()
+
+    @staticmethod
+    def _stat():
+        try:
+            st = os.stat(RECOMMEND_MATRIX_PATH)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    @classmethod
+    def _publish(cls, film_ids, matrix, norms, similar_ids, similar_scores):
+        """
+        Write a new version of the shared file atomically and map it.
+        Must be called with the lock held and the vocabulary fields set.
+        """
+        arrays = {
+            'film_ids': np.ascontiguousarray(film_ids, dtype=np.int64),
+            'matrix': np.ascontiguousarray(matrix, dtype=np.float32),
+            'norms': np.ascontiguousarray(norms, dtype=np.float32),
+            'similar_ids': np.ascontiguousarray(similar_ids, dtype=np.int64),
+            'similar_scores': np.ascontiguousarray(similar_scores, dtype=np.float32),
+        }
+        layout = {}
+        offset = 0
+        for name in cls.ARRAYS:
+            layout[name] = {'dtype': arrays[name].dtype.str, 'shape': list(arrays[name].shape), 'offset': offset}
+            offset += -(-arrays[name].nbytes // cls.ALIGNMENT) * cls.ALIGNMENT
+
+        # versions are taken from the file so they stay monotonic across workers
+        header = json.dumps({
+            'version': max(cls._version, cls._read_header_version()) + 1,
+            'year_column': cls._year_column,
+            'min_year': cls._min_year,
+            'year_range': cls._year_range,
+            'genre_index': [[k, v] for k, v in cls._genre_index.items()],
+            'language_index': [[k, v] for k, v in cls._language_index.items()],
+            'director_index': [[k, v] for k, v in cls._director_index.items()],
+            'arrays': layout,
+        }).encode('utf-8')
+        data_start = -(-(len(cls.MAGIC) + 8 + len(header)) // cls.ALIGNMENT) * cls.ALIGNMENT
+
+        os.makedirs(os.path.dirname(RECOMMEND_MATRIX_PATH), exist_ok=True)
+        tmp_path = f"{RECOMMEND_MATRIX_PATH}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(cls.MAGIC)
+                f.write(struct.pack('<Q', len(header)))
+                f.write(header)
+                for name in cls.ARRAYS:
+                    f.seek(data_start + layout[name]['offset'])
+                    f.write(arrays[name].tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, RECOMMEND_MATRIX_PATH)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        if not cls._load():
+            raise RuntimeError(f"Failed to map film feature file {RECOMMEND_MATRIX_PATH}")
+
+    @classmethod
+    def _read_header(cls, f):
+        if f.read(len(cls.MAGIC)) != cls.MAGIC:
+            return None
+        (length,) = struct.unpack('<Q', f.read(8))
+        return json.loads(f.read(length).decode('utf-8')), -(-(len(cls.MAGIC) + 8 + length) // cls.ALIGNMENT) * cls.ALIGNMENT
+
+    @classmethod
+    def _read_header_version(cls):
+        try:
+            with open(RECOMMEND_MATRIX_PATH, 'rb') as f:
+                parsed = cls._read_header(f)
+        except (OSError, ValueError, struct.error):
+            return 0
+        return parsed[0]['version'] if parsed else 0
+
+    @classmethod
+    def _load(cls, validate: bool = False):
+        """
+        Map the shared file read-only. Must be called with the lock held.
+
+        Args:
+            validate: check the file against the films table (first load of a process)
+        Returns:
+            bool: False when the file is missing, corrupt or stale
+        """
+        try:
+            with open(RECOMMEND_MATRIX_PATH, 'rb') as f:
+                st = os.fstat(f.fileno())
+                parsed = cls._read_header(f)
+                if parsed is None:
+                    return False
+                header, data_start = parsed
+                arrays = {}
+                for name in cls.ARRAYS:
+                    spec = header['arrays'][name]
+                    shape = tuple(spec['shape'])
+                    if int(np.prod(shape)) == 0:
+                        arrays[name] = np.empty(shape, dtype=spec['dtype'])
+                    else:
+                        # mapping the open handle pins the inode read above, even if it is replaced meanwhile
+                        arrays[name] = np.memmap(f, dtype=spec['dtype'], mode='r',
+                                                 offset=data_start + spec['offset'], shape=shape)
+        except (OSError, ValueError, KeyError, struct.error):
+            return False
+
+        film_ids = arrays['film_ids']
+        if validate:
+            count, max_id = db.session.query(func.count(Film.id), func.max(Film.id)).one()
+            file_max_id = int(film_ids[-1]) if len(film_ids) else None
+            if count != len(film_ids) or max_id != file_max_id:
+                return False
+
+        cls._film_ids = film_ids
+        cls._id_to_index = FilmIdIndex(film_ids)
+        cls._matrix = arrays['matrix']
+        cls._norms = arrays['norms']
+        cls._similar_ids = arrays['similar_ids']
+        cls._similar_scores = arrays['similar_scores']
+        cls._genre_index = {int(k): v for k, v in header['genre_index']}
+        cls._language_index = {k: v for k, v in header['language_index']}
+        cls._director_index = {int(k): v for k, v in header['director_index']}
+        cls._year_column = header['year_column']
+        cls._min_year = header['min_year']
+        cls._year_range = header['year_range']
+        cls._version = header['version']
+        cls._file_stat = (st.st_ino, st.st_mtime_ns, st.st_size)
+        cls._built = True
+        return True
+
+    @staticmethod
+    def _encode(vector, genre_index, language_index, director_index, year_column,
+                min_year, year_range, language, release_date, genre_ids, director_ids):
+        """Fill one feature row in place."""
+        for genre_id in genre_ids:
+            if genre_id in genre_index:
+                vector[genre_index[genre_id]] = 1.0
+        if language and language in language_index:
+            vector[language_index[language]] = 1.0
+        for director_id in director_ids:
+            if director_id in director_index:
+                vector[director_index[director_id]] = 1.0
+        if release_date and release_date.year:
+            # clamp so films added outside the built year range stay comparable
+            vector[year_column] = min(1.0, max(0.0, (release_date.year - min_year) / year_range))
+
+    @classmethod
+    def _top_k_rows(cls, rows, film_ids, matrix, norms):
+        """
+        Compute top-k neighbor lists for the given rows against the whole matrix.
+
+        Returns:
+            tuple: (ids ndarray (len(rows), k), scores ndarray (len(rows), k))
+        """
+        k = RECOMMEND_SIMILAR_TOP_K
+        ids_out = np.full((len(rows), k), -1, dtype=np.int64)
+        scores_out = np.zeros((len(rows), k), dtype=np.float32)
+        n = len(film_ids)
+        if n <= 1 or len(rows) == 0:
+            return ids_out, scores_out
+
+        safe_norms = np.where(norms > 0, norms, 1.0)
+        normalized = matrix / safe_norms[:, None]
+        kk = min(k, n - 1)
+
+        for start in range(0, len(rows), cls.BLOCK_SIZE):
+            block = rows[start:start + cls.BLOCK_SIZE]
+            sims = normalized[block] @ normalized.T
+            sims[np.arange(len(block)), block] = -np.inf  # never list a film as its own neighbor
+            top = np.argpartition(-sims, kk - 1, axis=1)[:, :kk]
+            top_scores = np.take_along_axis(sims, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            ids_out[start:start + len(block), :kk] = film_ids[top]
+            scores_out[start:start + len(block), :kk] = top_scores
+
+        return ids_out, scores_out
+
+    @classmethod
+    def get_version(cls):
+        """
+        Get the catalog version of the cached matrix; it changes whenever films
+        are added or removed, so derived caches can detect stale entries.
+
+        Returns:
+            int
+        """
+        cls._ensure_built()
+        return cls._version
+
+    @classmethod
+    def get_feature_index(cls):
+        """
+        Get a consistent snapshot of the cached feature matrix.
+
+        Returns:
+            tuple: (film_ids ndarray, id_to_index dict, matrix ndarray, norms ndarray)
+        """
+        cls._ensure_built()
+        with cls._lock:
+            return cls._film_ids, cls._id_to_index, cls._matrix, cls._norms
+
+    @classmethod
+    def get_similar(cls, film_id: int, limit: int = None):
+        """
+        Get the precomputed most similar films of a film.
+
+        Args:
+            film_id: int
+            limit: optional max number of neighbors (capped at the stored top-k)
+        Returns:
+            list of (film_id, score) tuples, most similar first
+        """
+        cls._ensure_built()
+        with cls._lock:
+            row = cls._id_to_index.get(int(film_id))
+            if row is None:
+                return []
+            ids = cls._similar_ids[row]
+            scores = cls._similar_scores[row]
+        pairs = [(int(i), float(s)) for i, s in zip(ids, scores) if i >= 0 and s > 0]
+        return pairs[:limit] if limit else pairs
+
+    @classmethod
+    def add_film(cls, film_id: int):
+        """
+        Add a newly created film to the matrix and patch affected neighbor lists.
+
+        Args:
+            film_id: int
+        """
+        if not cls._built and cls._stat() is None:
+            # nothing published yet, the first build reads fresh data
+            return
+        cls._ensure_built()
+        film = db.session.query(Film).get(film_id)
+        if not film:
+            return
+        genre_ids = [r[0] for r in db.session.query(FilmGenre.genre_id).filter(FilmGenre.film_id == film_id).all()]
+        director_ids = [r[0] for r in db.session.query(FilmDirector.director_id).filter(FilmDirector.film_id == film_id).all()]
+
+        with cls._lock, cls._file_lock():
+            cls._sync()
+            if film_id in cls._id_to_index:
+                cls.remove_film(film_id)
+
+            # unseen vocabulary gets new trailing columns, existing rows are zero there
+            matrix = np.asarray(cls._matrix)
+            new_columns = 0
+            if film.language and film.language not in cls._language_index:
+                cls._language_index = dict(cls._language_index)
+                cls._language_index[film.language] = matrix.shape[1] + new_columns
+                new_columns += 1
+            for director_id in director_ids:
+                if director_id not in cls._director_index:
+                    cls._director_index = dict(cls._director_index)
+                    cls._director_index[director_id] = matrix.shape[1] + new_columns
+                    new_columns += 1
+            for genre_id in genre_ids:
+                if genre_id not in cls._genre_index:
+                    cls._genre_index = dict(cls._genre_index)
+                    cls._genre_index[genre_id] = matrix.shape[1] + new_columns
+                    new_columns += 1
+            if new_columns:
+                matrix = np.pad(matrix, ((0, 0), (0, new_columns)))
+
+            vector = np.zeros(matrix.shape[1], dtype=np.float32)
+            cls._encode(vector, cls._genre_index, cls._language_index, cls._director_index,
+                        cls._year_column, cls._min_year, cls._year_range,
+                        film.language, film.release_date, genre_ids, director_ids)
+
+            # rows stay sorted by film id so FilmIdIndex can binary search them
+            new_row = int(np.searchsorted(cls._film_ids, film_id))
+            matrix = np.insert(matrix, new_row, vector, axis=0)
+            norms = np.insert(cls._norms, new_row, np.linalg.norm(vector))
+            film_ids = np.insert(cls._film_ids, new_row, np.int64(film_id))
+
+            k = RECOMMEND_SIMILAR_TOP_K
+            similar_ids = np.insert(np.asarray(cls._similar_ids).reshape(-1, k), new_row,
+                                    np.full(k, -1, dtype=np.int64), axis=0)
+            similar_scores = np.insert(np.asarray(cls._similar_scores).reshape(-1, k), new_row,
+                                       np.zeros(k, dtype=np.float32), axis=0)
+
+            # the new film's own list
+            ids, scores = cls._top_k_rows(np.array([new_row]), film_ids, matrix, norms)
+            similar_ids[new_row] = ids[0]
+            similar_scores[new_row] = scores[0]
+
+            # insert the new film into every list whose weakest entry it beats
+            if norms[new_row] > 0:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    sims = np.where(norms > 0, (matrix @ vector) / (norms * norms[new_row]), 0.0)
+                sims[new_row] = -np.inf
+                weakest = np.where(similar_ids[:, -1] < 0, -np.inf, similar_scores[:, -1])
+                for row in np.nonzero((sims > weakest) & (sims > 0))[0]:
+                    pos = int(np.searchsorted(-similar_scores[row], -sims[row], side='right'))
+                    similar_ids[row, pos + 1:] = similar_ids[row, pos:-1].copy()
+                    similar_scores[row, pos + 1:] = similar_scores[row, pos:-1].copy()
+                    similar_ids[row, pos] = film_id
+                    similar_scores[row, pos] = sims[row]
+
+            cls._publish(film_ids, matrix, norms, similar_ids, similar_scores)
+
+    @classmethod
+    def remove_film(cls, film_id: int):
+        """
+        Remove a deleted film and recompute only the lists that referenced it.
+
+        Args:
+            film_id: int
+        """
+        if not cls._built and cls._stat() is None:
+            return
+        cls._ensure_built()
+        with cls._lock, cls._file_lock():
+            cls._sync()
+            row = cls._id_to_index.get(int(film_id))
+            if row is None:
+                return
+            film_ids = np.delete(cls._film_ids, row)
+            matrix = np.delete(cls._matrix, row, axis=0)
+            norms = np.delete(cls._norms, row)
+            similar_ids = np.delete(cls._similar_ids, row, axis=0)
+            similar_scores = np.delete(cls._similar_scores, row, axis=0)
+
+            affected = np.nonzero((similar_ids == film_id).any(axis=1))[0]
+            if len(affected):
+                ids, scores = cls._top_k_rows(affected, film_ids, matrix, norms)
+                similar_ids[affected] = ids
+                similar_scores[affected] = scores
+
+            cls._publish(film_ids, matrix, norms, similar_ids, similar_scores)
@@ -2,14 +2,22 @@ from models.core_models import Film, Genre, Director
 from models.relations_models import FilmGenre, FilmDirector, FilmRating, FilmFavorite
 from flask import current_app as app
 from db import db
-from common.uilts import FilmTrie
+from common.uilts import FilmTrie, LRUCache
 from common.validation import FilmValidation
 from common.exception import ValidationException
 from models.core_models import Tag
+from services.item_cf_service import ItemCFService
+from services.film_feature_service import FilmFeatureService
+from config import RECOMMEND_CF_WEIGHT, RECOMMEND_CACHE_SIZE, RECOMMEND_CACHE_TTL
 import numpy as np
 
 class FilmService:
 
+    # per-user recommended film ids: user_id -> (catalog_version, interactions_key, film_ids)
+    _recommendation_cache = LRUCache(RECOMMEND_CACHE_SIZE, RECOMMEND_CACHE_TTL)
+    # cold-start list shared by every user without interactions: catalog_version -> film_ids
+    _popular_cache = LRUCache(1, RECOMMEND_CACHE_TTL)
+
     @classmethod
     def get_film_by_id(cls, film_id: int, user_id=None):
         """
@@ -202,119 +210,90 @@ class FilmService:
             return []
 
     @classmethod
-    def get_recommendations(cls, user_id: int, limit: int = 5):
+    def get_recommendations(cls, user_id: int, limit: int = 5, cf_weight: float = None):
         """
         Recommend films using content-based filtering with 3-step pipeline:
-        1. Item Feature: Convert films to vectors using genre one-hot encoding
+        0. Cache: reuse the user's cached film ids while their interactions and the catalog are unchanged
+        1. Item Feature: Film vectors from the cached feature matrix (FilmFeatureService)
         2. User Profile: Create user vector by weighted average of positive feedback items
         3. Similarity Ranking: Calculate cosine similarity between user profile and item vectors
+        The content score is then blended with item-item collaborative scores.
 
         Args:
             user_id: int
             limit: number of recommendations
+            cf_weight: optional float 0-1, weight of the collaborative score
+                (defaults to RECOMMEND.CF_WEIGHT; 0 = content only, 1 = CF only)
         Returns:
             list of enriched film dicts
         """
 
-        # Step 1: (Item Feature) - Convert films to vectors using genre, language, director, year one-hot encoding
-        # Get all genres
-        all_genres = db.session.query(Genre).order_by(Genre.id).all()
-        genre_id_to_index = {genre.id: i for i, genre in enumerate(all_genres)}
-        num_genres = len(all_genres)
-
-        # Get all unique languages
-        all_languages = db.session.query(Film.language).filter(Film.language.isnot(None)).distinct().all()
-        all_languages = [lang[0] for lang in all_languages if lang[0]]
-        language_to_index = {lang: i for i, lang in enumerate(sorted(all_languages))}
-        num_languages = len(all_languages)
-
-        # Get all unique directors
-        all_directors = db.session.query(Director).order_by(Director.id).all()
-        director_id_to_index = {director.id: i for i, director in enumerate(all_directors)}
-        num_directors = len(all_directors)
-
-        # Get year range for normalization (continuous value)
-        all_years = db.session.query(Film.release_date).filter(Film.release_date.isnot(None)).distinct().all()
-        all_years = [date.year for date, in all_years if date and date.year]
-        if all_years:
-            min_year = min(all_years)
-            max_year = max(all_years)
-            year_range = max_year - min_year if max_year > min_year else 1
-        else:
-            min_year = 2000  # default fallback
-            year_range = 1
-
-        # Total feature dimension (year is now a single continuous value)
-        total_features = num_genres + num_languages + num_directors + 1  # +1 for normalized year
-
-        # Get all films with their features
-        films = db.session.query(Film).all()
-        film_features = {}
-
-        for film in films:
-            # Get film genres
-            film_genres = db.session.query(FilmGenre.genre_id).filter(FilmGenre.film_id == film.id).all()
-            genre_ids = [fg.genre_id for fg in film_genres]
-
-            # Get film directors
-            film_directors = db.session.query(FilmDirector.director_id).filter(FilmDirector.film_id == film.id).all()
-            director_ids = [fd.director_id for fd in film_directors]
-
-            # Create one-hot encoding vector
-            feature_vector = np.zeros(total_features)
-
-            # Add genre features
-            for genre_id in genre_ids:
-                if genre_id in genre_id_to_index:
-                    feature_vector[genre_id_to_index[genre_id]] = 1.0
-
-            # Add language feature
-            if film.language and film.language in language_to_index:
-                feature_vector[num_genres + language_to_index[film.language]] = 1.0
-
-            # Add director features
-            for director_id in director_ids:
-                if director_id in director_id_to_index:
-                    feature_vector[num_genres + num_languages + director_id_to_index[director_id]] = 1.0
-
-            # Add year feature (normalized continuous value 0-1)
-            if film.release_date and film.release_date.year:
-                normalized_year = (film.release_date.year - min_year) / year_range
-                feature_vector[total_features - 1] = normalized_year
-
-            film_features[film.id] = feature_vector
-
-        # Step 2: (User Profile) - Create user vector by weighted average of positive feedback
-        # Get user's positive feedback: ratings and favorites
         user_ratings = db.session.query(FilmRating.film_id, FilmRating.rating).filter(FilmRating.user_id == user_id).all()
         user_favorites = db.session.query(FilmFavorite.film_id).filter(FilmFavorite.user_id == user_id).all()
+        catalog_version = FilmFeatureService.get_version()
 
-        # Cold start: if user has no interactions, return popular films
+        # Cold start: if user has no interactions, return popular films (cached once, shared)
         if not user_ratings and not user_favorites:
-            popular_films = (db.session.query(Film)
-                           .filter(Film.vote_count.isnot(None))
-                           .order_by(Film.vote_count.desc())
-                           .limit(limit)
-                           .all())
-            return [cls._enrich_film_dict(film, user_id=user_id) for film in popular_films]
+            film_ids = cls._popular_cache.get(catalog_version)
+            if film_ids is None or len(film_ids) < limit:
+                film_ids = [f[0] for f in (db.session.query(Film.id)
+                                           .filter(Film.vote_count.isnot(None))
+                                           .order_by(Film.vote_count.desc())
+                                           .limit(limit)
+                                           .all())]
+                cls._popular_cache.set(catalog_version, film_ids)
+            return cls._enrich_film_ids(film_ids[:limit], user_id=user_id)
+
+        # Per-user cache; the interactions key also catches writes handled by other workers
+        use_cache = cf_weight is None
+        interactions_key = (tuple(sorted((r[0], r[1]) for r in user_ratings)),
+                            tuple(sorted(f[0] for f in user_favorites)))
+        if use_cache:
+            cached = cls._recommendation_cache.get(int(user_id))
+            if cached and cached[0] == catalog_version and cached[1] == interactions_key and len(cached[2]) >= limit:
+                return cls._enrich_film_ids(cached[2][:limit], user_id=user_id)
+
+        film_ids = cls._rank_recommendations(user_ratings, user_favorites, limit, cf_weight)
+        if use_cache:
+            cls._recommendation_cache.set(int(user_id), (catalog_version, interactions_key, film_ids))
+        return cls._enrich_film_ids(film_ids, user_id=user_id)
+
+    @classmethod
+    def _rank_recommendations(cls, user_ratings, user_favorites, limit: int, cf_weight: float = None):
+        """
+        Rank films for a user with interactions (steps 1-3 of get_recommendations).
+
+        Args:
+            user_ratings: list of (film_id, rating)
+            user_favorites: list of (film_id,)
+            limit: number of recommendations
+            cf_weight: optional collaborative weight override
+        Returns:
+            list of film ids, best first
+        """
+        # Step 1: (Item Feature) - genre, language, director one-hot + normalized year,
+        # served from the shared memory-mapped feature matrix
+        film_ids, id_to_index, feature_matrix, feature_norms = FilmFeatureService.get_feature_index()
 
+        # Step 2: (User Profile) - Create user vector by weighted average of positive feedback
         # Build user profile vector
-        user_profile = np.zeros(total_features)
+        # float32 like the shared matrix, so the product below never upcasts a copy of it
+        user_profile = np.zeros(feature_matrix.shape[1], dtype=feature_matrix.dtype)
         total_weight = 0.0
 
         # Process ratings (weight by rating score, rating is 0-10)
         for film_id, rating in user_ratings:
-            if film_id in film_features:
+            if film_id in id_to_index:
                 weight = rating  # Rating is 0-10, use directly as weight
-                user_profile += weight * film_features[film_id]
+                user_profile += weight * feature_matrix[id_to_index[film_id]]
                 total_weight += weight
 
         # Process favorites (higher weight than maximum rating)
         favorite_weight = 15.0  # Give favorites higher weight than max rating (10.0)
         for fav in user_favorites:
             film_id = fav.film_id
-            if film_id in film_features:
-                user_profile += favorite_weight * film_features[film_id]
+            if film_id in id_to_index:
+                user_profile += favorite_weight * feature_matrix[id_to_index[film_id]]
                 total_weight += favorite_weight
 
         # Normalize user profile
@@ -322,39 +301,71 @@ class FilmService:
             user_profile = user_profile / total_weight
 
         # Step 3: (Similarity Ranking & Recommendation)
-        # Calculate similarities between user profile and all film features
-        similarities = []
+        # Cosine similarity between user profile and all film features in one matrix-vector product
+        norm_user = np.linalg.norm(user_profile)
+        if norm_user == 0:
+            scores = np.zeros(len(film_ids))
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores = np.where(feature_norms > 0, (feature_matrix @ user_profile) / (feature_norms * norm_user), 0.0)
 
         # Get films user has already interacted with to exclude
         interacted_films = set()
         interacted_films.update([r.film_id for r in user_ratings])
         interacted_films.update([f.film_id for f in user_favorites])
 
-        for film_id, film_vector in film_features.items():
-            if film_id not in interacted_films:
-                # Calculate cosine similarity using numpy
-                dot_product = np.dot(user_profile, film_vector)
-                norm_user = np.linalg.norm(user_profile)
-                norm_film = np.linalg.norm(film_vector)
-
-                if norm_user == 0 or norm_film == 0:
-                    similarity = 0.0
-                else:
-                    similarity = dot_product / (norm_user * norm_film)
+        similarities = [(film_id, similarity) for film_id, similarity in zip(film_ids.tolist(), scores.tolist())
+                        if film_id not in interacted_films]
 
-                similarities.append((film_id, similarity))
+        # Blend with item-item collaborative scores (sparse neighbor lookups only)
+        if cf_weight is None:
+            cf_weight = RECOMMEND_CF_WEIGHT
+        if cf_weight > 0:
+            user_weights = ItemCFService.build_user_weights(user_ratings, [f.film_id for f in user_favorites])
+            cf_scores = ItemCFService.score_films(user_weights)
+            similarities = [(film_id, (1 - cf_weight) * similarity + cf_weight * cf_scores.get(film_id, 0.0))
+                            for film_id, similarity in similarities]
 
         # Sort by similarity (descending) and take top recommendations
         similarities.sort(key=lambda x: x[1], reverse=True)
 
-        # Get recommended films
-        recommended_films = []
-        for film_id, similarity in similarities[:limit]:
-            film = db.session.query(Film).get(film_id)
+        return [film_id for film_id, similarity in similarities[:limit]]
+
+    @classmethod
+    def _enrich_film_ids(cls, film_ids, user_id=None):
+        """
+        Load and enrich films by id, keeping the given order.
+
+        Args:
+            film_ids: list of int
+            user_id: optional int for personalization
+        Returns:
+            list of enriched film dicts
+        """
+        films = {f.id: f for f in db.session.query(Film).filter(Film.id.in_(film_ids)).all()} if film_ids else {}
+        return [cls._enrich_film_dict(films[fid], user_id=user_id) for fid in film_ids if fid in films]
+
+    @classmethod
+    def get_similar_films(cls, film_id: int, limit: int = 10, user_id=None):
+        """
+        Get "more like this" films from the precomputed neighbor lists.
+
+        Args:
+            film_id: int
+            limit: max number of films
+            user_id: optional int for personalization
+        Returns:
+            list of enriched film dicts with similarity score
+        """
+        result = []
+        for neighbor_id, score in FilmFeatureService.get_similar(film_id, limit):
+            film = db.session.query(Film).get(neighbor_id)
             if film:
-                recommended_films.append(cls._enrich_film_dict(film, user_id=user_id))
+                fdict = cls._enrich_film_dict(film, user_id=user_id)
+                fdict['similarity'] = round(score, 4)
+                result.append(fdict)
+        return result
 
-        return recommended_films
     @classmethod
     def _enrich_film_dict(cls, film_obj, user_id=None):
         """
@@ -0,0 +1,319 @@
+import threading
+import time
+import numpy as np
+from db import db
+from models.relations_models import FilmRating, FilmFavorite
+from config import RECOMMEND_CF_TOP_K, RECOMMEND_CF_REBUILD_SECONDS
+
+
+class ItemCFService:
+    """
+    Item-item collaborative filtering built from film ratings and favorites.
+
+    The engine keeps a sparse co-occurrence matrix (dict of dicts) and per-film
+    norms in memory, built once from the interaction tables and then patched
+    incrementally whenever a user's ratings or favorites change. Each film keeps
+    only its top-k neighbors; serving is a lookup over those lists, never a
+    matrix computation.
+
+    The matrix lives in each worker's memory. Only the worker that served a
+    rating or favorite patches its copy, so every worker rebuilds from the
+    tables every RECOMMEND.CF_REBUILD_SECONDS (0 disables this). Changes made
+    through other workers therefore show up within one interval.
+
+    Builds run on a background thread and swap in the finished matrix, so a
+    request never computes it. Until the first build is done, collaborative
+    scores are empty and recommendations are content based. Users and films
+    patched while a build runs are replayed onto the new matrix, since the
+    build may have read the tables before their change.
+    """
+
+    # weight of a favorite relative to a rating (ratings are scaled to 0-1),
+    # mirrors the content recommender where a favorite outweighs a 10/10 rating
+    FAVORITE_WEIGHT = 1.5
+    # seconds before a failed first build is retried
+    RETRY_SECONDS = 60
+
+    _lock = threading.RLock()
+    _app = None
+    _built = False
+    _built_at = None   # monotonic time of the last (re)build or attempt
+    _building = False
+    _pending_users = set()   # users refreshed while a build runs
+    _pending_films = set()   # films removed while a build runs
+    _user_items = {}   # user_id -> {film_id: weight}
+    _cooccur = {}      # film_id -> {film_id: sum_u(w_ui * w_uj)}
+    _norms = {}        # film_id -> sum_u(w_ui ** 2)
+    _neighbors = {}    # film_id -> (neighbor_ids ndarray, scores ndarray)
+    _dirty = set()     # films whose neighbor list must be recomputed
+
+    @classmethod
+    def init_app(cls, app):
+        """
+        Remember the app whose context the build thread uses.
+
+        Args:
+            app: Flask app
+        """
+        cls._app = app
+
+    @classmethod
+    def build_user_weights(cls, ratings, favorites):
+        """
+        Turn a user's rating and favorite rows into interaction weights.
+
+        Args:
+            ratings: iterable of (film_id, rating) with rating in 0-10
+            favorites: iterable of film_id
+        Returns:
+            dict: {film_id: weight}
+        """
+        weights = {}
+        for film_id, rating in ratings:
+            weights[film_id] = weights.get(film_id, 0.0) + float(rating or 0) / 10.0
+        for film_id in favorites:
+            weights[film_id] = weights.get(film_id, 0.0) + cls.FAVORITE_WEIGHT
+        return {fid: w for fid, w in weights.items() if w > 0}
+
+    @classmethod
+    def build(cls):
+        """
+        (Re)build the co-occurrence matrix from the interaction tables and swap
+        it in. Runs on the build thread; see _ensure_built.
+        """
+        ratings = db.session.query(FilmRating.user_id, FilmRating.film_id, FilmRating.rating).all()
+        favorites = db.session.query(FilmFavorite.user_id, FilmFavorite.film_id).all()
+
+        per_user_ratings = {}
+        per_user_favorites = {}
+        for user_id, film_id, rating in ratings:
+            per_user_ratings.setdefault(user_id, []).append((film_id, rating))
+        for user_id, film_id in favorites:
+            per_user_favorites.setdefault(user_id, []).append(film_id)
+
+        user_items = {}
+        for user_id in set(per_user_ratings) | set(per_user_favorites):
+            weights = cls.build_user_weights(per_user_ratings.get(user_id, []),
+                                             per_user_favorites.get(user_id, []))
+            if weights:
+                user_items[user_id] = weights
+
+        cooccur = {}
+        norms = {}
+        for weights in user_items.values():
+            items = list(weights.items())
+            for i, (film_i, w_i) in enumerate(items):
+                norms[film_i] = norms.get(film_i, 0.0) + w_i * w_i
+                row_i = cooccur.setdefault(film_i, {})
+                for film_j, w_j in items[i + 1:]:
+                    row_i[film_j] = row_i.get(film_j, 0.0) + w_i * w_j
+                    row_j = cooccur.setdefault(film_j, {})
+                    row_j[film_i] = row_j.get(film_i, 0.0) + w_i * w_j
+
+        with cls._lock:
+            cls._user_items = user_items
+            cls._cooccur = cooccur
+            cls._norms = norms
+            cls._neighbors = {}
+            cls._dirty = set(cooccur)
+            cls._built = True
+            cls._built_at = time.monotonic()
+
+    @classmethod
+    def _ensure_built(cls):
+        """Start a build when none exists yet or a rebuild is due. Never blocks on it."""
+        with cls._lock:
+            if cls._building or not cls._build_due():
+                return
+            cls._building = True
+        if cls._app is None or cls._app.testing:
+            # no app to run a thread in (scripts, tests): build inline
+            cls._rebuild()
+            return
+        threading.Thread(target=cls._run_build, name='item-cf-build', daemon=True).start()
+
+    @classmethod
+    def _build_due(cls):
+        if cls._built_at is None:
+            return True
+        elapsed = time.monotonic() - cls._built_at
+        if not cls._built:
+            return elapsed >= cls.RETRY_SECONDS
+        return RECOMMEND_CF_REBUILD_SECONDS > 0 and elapsed >= RECOMMEND_CF_REBUILD_SECONDS
+
+    @classmethod
+    def _run_build(cls):
+        try:
+            with cls._app.app_context():
+                cls._rebuild()
+        except Exception as e:
+            print(f"Item CF build failed: {e}")
+
+    @classmethod
+    def _rebuild(cls):
+        """Build, swap in, then replay the changes made while building."""
+        try:
+            cls.build()
+        finally:
+            with cls._lock:
+                cls._building = False
+                cls._built_at = time.monotonic()
+                users, cls._pending_users = cls._pending_users, set()
+                films, cls._pending_films = cls._pending_films, set()
+        for film_id in films:
+            cls.remove_film(film_id)
+        for user_id in users:
+            cls.refresh_user(user_id)
+
+    @classmethod
+    def refresh_user(cls, user_id: int):
+        """
+        Apply a user's latest ratings/favorites to the matrix incrementally.
+        Call after committing a rating or favorite write.
+
+        Args:
+            user_id: int
+        """
+        user_id = int(user_id)
+        with cls._lock:
+            if cls._building:
+                cls._pending_users.add(user_id)
+        if not cls._built:
+            # nothing to patch yet, the first build reads fresh data
+            return
+
+        ratings = db.session.query(FilmRating.film_id, FilmRating.rating).filter(FilmRating.user_id == user_id).all()
+        favorites = db.session.query(FilmFavorite.film_id).filter(FilmFavorite.user_id == user_id).all()
+        new = cls.build_user_weights(ratings, [f[0] for f in favorites])
+
+        with cls._lock:
+            old = cls._user_items.get(user_id, {})
+            changed = [fid for fid in set(old) | set(new) if old.get(fid, 0.0) != new.get(fid, 0.0)]
+            if not changed:
+                return
+            union = set(old) | set(new)
+            changed_set = set(changed)
+
+            for film_c in changed:
+                old_c = old.get(film_c, 0.0)
+                new_c = new.get(film_c, 0.0)
+                cls._norms[film_c] = cls._norms.get(film_c, 0.0) + new_c * new_c - old_c * old_c
+                if cls._norms[film_c] <= 1e-12:
+                    cls._norms.pop(film_c, None)
+
+                for film_j in union:
+                    if film_j == film_c:
+                        continue
+                    # pairs where both sides changed are handled once
+                    if film_j in changed_set and film_j < film_c:
+                        continue
+                    delta = new_c * new.get(film_j, 0.0) - old_c * old.get(film_j, 0.0)
+                    if delta:
+                        cls._add_cooccur(film_c, film_j, delta)
+                        cls._add_cooccur(film_j, film_c, delta)
+
+                # a norm change moves every similarity involving this film
+                cls._dirty.update(cls._cooccur.get(film_c, {}).keys())
+
+            cls._dirty.update(union)
+
+            if new:
+                cls._user_items[user_id] = new
+            else:
+                cls._user_items.pop(user_id, None)
+
+    @classmethod
+    def remove_film(cls, film_id: int):
+        """
+        Drop a deleted film from the matrix and from neighbor lists.
+
+        Args:
+            film_id: int
+        """
+        with cls._lock:
+            if cls._building:
+                cls._pending_films.add(film_id)
+            if not cls._built:
+                return
+            row = cls._cooccur.pop(film_id, {})
+            for other in row:
+                cls._cooccur.get(other, {}).pop(film_id, None)
+                cls._dirty.add(other)
+            cls._norms.pop(film_id, None)
+            cls._neighbors.pop(film_id, None)
+            cls._dirty.discard(film_id)
+            for weights in cls._user_items.values():
+                weights.pop(film_id, None)
+
+    @classmethod
+    def _add_cooccur(cls, film_i: int, film_j: int, delta: float):
+        row = cls._cooccur.setdefault(film_i, {})
+        value = row.get(film_j, 0.0) + delta
+        if abs(value) <= 1e-12:
+            row.pop(film_j, None)
+            if not row:
+                cls._cooccur.pop(film_i, None)
+        else:
+            row[film_j] = value
+
+    @classmethod
+    def _compute_neighbors(cls, film_id: int):
+        """Recompute the top-k neighbor list of one film from its sparse row."""
+        row = cls._cooccur.get(film_id)
+        norm_i = cls._norms.get(film_id, 0.0)
+        if not row or norm_i <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        ids = np.fromiter(row.keys(), dtype=np.int64, count=len(row))
+        counts = np.fromiter(row.values(), dtype=np.float64, count=len(row))
+        norms = np.fromiter((cls._norms.get(int(j), 0.0) for j in ids), dtype=np.float64, count=len(ids))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scores = np.where(norms > 0, counts / np.sqrt(norm_i * norms), 0.0)
+
+        k = min(RECOMMEND_CF_TOP_K, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        keep = scores[top] > 0
+        return ids[top][keep], scores[top][keep].astype(np.float32)
+
+    @classmethod
+    def get_neighbors(cls, film_id: int):
+        """
+        Get the top-k most similar films by co-occurrence.
+
+        Args:
+            film_id: int
+        Returns:
+            tuple: (neighbor_ids ndarray, scores ndarray)
+        """
+        cls._ensure_built()
+        with cls._lock:
+            if not cls._built:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            if film_id in cls._dirty or film_id not in cls._neighbors:
+                cls._neighbors[film_id] = cls._compute_neighbors(film_id)
+                cls._dirty.discard(film_id)
+            return cls._neighbors[film_id]
+
+    @classmethod
+    def score_films(cls, user_weights: dict):
+        """
+        Score candidate films for a user from the neighbor lists of the films
+        they interacted with (weighted average of item similarities).
+
+        Args:
+            user_weights: {film_id: weight} from build_user_weights
+        Returns:
+            dict: {film_id: score in 0-1}
+        """
+        scores = {}
+        total_weight = sum(user_weights.values())
+        if total_weight <= 0:
+            return scores
+
+        for film_id, weight in user_weights.items():
+            neighbor_ids, neighbor_scores = cls.get_neighbors(film_id)
+            for neighbor_id, score in zip(neighbor_ids.tolist(), neighbor_scores.tolist()):
+                scores[neighbor_id] = scores.get(neighbor_id, 0.0) + weight * score
+
+        return {fid: s / total_weight for fid, s in scores.items()}
@@ -0,0 +1,175 @@
+import atexit
+import threading
+import time
+from sqlalchemy import case, func
+from db import db
+from models.core_models import Post
+from config import POST_LIKE_BUFFERED, POST_LIKE_FLUSH_INTERVAL
+
+
+class LikeCounterService:
+    """
+    Applies like_count changes to posts.
+
+    By default every change is an atomic `UPDATE posts SET like_count =
+    like_count + delta` issued inside the caller's transaction. With
+    POST.LIKE_BUFFERED enabled, deltas are summed in memory per post and a
+    background thread flushes them every POST.LIKE_FLUSH_INTERVAL seconds, one
+    UPDATE per post per interval. A hot post then takes one row write per
+    interval instead of one per like. Stored counts may lag by about one
+    interval, and `stats()` reports how far behind they are.
+    """
+
+    _lock = threading.Lock()
+    _pending = {}            # post_id -> summed delta not yet written
+    _oldest_pending = None   # monotonic time of the oldest unflushed delta
+    _app = None
+    _thread = None
+    _stop = threading.Event()
+    _flushes = 0
+    _flushed_rows = 0
+    _last_flush_seconds = 0.0
+    _max_staleness_seconds = 0.0
+
+    @classmethod
+    def init_app(cls, app):
+        """
+        Start the flush thread when buffering is enabled.
+
+        Args:
+            app: Flask app whose context the flush thread uses
+        """
+        cls._app = app
+        if not POST_LIKE_BUFFERED or cls._thread is not None:
+            return
+        cls._stop.clear()
+        cls._thread = threading.Thread(target=cls._run, name='like-counter-flush', daemon=True)
+        cls._thread.start()
+        atexit.register(cls.shutdown)
+
+    @classmethod
+    def is_buffered(cls):
+        return cls._thread is not None
+
+    @classmethod
+    def apply(cls, post_id: int, delta: int):
+        """
+        Record a like_count change. Unbuffered changes join the caller's
+        transaction and are written when it commits.
+
+        Args:
+            post_id: int
+            delta: +1 / -1
+        """
+        if not cls.is_buffered():
+            cls._update(post_id, delta)
+            return
+        with cls._lock:
+            cls._pending[post_id] = cls._pending.get(post_id, 0) + delta
+            if cls._oldest_pending is None:
+                cls._oldest_pending = time.monotonic()
+
+    @classmethod
+    def pending_delta(cls, post_id: int):
+        """
+        Unflushed delta for a post in this worker, added to the stored count
+        when rendering so a user sees their own like immediately.
+
+        Args:
+            post_id: int
+        Returns:
+            int
+        """
+        return cls._pending.get(post_id, 0)
+
+    @staticmethod
+    def _update(post_id: int, delta: int):
+        new_count = func.coalesce(Post.like_count, 0) + delta
+        db.session.query(Post).filter(Post.id == post_id).update(
+            {Post.like_count: case((new_count > 0, new_count), else_=0)}, synchronize_session=False)
+
+    @classmethod
+    def flush(cls):
+        """
+        Write all pending deltas, one UPDATE per post in a single transaction.
+        Must run inside an app context.
+
+        Returns:
+            int: number of posts updated
+        """
+        with cls._lock:
+            pending, cls._pending = cls._pending, {}
+            oldest, cls._oldest_pending = cls._oldest_pending, None
+        pending = {post_id: delta for post_id, delta in pending.items() if delta}
+        if not pending:
+            return 0
+
+        start = time.monotonic()
+        try:
+            for post_id, delta in pending.items():
+                cls._update(post_id, delta)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            # keep the deltas for the next attempt
+            with cls._lock:
+                for post_id, delta in pending.items():
+                    cls._pending[post_id] = cls._pending.get(post_id, 0) + delta
+                if oldest is not None and (cls._oldest_pending is None or oldest < cls._oldest_pending):
+                    cls._oldest_pending = oldest
+            raise
+
+        now = time.monotonic()
+        cls._flushes += 1
+        cls._flushed_rows += len(pending)
+        cls._last_flush_seconds = now - start
+        if oldest is not None:
+            cls._max_staleness_seconds = max(cls._max_staleness_seconds, now - oldest)
+        return len(pending)
+
+    @classmethod
+    def _run(cls):
+        while not cls._stop.wait(POST_LIKE_FLUSH_INTERVAL):
+            try:
+                with cls._app.app_context():
+                    cls.flush()
+            except Exception as e:
+                print(f"Like counter flush failed: {e}")
+
+    @classmethod
+    def shutdown(cls):
+        """Stop the flush thread and write what is still pending."""
+        if cls._thread is None:
+            return
+        cls._stop.set()
+        cls._thread.join(timeout=POST_LIKE_FLUSH_INTERVAL + 1)
+        cls._thread = None
+        try:
+            with cls._app.app_context():
+                cls.flush()
+        except Exception as e:
+            print(f"Like counter flush failed: {e}")
+
+    @classmethod
+    def stats(cls):
+        """
+        Buffering statistics for this worker.
+
+        Returns:
+            dict
+        """
+        with cls._lock:
+            pending_posts = len(cls._pending)
+            pending_likes = sum(abs(d) for d in cls._pending.values())
+            oldest = cls._oldest_pending
+        return {
+            'buffered': cls.is_buffered(),
+            'flush_interval_seconds': POST_LIKE_FLUSH_INTERVAL,
+            'pending_posts': pending_posts,
+            'pending_likes': pending_likes,
+            'current_staleness_seconds': round(time.monotonic() - oldest, 3) if oldest is not None else 0.0,
+            'max_staleness_seconds': round(cls._max_staleness_seconds, 3),
+            'flushes': cls._flushes,
+            'flushed_rows': cls._flushed_rows,
+            'last_flush_seconds': round(cls._last_flush_seconds, 4),
+        }
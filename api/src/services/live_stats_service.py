@@ -0,0 +1,173 @@
+import queue
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import func
+from db import db
+from models.core_models import UserDailyActivity
+from common.exception import ValidationException
+from common.message import Message
+from services.log_service import LogService
+from services.stat_counter_service import StatCounterService
+from config import LIVE_INTERVAL, LIVE_BUFFER_SIZE, LIVE_MAX_CLIENTS
+
+
+class LiveStatsService:
+    """
+    Live admin dashboard metrics, fanned out to the open dashboards.
+
+    One publisher thread per worker reads the stat counters and the log
+    rollups every LIVE.INTERVAL seconds. It compares them with the previous
+    reading and puts only the changed values on each subscriber's queue. The
+    database therefore sees the same few primary-key reads per interval
+    however many dashboards are open. The thread only runs while someone is
+    subscribed.
+
+    Each subscriber queue holds at most LIVE.BUFFER_SIZE events. When a slow
+    client falls that far behind, its queue is replaced by a single snapshot
+    of the current values. Memory stays bounded and the client stays correct.
+    """
+
+    _lock = threading.Lock()
+    _subscribers = set()
+    _last = None            # latest snapshot, the base of the next deltas
+    _app = None
+    _thread = None
+    _published = 0
+    _resyncs = 0
+
+    @classmethod
+    def init_app(cls, app):
+        """
+        Remember the app whose context the publisher thread uses.
+
+        Args:
+            app: Flask app
+        """
+        cls._app = app
+
+    @classmethod
+    def subscribe(cls):
+        """
+        Register a subscriber. Its queue starts with a snapshot of the
+        current values. Must run inside an app context.
+
+        Returns:
+            queue.Queue of (event, data) tuples
+        """
+        # with the publisher idle, the last snapshot may be stale
+        snapshot = cls._read() if cls._thread is None else None
+        with cls._lock:
+            if len(cls._subscribers) >= LIVE_MAX_CLIENTS:
+                raise ValidationException(Message.LIVE_TOO_MANY_CLIENTS)
+            if snapshot is not None and cls._thread is None:
+                cls._last = snapshot
+            subscriber = queue.Queue(maxsize=LIVE_BUFFER_SIZE)
+            subscriber.put_nowait(('snapshot', cls._last))
+            cls._subscribers.add(subscriber)
+            if cls._thread is None:
+                cls._thread = threading.Thread(target=cls._run, name='live-stats-publisher', daemon=True)
+                cls._thread.start()
+        return subscriber
+
+    @classmethod
+    def unsubscribe(cls, subscriber):
+        with cls._lock:
+            cls._subscribers.discard(subscriber)
+
+    @classmethod
+    def _run(cls):
+        while True:
+            time.sleep(LIVE_INTERVAL)
+            with cls._lock:
+                if not cls._subscribers:
+                    # the next subscriber starts a new thread
+                    cls._thread = None
+                    return
+            try:
+                with cls._app.app_context():
+                    snapshot = cls._read()
+            except Exception as e:
+                print(f"Live stats publisher failed to read metrics: {e}")
+                continue
+            cls._publish(snapshot)
+
+    @classmethod
+    def _publish(cls, snapshot):
+        """Send the values that changed since the last snapshot to every subscriber."""
+        with cls._lock:
+            delta = cls._diff(cls._last, snapshot)
+            cls._last = snapshot
+            if not delta:
+                return
+            for subscriber in cls._subscribers:
+                try:
+                    subscriber.put_nowait(('delta', delta))
+                except queue.Full:
+                    cls._resync(subscriber, snapshot)
+            cls._published += 1
+
+    @classmethod
+    def _resync(cls, subscriber, snapshot):
+        """Replace the backlog of a slow subscriber with one snapshot."""
+        while True:
+            try:
+                subscriber.get_nowait()
+            except queue.Empty:
+                break
+        subscriber.put_nowait(('snapshot', snapshot))
+        cls._resyncs += 1
+
+    @staticmethod
+    def _diff(previous, current):
+        """
+        Changed values per group, each with its change.
+
+        Returns:
+            dict: { group: { name: { 'value': int, 'delta': int } } }, empty when nothing changed
+        """
+        delta = {}
+        for group, values in current.items():
+            before = previous.get(group, {}) if previous else {}
+            changed = {name: {'value': value, 'delta': value - before.get(name, 0)}
+                       for name, value in values.items() if before.get(name) != value}
+            if changed:
+                delta[group] = changed
+        return delta
+
+    @staticmethod
+    def _read():
+        """
+        Current dashboard values, from the stat counters and the daily rollups.
+
+        Returns:
+            dict: {
+                'stats': { 'total_users', 'total_posts', 'total_comments', 'total_films' },
+                'access': { 'today', 'this_hour', 'week', 'month', 'year', 'active_users_today' }
+            }
+        """
+        totals = StatCounterService.get_totals()
+        # the hourly series is not a single value; this_hour carries its latest bucket
+        access = {name: value for name, value in LogService.get_access_stats().items() if name != 'hourly'}
+        access['active_users_today'] = db.session.query(func.count())\
+            .select_from(UserDailyActivity)\
+            .filter(UserDailyActivity.day == datetime.now().date()).scalar()
+        return {
+            'stats': {f'total_{name}': value for name, value in totals.items()},
+            'access': access,
+        }
+
+    @classmethod
+    def stats(cls):
+        """
+        Publisher statistics for this worker.
+
+        Returns:
+            dict
+        """
+        return {
+            'running': cls._thread is not None,
+            'subscribers': len(cls._subscribers),
+            'published': cls._published,
+            'resyncs': cls._resyncs,
+        }
@@ -0,0 +1,177 @@
+import glob
+import gzip
+import json
+import os
+from datetime import date, datetime, timedelta
+from db import db
+from models.core_models import Log
+from common.log_actions import LogActionUtils
+from config import LOG_RETENTION_DAYS, LOG_ARCHIVE_DIR, LOG_ARCHIVE_BATCH_SIZE
+
+
+class LogArchiveService:
+    """
+    Moves old logs out of the hot `logs` table into one gzip NDJSON file per
+    day under LOG.ARCHIVE_DIR (YYYY/MM/logs-YYYY-MM-DD.ndjson.gz), then
+    deletes them from the table in batches. The hourly and daily rollups keep
+    counting archived logs, so access stats do not change.
+
+    A day is archived by writing its file to a temporary name and renaming
+    it, and only then deleting the rows. If a run stops after the rename, the
+    next run merges the remaining rows into the existing file by id, so
+    archiving can be repeated safely.
+    """
+
+    @classmethod
+    def _path(cls, day: date):
+        return os.path.join(LOG_ARCHIVE_DIR, f"{day:%Y}", f"{day:%m}", f"logs-{day:%Y-%m-%d}.ndjson.gz")
+
+    @staticmethod
+    def _row(log):
+        return {'id': log.id, 'user_id': log.user_id, 'action': log.action,
+                'action_type': log.action_type, 'target_type': log.target_type,
+                'target_id': log.target_id, 'payload': log.payload,
+                'created_at': log.created_at.isoformat()}
+
+    @staticmethod
+    def _present(row):
+        """Render an archived row like Log.to_dict; files written before structured logging only have text."""
+        fields = (row.get('action_type'), row.get('target_type'), row.get('target_id'), row.get('payload'))
+        if fields[0] is None:
+            fields = LogActionUtils.parse_legacy(row.get('action')) or fields
+        return {
+            'id': row['id'],
+            'user_id': row['user_id'],
+            **LogActionUtils.describe(*fields, row.get('action')),
+            'created_at': row['created_at'],
+        }
+
+    @classmethod
+    def archive(cls, retention_days: int = None):
+        """
+        Archive and delete logs older than the retention period, one day at a time.
+
+        Args:
+            retention_days: optional int, defaults to LOG.RETENTION_DAYS; 0 keeps everything
+        Returns:
+            dict: { 'days': int, 'archived': int, 'deleted': int }
+        """
+        retention_days = LOG_RETENTION_DAYS if retention_days is None else retention_days
+        result = {'days': 0, 'archived': 0, 'deleted': 0}
+        if retention_days <= 0:
+            return result
+
+        cutoff = datetime.combine(date.today() - timedelta(days=retention_days), datetime.min.time())
+        start = datetime.min
+        while True:
+            # jump to the next day that has logs, through the created_at index
+            oldest = db.session.query(db.func.min(Log.created_at))\
+                .filter(Log.created_at >= start, Log.created_at < cutoff).scalar()
+            if oldest is None:
+                return result
+            start = datetime.combine(oldest.date(), datetime.min.time())
+            end = start + timedelta(days=1)
+            result['days'] += 1
+            result['archived'] += cls._archive_day(oldest.date(), start, end)
+            result['deleted'] += cls._delete_range(start, end)
+            start = end
+
+    @classmethod
+    def _archive_day(cls, day: date, start: datetime, end: datetime):
+        """Write one day's logs to its partition file. Returns the number of new rows written."""
+        path = cls._path(day)
+        existing = list(cls._read_file(path)) if os.path.exists(path) else []
+        known = {row['id'] for row in existing}
+
+        rows = []
+        query = db.session.query(Log)\
+            .filter(Log.created_at >= start, Log.created_at < end)\
+            .order_by(Log.created_at, Log.id)
+        for log in query.yield_per(LOG_ARCHIVE_BATCH_SIZE):
+            if log.id not in known:
+                rows.append(cls._row(log))
+        if not rows:
+            return 0
+
+        rows = sorted(existing + rows, key=lambda row: (row['created_at'], row['id']))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as fh:
+            for row in rows:
+                fh.write(json.dumps(row, ensure_ascii=False) + '\n')
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+        return len(rows) - len(existing)
+
+    @classmethod
+    def _delete_range(cls, start: datetime, end: datetime):
+        """Delete logs in [start, end) in batches, committing after each one."""
+        deleted = 0
+        while True:
+            ids = [r[0] for r in db.session.query(Log.id)
+                   .filter(Log.created_at >= start, Log.created_at < end)
+                   .limit(LOG_ARCHIVE_BATCH_SIZE).all()]
+            if not ids:
+                return deleted
+            deleted += db.session.query(Log).filter(Log.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+
+    @staticmethod
+    def _read_file(path: str):
+        with gzip.open(path, 'rt', encoding='utf-8') as fh:
+            for line in fh:
+                if line.strip():
+                    yield json.loads(line)
+
+    @classmethod
+    def get_days(cls):
+        """
+        Archived days, oldest first.
+
+        Returns:
+            list of date
+        """
+        days = []
+        for path in glob.glob(os.path.join(LOG_ARCHIVE_DIR, '*', '*', 'logs-*.ndjson.gz')):
+            try:
+                days.append(datetime.strptime(os.path.basename(path)[5:15], '%Y-%m-%d').date())
+            except ValueError:
+                continue
+        return sorted(days)
+
+    @classmethod
+    def iter_logs(cls, since: datetime = None, until: datetime = None, user_id: int = None, before=None):
+        """
+        Read archived logs newest first, opening only the partitions in range.
+
+        Args:
+            since: datetime - only logs at or after this time
+            until: datetime - only logs before this time
+            user_id: int - only logs of this user
+            before: (created_at datetime, id int) - only logs strictly before this key (cursor)
+        Returns:
+            generator of dicts shaped like Log.to_dict
+        """
+        for day in reversed(cls.get_days()):
+            if since is not None and day < since.date():
+                return
+            if until is not None and day > until.date():
+                continue
+            if before is not None and day > before[0].date():
+                continue
+            rows = []
+            for row in cls._read_file(cls._path(day)):
+                created_at = datetime.fromisoformat(row['created_at'])
+                if user_id is not None and row['user_id'] != user_id:
+                    continue
+                if since is not None and created_at < since:
+                    continue
+                if until is not None and created_at >= until:
+                    continue
+                if before is not None and (created_at, row['id']) >= before:
+                    continue
+                rows.append(row)
+            rows.sort(key=lambda row: (row['created_at'], row['id']), reverse=True)
+            for row in rows:
+                yield cls._present(row)
@@ -1,32 +1,195 @@
-from models.core_models import Log
+import atexit
+import queue
+import threading
+import time
+from collections import Counter
+from sqlalchemy import and_, func, insert, or_
+from models.core_models import Log, LogHourlyCount, LogDailyCount, LogDailyActionCount
 from db import db
 from flask import current_app as app
-from datetime import datetime, timedelta
+from common.uilts import CursorUtils, DBUtils
+from common.log_actions import ACTION_SPECS, LogAction, LogActionUtils
+from services.activity_service import ActivityService
+from datetime import date, datetime, timedelta
+from config import LOG_ASYNC, LOG_QUEUE_SIZE, LOG_BATCH_SIZE, LOG_FLUSH_INTERVAL, LOG_PUT_TIMEOUT, LOG_COUNT_CAP
 
 class LogService:
     """
     Service for logging user actions to database.
+
+    With LOG.ASYNC enabled (the default), log_action only puts the entry on a
+    bounded in-process queue. A writer thread drains it and inserts up to
+    LOG.BATCH_SIZE rows per statement, at least every LOG.FLUSH_INTERVAL
+    seconds, so a request no longer pays for a second commit. When the queue
+    is full a request waits at most LOG.PUT_TIMEOUT seconds, then the entry is
+    dropped and counted. Pending entries are written at shutdown. In testing,
+    or without the writer thread, entries are written synchronously.
     """
 
+    _queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _app = None
+    _thread = None
+    _stop = threading.Event()
+    _written = 0
+    _dropped = 0
+    _failed = 0
+    _batches = 0
+    _last_batch_seconds = 0.0
+
+    @classmethod
+    def init_app(cls, app):
+        """
+        Start the log writer thread when asynchronous logging is enabled.
+
+        Args:
+            app: Flask app whose context the writer thread uses
+        """
+        cls._app = app
+        if not LOG_ASYNC or cls._thread is not None:
+            return
+        cls._stop.clear()
+        cls._thread = threading.Thread(target=cls._run, name='log-writer', daemon=True)
+        cls._thread.start()
+        atexit.register(cls.shutdown)
+
     @classmethod
-    def log_action(cls, user_id: int, action: str):
+    def log_action(cls, user_id: int, action_type: LogAction, target_id: int = None, payload: dict = None):
         """
         Log a user action to the database.
 
         Args:
             user_id: int - ID of the user performing the action
-            action: str - Description of the action performed
+            action_type: LogAction - what was done; also fixes the target type
+            target_id: int - ID of the post, comment, film, tag or user acted on
+            payload: dict - small extra values used by the message template (optional)
         """
+        entry = {
+            'user_id': user_id,
+            'action': '',
+            'action_type': int(action_type),
+            'target_type': int(ACTION_SPECS[action_type][0]),
+            'target_id': target_id,
+            'payload': LogActionUtils.encode_payload(payload),
+            'created_at': datetime.now()
+        }
+        message = LogActionUtils.render(action_type, target_id, payload)
         try:
-            log_entry = Log(user_id=user_id, action=action, created_at=datetime.now())
-            db.session.add(log_entry)
-            db.session.commit()
+            if cls._thread is None or app.testing:
+                cls._write([entry])
+            else:
+                try:
+                    cls._queue.put(entry, timeout=LOG_PUT_TIMEOUT)
+                except queue.Full:
+                    cls._dropped += 1
+                    app.logger.warning(f"Log queue full, dropped action for user {user_id}: {message}")
+                    return
 
             # Also log to console for debugging
-            app.logger.info(f"User {user_id} action logged: {action}")
+            app.logger.info(f"User {user_id} action logged: {message}")
         except Exception as e:
             # If database logging fails, at least log to console
-            app.logger.error(f"Failed to log action for user {user_id}: {action} - Error: {e}")
+            app.logger.error(f"Failed to log action for user {user_id}: {message} - Error: {e}")
+
+    @classmethod
+    def _write(cls, entries):
+        """Insert a batch of log rows in one statement and add them to the rollups and activity counters, in one commit."""
+        start = time.monotonic()
+        try:
+            db.session.execute(insert(Log), entries)
+            cls._add_to_rollups(entries)
+            ActivityService.record(entries)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            cls._failed += len(entries)
+            raise
+        cls._written += len(entries)
+        cls._batches += 1
+        cls._last_batch_seconds = time.monotonic() - start
+
+    @classmethod
+    def _next_batch(cls):
+        """Block for the first entry, then collect more until the batch is full or the interval ends."""
+        try:
+            batch = [cls._queue.get(timeout=LOG_FLUSH_INTERVAL)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+        while len(batch) < LOG_BATCH_SIZE:
+            remaining = 0 if cls._stop.is_set() else deadline - time.monotonic()
+            try:
+                batch.append(cls._queue.get(timeout=remaining) if remaining > 0 else cls._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    @classmethod
+    def _run(cls):
+        while True:
+            batch = cls._next_batch()
+            if batch:
+                try:
+                    with cls._app.app_context():
+                        cls._write(batch)
+                except Exception as e:
+                    print(f"Log writer failed to insert {len(batch)} entries: {e}")
+            elif cls._stop.is_set():
+                return
+
+    @classmethod
+    def flush(cls):
+        """
+        Write everything queued so far from the calling thread. Must run
+        inside an app context.
+
+        Returns:
+            int: number of entries written
+        """
+        written = 0
+        while True:
+            batch = []
+            while len(batch) < LOG_BATCH_SIZE:
+                try:
+                    batch.append(cls._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return written
+            cls._write(batch)
+            written += len(batch)
+
+    @classmethod
+    def shutdown(cls):
+        """Stop the writer thread and write what is still queued."""
+        if cls._thread is None:
+            return
+        cls._stop.set()
+        cls._thread.join(timeout=LOG_FLUSH_INTERVAL * 2 + 5)
+        cls._thread = None
+        try:
+            with cls._app.app_context():
+                cls.flush()
+        except Exception as e:
+            print(f"Log writer failed to flush at shutdown: {e}")
+
+    @classmethod
+    def writer_stats(cls):
+        """
+        Log writer statistics for this worker.
+
+        Returns:
+            dict
+        """
+        return {
+            'async': cls._thread is not None,
+            'queued': cls._queue.qsize(),
+            'queue_size': LOG_QUEUE_SIZE,
+            'written': cls._written,
+            'dropped': cls._dropped,
+            'failed': cls._failed,
+            'batches': cls._batches,
+            'last_batch_seconds': round(cls._last_batch_seconds, 4),
+        }
 
     @classmethod
     def get_user_logs(cls, user_id: int, limit: int = 50):
@@ -46,126 +209,222 @@ class LogService:
                 .all())
 
     @classmethod
-    def get_recent_logs(cls, page: int = 1, per_page: int = 50):
+    def get_recent_logs(cls, cursor: str = None, per_page: int = 50, user_id: int = None,
+                        action_type: LogAction = None, since: datetime = None, until: datetime = None,
+                        page: int = None):
         """
-        Get recent logs from all users with pagination.
+        Get recent logs from all users, newest first, with keyset pagination.
+
+        Filters are served by the (user_id, created_at) and (action_type, created_at)
+        indexes. The total is not an exact COUNT over the whole table: without
+        a user or action filter it is summed from the daily rollup (at day
+        granularity for a time range) over the days still in the table, otherwise
+        the count stops at LOG.COUNT_CAP.
 
         Args:
-            page: int - Page number (starting from 1)
+            cursor: str - next_cursor of the previous page
             per_page: int - Number of logs per page (default 50)
+            user_id: int - only logs of this user
+            action_type: LogAction - only actions of this type
+            since: datetime - only logs at or after this time
+            until: datetime - only logs before this time
+            page: int - legacy page number (starting from 1), used when no cursor is given
         Returns:
             dict: {
                 'logs': list of (Log, username) tuples,
-                'total': int - Total number of logs,
-                'pages': int - Total number of pages,
-                'current_page': int - Current page number
+                'has_more': bool,
+                'next_cursor': str or None,
+                'total': int,
+                'total_exact': bool - False when total is capped or from day buckets
             }
         """
         from models.core_models import User
 
-        # Calculate offset
-        offset = (page - 1) * per_page
-
-        # Get total count
-        total = db.session.query(Log).count()
+        query = db.session.query(Log)
+        if user_id is not None:
+            query = query.filter(Log.user_id == user_id)
+        if action_type is not None:
+            query = query.filter(Log.action_type == int(action_type))
+        if since is not None:
+            query = query.filter(Log.created_at >= since)
+        if until is not None:
+            query = query.filter(Log.created_at < until)
+        total, total_exact = cls._estimate_total(query, user_id is not None or action_type is not None, since, until)
 
-        # Calculate total pages
-        pages = (total + per_page - 1) // per_page
+        offset = 0
+        if cursor:
+            created_at, log_id = CursorUtils.decode(cursor)
+            query = query.filter(or_(Log.created_at < created_at,
+                                     and_(Log.created_at == created_at, Log.id < log_id)))
+        elif page and page > 1:
+            offset = (page - 1) * per_page
 
-        # Get paginated results
-        logs = (db.session.query(Log, User.username)
+        logs = (query.add_columns(User.username)
                 .join(User, Log.user_id == User.id)
-                .order_by(Log.created_at.desc())
+                .order_by(Log.created_at.desc(), Log.id.desc())
                 .offset(offset)
-                .limit(per_page)
+                .limit(per_page + 1)
                 .all())
+        has_more = len(logs) > per_page
+        logs = logs[:per_page]
+        next_cursor = CursorUtils.encode(logs[-1][0].created_at, logs[-1][0].id) if has_more else None
 
         return {
             'logs': logs,
+            'has_more': has_more,
+            'next_cursor': next_cursor,
             'total': total,
-            'pages': pages,
-            'current_page': page
+            'total_exact': total_exact
         }
 
     @classmethod
-    def get_access_stats(cls):
+    def _estimate_total(cls, query, filtered: bool, since: datetime = None, until: datetime = None):
         """
-        Get access statistics for today, this week, this month, and this year.
-
         Returns:
-            dict: {
-                'today': int,
-                'week': int,
-                'month': int,
-                'year': int
-            }
+            tuple: (total int, exact bool)
         """
-        return {
-            'today': cls._get_today_logs_count(),
-            'week': cls._get_week_logs_count(),
-            'month': cls._get_month_logs_count(),
-            'year': cls._get_year_logs_count()
-        }
-        
+        if filtered:
+            # count at most COUNT_CAP + 1 rows instead of every match
+            capped = query.with_entities(Log.id).limit(LOG_COUNT_CAP + 1).subquery()
+            total = db.session.query(func.count()).select_from(capped).scalar()
+            return min(total, LOG_COUNT_CAP), total <= LOG_COUNT_CAP
+        if since is None and until is None:
+            return cls._count_table_days(), True
+        first_day = since.date() if since is not None else None
+        last_day = (until - timedelta(microseconds=1)).date() if until is not None else None
+        exact = (since is None or since == datetime.combine(since.date(), datetime.min.time())) and \
+                (until is None or until == datetime.combine(until.date(), datetime.min.time()))
+        return cls._count_table_days(first_day, last_day), exact
+
     @classmethod
-    def _get_today_logs_count(cls):
+    def _count_table_days(cls, first_day: date = None, last_day: date = None):
         """
-        Get the number of logs from today.
-
-        Returns:
-            int: Number of logs created today
+        Like _count_days, but only for logs still in the logs table. The rollups
+        keep counting archived days, so the sum starts at the oldest logged day
+        (one index lookup). That day may be partly archived, so its rows are
+        counted from the table.
         """
-        today = datetime.now().date()
-        return db.session.query(Log).filter(
-            db.func.date(Log.created_at) == today
-        ).count()
+        oldest = db.session.query(func.min(Log.created_at)).scalar()
+        if oldest is None or (last_day is not None and last_day < oldest.date()):
+            return 0
+        oldest_day = oldest.date()
+        if first_day is not None and first_day > oldest_day:
+            return cls._count_days(first_day, last_day)
+        start = datetime.combine(oldest_day, datetime.min.time())
+        head = db.session.query(func.count(Log.id))\
+            .filter(Log.created_at >= start, Log.created_at < start + timedelta(days=1)).scalar()
+        if last_day is not None and last_day <= oldest_day:
+            return head
+        return head + cls._count_days(oldest_day + timedelta(days=1), last_day)
 
     @classmethod
-    def _get_week_logs_count(cls):
-        """
-        Get the number of logs from this week (Monday to Sunday).
-
-        Returns:
-            int: Number of logs created this week
-        """
-        today = datetime.now().date()
-        # Find the Monday of this week
-        monday = today - timedelta(days=today.weekday())
-        sunday = monday + timedelta(days=6)
+    def _add_to_rollups(cls, entries):
+        """Count log entries into the hourly, daily and daily per-action rollups, in the caller's transaction."""
+        hours = Counter(e['created_at'].replace(minute=0, second=0, microsecond=0) for e in entries)
+        days = Counter(e['created_at'].date() for e in entries)
+        actions = Counter((e['created_at'].date(), e['action_type']) for e in entries)
+        cls._increment_rollups(hours, days, actions)
 
-        return db.session.query(Log).filter(
-            db.func.date(Log.created_at) >= monday,
-            db.func.date(Log.created_at) <= sunday
-        ).count()
+    @classmethod
+    def _increment_rollups(cls, hours: Counter, days: Counter, actions: Counter):
+        DBUtils.increment_counters(LogHourlyCount, ['bucket'],
+                                   [{'bucket': bucket, 'count': n} for bucket, n in sorted(hours.items())])
+        DBUtils.increment_counters(LogDailyCount, ['day'],
+                                   [{'day': day, 'count': n} for day, n in sorted(days.items())])
+        DBUtils.increment_counters(LogDailyActionCount, ['day', 'action_type'],
+                                   [{'day': day, 'action_type': action_type, 'count': n}
+                                    for (day, action_type), n in sorted(actions.items())])
 
     @classmethod
-    def _get_month_logs_count(cls):
+    def rebuild_rollups(cls, since: datetime = None, batch_size: int = 10000):
         """
-        Get the number of logs from this month.
+        Recompute the rollups from the logs table and the log archive, for
+        everything or for the days starting at `since` (read through the
+        created_at index). Logs are streamed and only bucket counts are kept
+        in memory. Logs written by the writer while this runs may be counted
+        twice or missed, so run it while the app is idle.
 
+        Args:
+            since: optional datetime, rebuilt from the start of its day
+            batch_size: rows streamed per round trip
         Returns:
-            int: Number of logs created this month
+            int: number of log rows counted
         """
-        now = datetime.now()
-        year = now.year
-        month = now.month
+        from services.log_archive_service import LogArchiveService
+
+        hourly = db.session.query(LogHourlyCount)
+        daily = db.session.query(LogDailyCount)
+        daily_actions = db.session.query(LogDailyActionCount)
+        logs = db.session.query(Log.created_at, Log.action_type)
+        if since is not None:
+            since = datetime.combine(since.date(), datetime.min.time())
+            hourly = hourly.filter(LogHourlyCount.bucket >= since)
+            daily = daily.filter(LogDailyCount.day >= since.date())
+            daily_actions = daily_actions.filter(LogDailyActionCount.day >= since.date())
+            logs = logs.filter(Log.created_at >= since)
+
+        hours, days, actions = Counter(), Counter(), Counter()
+
+        def count(created_at, action_type):
+            hours[created_at.replace(minute=0, second=0, microsecond=0)] += 1
+            days[created_at.date()] += 1
+            actions[(created_at.date(), action_type)] += 1
+
+        for created_at, action_type in logs.yield_per(batch_size):
+            count(created_at, action_type)
+        for row in LogArchiveService.iter_logs(since=since):
+            count(datetime.fromisoformat(row['created_at']), int(LogAction[row['action_type'].upper()]))
 
-        return db.session.query(Log).filter(
-            db.extract('year', Log.created_at) == year,
-            db.extract('month', Log.created_at) == month
-        ).count()
+        hourly.delete(synchronize_session=False)
+        daily.delete(synchronize_session=False)
+        daily_actions.delete(synchronize_session=False)
+        cls._increment_rollups(hours, days, actions)
+        db.session.commit()
+        return sum(days.values())
 
     @classmethod
-    def _get_year_logs_count(cls):
+    def _count_days(cls, first_day: date = None, last_day: date = None):
+        """Sum the daily rollup between two dates (inclusive, open-ended when None)."""
+        query = db.session.query(func.coalesce(func.sum(LogDailyCount.count), 0))
+        if first_day is not None:
+            query = query.filter(LogDailyCount.day >= first_day)
+        if last_day is not None:
+            query = query.filter(LogDailyCount.day <= last_day)
+        return int(query.scalar())
+
+    @classmethod
+    def get_access_stats(cls):
         """
-        Get the number of logs from this year.
+        Get access statistics. The current day and the last 24 hours are read
+        from the hourly rollup (at most 24 rows); this week, month and year are
+        summed from the daily rollup (at most 366 rows). All reads are by
+        primary key range.
 
         Returns:
-            int: Number of logs created this year
+            dict: {
+                'today': int,
+                'this_hour': int,
+                'week': int,
+                'month': int,
+                'year': int,
+                'hourly': [{'hour': ISO datetime of the bucket start, 'count': int}] - last 24 hours, oldest first
+            }
         """
-        year = datetime.now().year
-
-        return db.session.query(Log).filter(
-            db.extract('year', Log.created_at) == year
-        ).count()
-
+        now = datetime.now()
+        today = now.date()
+        current_hour = now.replace(minute=0, second=0, microsecond=0)
+        first_hour = current_hour - timedelta(hours=23)
+        hours = dict(db.session.query(LogHourlyCount.bucket, LogHourlyCount.count)
+                     .filter(LogHourlyCount.bucket >= min(first_hour, datetime.combine(today, datetime.min.time())))
+                     .all())
+        # Monday of this week
+        monday = today - timedelta(days=today.weekday())
+        return {
+            'today': sum(count for bucket, count in hours.items() if bucket.date() == today),
+            'this_hour': hours.get(current_hour, 0),
+            'week': cls._count_days(monday, monday + timedelta(days=6)),
+            'month': cls._count_days(today.replace(day=1)),
+            'year': cls._count_days(today.replace(month=1, day=1)),
+            'hourly': [{'hour': (first_hour + timedelta(hours=i)).isoformat(),
+                        'count': hours.get(first_hour + timedelta(hours=i), 0)} for i in range(24)]
+        }
@@ -1,8 +1,10 @@
 from flask import current_app as app
+from sqlalchemy import and_, case, func, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.sql.functions import user
 from db import db
 from models.core_models import Post, Comment, Tag, User
-from models.relations_models import PostTag, PostComment
+from models.relations_models import PostTag, PostComment, UserTag
 from models.relations_models import FilmGenre, FilmDirector
 from models.relations_models import PostLike
 from models.core_models import Film, Genre, Director
@@ -11,10 +13,21 @@ from common.message import Message
 from common.validation import PostValidation, CommentValidation
 from datetime import datetime
 from services.log_service import LogService
+from common.log_actions import LogAction
+from services.like_counter_service import LikeCounterService
+from services.tag_feed_service import TagFeedService
+from services.trending_service import TrendingService
+from services.comment_projection_service import CommentProjectionService
+from services.tag_service import TagService
+from services.stat_counter_service import StatCounterService
+from common.uilts import LRUCache, CursorUtils
 
 
 class PostService:
 
+    # film id -> id of the tag named after its title (positive lookups only)
+    _film_tag_cache = LRUCache(10000)
+
     @classmethod
     def create_post(cls, user_id: int, dto: dict):
         """
@@ -35,20 +48,14 @@ class PostService:
         db.session.add(post)
         db.session.flush()  # ensure post.id available without committing
 
-        # attach tags, create missing tags; minimize commits by using flush
-        for t in tags:
-            if not t:
-                continue
-            tag = db.session.query(Tag).filter_by(name=t).first()
-            if not tag:
-                tag = Tag(name=t)
-                db.session.add(tag)
-                db.session.flush()
-            rel = PostTag(post_id=post.id, tag_id=tag.id)
-            db.session.add(rel)
+        # attach tags, creating missing ones, with bulk queries
+        tag_ids = TagService.set_post_tags(post.id, tags)
+        StatCounterService.add(posts=1)
 
         db.session.commit()
-        LogService.log_action(user_id, f"Created post {post.id}")
+        TagFeedService.add_post(post.id, post.created_at, tag_ids)
+        TrendingService.record_post(post.id, tag_ids)
+        LogService.log_action(user_id, LogAction.POST_CREATE, post.id)
         return cls._build_post_dict(post.id)
 
     @classmethod
@@ -71,19 +78,16 @@ class PostService:
         if int(post.user_id) != int(user_id):
             raise ValidationException(Message.FORBIDDEN)
 
-        # delete post_tags
-        db.session.query(PostTag).filter_by(post_id=post_id).delete(synchronize_session=False)
-
-        # delete comments associated with this post in batch
-        comment_ids = [r[0] for r in db.session.query(PostComment.comment_id).filter_by(post_id=post_id).all()]
-        if comment_ids:
-            db.session.query(Comment).filter(Comment.id.in_(comment_ids)).delete(synchronize_session=False)
-        # delete post_comment relations
-        db.session.query(PostComment).filter_by(post_id=post_id).delete(synchronize_session=False)
+        tag_ids = cls._get_tag_ids(post_id)
+        # delete tags, comments and likes of this post in batch
+        cls._delete_post_children([post_id])
 
         db.session.delete(post)
+        StatCounterService.add(posts=-1)
         db.session.commit()
-        LogService.log_action(user_id, f"Deleted post {post_id}")
+        TagFeedService.remove_post(post_id, tag_ids)
+        TrendingService.remove_posts([post_id])
+        LogService.log_action(user_id, LogAction.POST_DELETE, post_id)
         return True
 
     @classmethod
@@ -114,23 +118,17 @@ class PostService:
         if 'content' in dto and dto.get('content') is not None:
             post.content = dto.get('content')
 
-        # replace tags if provided (list); use flush to avoid per-tag commits
+        # replace tags if provided (list)
+        old_tag_ids = new_tag_ids = None
         if 'tags' in dto and isinstance(dto.get('tags'), list):
-            db.session.query(PostTag).filter_by(post_id=post_id).delete()
-            for t in dto.get('tags'):
-                if not t:
-                    continue
-                tag = db.session.query(Tag).filter_by(name=t).first()
-                if not tag:
-                    tag = Tag(name=t)
-                    db.session.add(tag)
-                    db.session.flush()
-                rel = PostTag(post_id=post_id, tag_id=tag.id)
-                db.session.add(rel)
+            old_tag_ids = cls._get_tag_ids(post_id)
+            new_tag_ids = TagService.set_post_tags(post_id, dto.get('tags'), replace=True)
 
         db.session.add(post)
         db.session.commit()
-        LogService.log_action(user_id, f"Updated post {post_id}")
+        if new_tag_ids is not None:
+            cls._sync_tag_feeds(post, old_tag_ids, new_tag_ids)
+        LogService.log_action(user_id, LogAction.POST_UPDATE, post_id)
         return cls._build_post_dict(post_id)
 
     @classmethod
@@ -143,72 +141,139 @@ class PostService:
         Returns:
             dict: enriched post or {}
         """
-        post = db.session.query(Post).get(post_id)
-        if not post:
-            return {}
         return cls._build_post_dict(post_id)
 
     @classmethod
-    def get_film_posts(cls, user_id: int, film_id: int):
+    def get_film_posts(cls, user_id: int, film_id: int, page: int = 1, per_page: int = 10, cursor: str = None):
         """
-        Get posts related to a film by title or tag/genre match.
+        Get posts tagged with a film's title, newest first, with keyset pagination.
 
+        Args:
+            user_id: int - ID of the user making the request
+            film_id: int
+            page: int - Page number (1-based), only used without a cursor
+            per_page: int - Number of posts per page
+            cursor: str - next_cursor of the previous page
         Returns:
-            list of enriched posts
+            tuple: (list of enriched posts, has_more boolean, next_cursor)
         """
         if not film_id:
             raise ValidationException(Message.FILM_ID_REQUIRED)
-        film = db.session.query(Film).get(film_id)
-        if not film:
-            return []
+        tag_id = cls._resolve_film_tag_id(film_id)
+        if tag_id is None:
+            return [], False, None
 
-        title = (film.title or "").strip()
+        post_ids, has_more, next_cursor = TagFeedService.get_page(
+            tag_id, cursor=cursor, limit=per_page, offset=0 if cursor else (max(page, 1) - 1) * per_page)
+        return cls.build_post_dicts(post_ids, user_id), has_more, next_cursor
 
-        # posts where tags match film title
-        posts_query = db.session.query(Post).join(PostTag, Post.id == PostTag.post_id).join(Tag, Tag.id == PostTag.tag_id).filter(
-            Tag.name == title
-        ).distinct()
+    @classmethod
+    def _resolve_film_tag_id(cls, film_id: int):
+        """
+        Map a film to the tag named after its title. Only hits are cached:
+        the tag may not exist until someone first posts about the film.
+
+        Args:
+            film_id: int
+        Returns:
+            int tag id or None
+        """
+        tag_id = cls._film_tag_cache.get(int(film_id))
+        if tag_id is not None:
+            return tag_id
+        row = db.session.query(Tag.id)\
+            .join(Film, Tag.name == func.trim(Film.title))\
+            .filter(Film.id == film_id)\
+            .first()
+        if row is None:
+            return None
+        cls._film_tag_cache.set(int(film_id), row[0])
+        return row[0]
 
-        return [cls._build_post_dict(p.id, user_id) for p in posts_query.all()]
+    @classmethod
+    def forget_film(cls, film_id: int):
+        """Drop a deleted film's cached tag mapping."""
+        cls._film_tag_cache.pop(int(film_id))
 
     @classmethod
-    def get_tag_posts(cls, user_id: int, tag_id: int, page: int = 0, page_size: int = 10):
+    def get_tag_posts(cls, user_id: int, tag_id: int, page: int = 0, page_size: int = 10, cursor: str = None):
         """
-        Get posts that contain a specific tag with pagination.
+        Get posts that contain a specific tag, newest first, with keyset pagination.
 
         Args:
             user_id: int - ID of the user making the request
             tag_id: int - ID of the tag to filter posts by
-            page: int - Page number (0-based)
+            page: int - Page number (0-based), only used without a cursor
             page_size: int - Number of posts per page
+            cursor: str - next_cursor of the previous page
         Returns:
-            tuple: (list of enriched posts, has_more boolean)
+            tuple: (list of enriched posts, has_more boolean, next_cursor)
         """
-        # Get total count for pagination
-        total_count = db.session.query(Post)\
-            .join(PostTag, Post.id == PostTag.post_id)\
-            .join(Tag, Tag.id == PostTag.tag_id)\
-            .filter(Tag.id == tag_id)\
-            .count()
+        post_ids, has_more, next_cursor = TagFeedService.get_page(
+            tag_id, cursor=cursor, limit=page_size, offset=0 if cursor else page * page_size)
+        return cls.build_post_dicts(post_ids, user_id), has_more, next_cursor
 
-        # Get paginated posts
-        posts_query = db.session.query(Post)\
-            .join(PostTag, Post.id == PostTag.post_id)\
-            .join(Tag, Tag.id == PostTag.tag_id)\
-            .filter(Tag.id == tag_id)\
-            .order_by(Post.created_at.desc())\
-            .offset(page * page_size)\
-            .limit(page_size + 1)\
-            .distinct()
+    @classmethod
+    def get_feed(cls, user_id: int, cursor: str = None, limit: int = 20):
+        """
+        Get the newest posts across the tags a user follows.
+
+        Args:
+            user_id: int
+            cursor: str - next_cursor of the previous page
+            limit: int - Number of posts per page
+        Returns:
+            tuple: (list of enriched posts, has_more boolean, next_cursor)
+        """
+        tag_ids = [r[0] for r in db.session.query(UserTag.tag_id).filter(UserTag.user_id == user_id).all()]
+        if not tag_ids:
+            return [], False, None
+        post_ids, has_more, next_cursor = TagFeedService.get_merged_page(tag_ids, cursor=cursor, limit=limit)
+        return cls.build_post_dicts(post_ids, user_id), has_more, next_cursor
+
+    @classmethod
+    def get_trending_posts(cls, user_id: int = None, limit: int = 20):
+        """
+        Get the posts with the highest time-decayed activity.
+
+        Args:
+            user_id: int - viewer, for liked_by_me (optional)
+            limit: int - Number of posts
+        Returns:
+            list: enriched posts with trending_score, highest first
+        """
+        ranked = TrendingService.top_posts(limit)
+        posts = cls.build_post_dicts([post_id for post_id, _ in ranked], user_id)
+        scores = dict(ranked)
+        for post in posts:
+            post['trending_score'] = round(scores[post['post_id']], 4)
+        return posts
+
+    @classmethod
+    def get_trending_tags(cls, limit: int = 20):
+        """
+        Get the tags with the highest time-decayed activity of their posts.
 
-        posts = posts_query.all()
-        has_more = len(posts) > page_size
+        Args:
+            limit: int - Number of tags
+        Returns:
+            list: [{ tag_id, name, score }], highest first
+        """
+        ranked = TrendingService.top_tags(limit)
+        names = dict(db.session.query(Tag.id, Tag.name).filter(Tag.id.in_([tag_id for tag_id, _ in ranked])).all()) if ranked else {}
+        return [{'tag_id': tag_id, 'name': names[tag_id], 'score': round(score, 4)}
+                for tag_id, score in ranked if tag_id in names]
 
-        # If we have more posts than page_size, remove the extra one
-        if has_more:
-            posts = posts[:-1]
+    @classmethod
+    def _get_tag_ids(cls, post_id: int):
+        return [r[0] for r in db.session.query(PostTag.tag_id).filter_by(post_id=post_id).all()]
 
-        return [cls._build_post_dict(p.id, user_id) for p in posts], has_more
+    @classmethod
+    def _sync_tag_feeds(cls, post, old_tag_ids, new_tag_ids):
+        """Move a post between cached tag feeds after its tags were replaced."""
+        TagFeedService.remove_post(post.id, set(old_tag_ids) - set(new_tag_ids))
+        TagFeedService.add_post(post.id, post.created_at, set(new_tag_ids) - set(old_tag_ids))
+        TrendingService.update_tags(post.id, new_tag_ids)
 
     @classmethod
     def like_post(cls, user_id: int, post_id: int):
@@ -219,19 +284,19 @@ class PostService:
         """
         if not post_id:
             raise ValidationException(Message.POST_ID_REQUIRED)
-        post = db.session.query(Post).get(post_id)
-        if not post:
+        if not db.session.query(Post.id).filter_by(id=post_id).first():
             raise ValidationException(Message.POST_NOT_FOUND)
-        # check existing like
-        existing = db.session.query(PostLike).filter_by(post_id=post_id, user_id=user_id).first()
-        if existing:
-            return cls._build_post_dict(post_id)
-        like = PostLike(post_id=post_id, user_id=user_id)
-        db.session.add(like)
-        post.like_count = (post.like_count or 0) + 1
-        db.session.add(post)
+        # the unique (post_id, user_id) constraint decides, so concurrent likes count once
+        try:
+            db.session.add(PostLike(post_id=post_id, user_id=user_id))
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            return cls._build_post_dict(post_id, user_id)
+        LikeCounterService.apply(post_id, 1)
         db.session.commit()
-        LogService.log_action(user_id, f"Like post {post_id}")
+        TrendingService.record_like(post_id, 1)
+        LogService.log_action(user_id, LogAction.POST_LIKE, post_id)
         return cls._build_post_dict(post_id, user_id)
 
     @classmethod
@@ -245,17 +310,16 @@ class PostService:
         post_id = dto.get('post_id')
         if not post_id:
             raise ValidationException(Message.POST_ID_REQUIRED)
-        post = db.session.query(Post).get(post_id)
-        if not post:
+        if not db.session.query(Post.id).filter_by(id=post_id).first():
             raise ValidationException(Message.POST_NOT_FOUND)
-        existing = db.session.query(PostLike).filter_by(post_id=post_id, user_id=user_id).first()
-        if not existing:
-            return cls._build_post_dict(post_id)
-        db.session.delete(existing)
-        post.like_count = max(0, (post.like_count or 0) - 1)
-        db.session.add(post)
+        # only the request that actually removed the row decrements
+        deleted = db.session.query(PostLike).filter_by(post_id=post_id, user_id=user_id).delete(synchronize_session=False)
+        if not deleted:
+            return cls._build_post_dict(post_id, user_id)
+        LikeCounterService.apply(post_id, -1)
         db.session.commit()
-        LogService.log_action(user_id, f"Unlike post {post_id}")
+        TrendingService.record_like(post_id, -1)
+        LogService.log_action(user_id, LogAction.POST_UNLIKE, post_id)
         return cls._build_post_dict(post_id, user_id)
 
     @classmethod
@@ -281,8 +345,13 @@ class PostService:
         db.session.flush()
         rel = PostComment(post_id=post_id, comment_id=comment.id)
         db.session.add(rel)
+        # increment in SQL so concurrent comments cannot lose an update
+        db.session.query(Post).filter(Post.id == post_id).update(
+            {Post.comment_count: func.coalesce(Post.comment_count, 0) + 1}, synchronize_session=False)
+        StatCounterService.add(comments=1)
         db.session.commit()
-        LogService.log_action(user_id, f"Create comment on post {post_id}")
+        TrendingService.record_comment(post_id)
+        LogService.log_action(user_id, LogAction.COMMENT_CREATE, post_id)
         return cls._build_comment_dict(comment.id)
 
 
@@ -304,11 +373,10 @@ class PostService:
             raise ValidationException(Message.COMMENT_NOT_FOUND)
         if int(comment.user_id) != int(user_id):
             raise ValidationException(Message.FORBIDDEN)
-        # remove post_comment relation(s)
-        db.session.query(PostComment).filter_by(comment_id=comment_id).delete(synchronize_session=False)
-        db.session.delete(comment)
+        # remove post_comment relation(s) and the comment, updating comment_count
+        cls._delete_comments([comment_id])
         db.session.commit()
-        LogService.log_action(user_id, f"Delete comment {comment_id}")
+        LogService.log_action(user_id, LogAction.COMMENT_DELETE, comment_id)
         return True
 
     @classmethod
@@ -332,35 +400,74 @@ class PostService:
         return cls._build_comment_dict(comment_id)
 
     @classmethod
-    def get_post_comments(cls, user_id: int, post_id: int):
+    def get_post_comments(cls, user_id: int, post_id: int, cursor: str = None, limit: int = 20):
         """
-        Get all comments for a specific post.
+        Get one page of a post's comments, oldest first.
 
         Args:
             user_id: int - ID of the user making the request
             post_id: int - ID of the post to get comments for
+            cursor: str - next_cursor of the previous page
+            limit: int - Number of comments per page
         Returns:
-            list: list of enriched comment data
+            tuple: (list of enriched comments, has_more boolean, next_cursor)
         """
         if not post_id:
             raise ValidationException(Message.POST_ID_REQUIRED)
+        after = CursorUtils.decode(cursor) if cursor else None
 
-        post = db.session.query(Post).get(post_id)
-        if not post:
+        comments = cls._query_post_comments(post_id, after, limit + 1)
+        # only an empty first page needs to tell "no comments" from "no post"
+        if not comments and after is None and not db.session.query(Post.id).filter_by(id=post_id).first():
             raise ValidationException(Message.POST_NOT_FOUND)
 
-        # Get all comments for this post
-        comment_relations = db.session.query(PostComment)\
-            .filter(PostComment.post_id == post_id)\
-            .all()
+        has_more = len(comments) > limit
+        comments = comments[:limit]
+        next_cursor = CursorUtils.encode(comments[-1].created_at, comments[-1].id) if has_more else None
+        return cls.build_comment_dicts(comments), has_more, next_cursor
+
+    @classmethod
+    def iter_post_comments(cls, user_id: int, post_id: int, cursor: str = None, chunk: int = 200):
+        """
+        Stream a post's comments, oldest first, from the cursor to the end.
+        The post is checked before anything is yielded; comments are then read
+        one keyset page of `chunk` rows at a time.
 
-        comments = []
-        for relation in comment_relations:
-            comment_dict = cls._build_comment_dict(relation.comment_id)
-            if comment_dict:  # Only add if comment exists
-                comments.append(comment_dict)
+        Args:
+            user_id: int - ID of the user making the request
+            post_id: int - ID of the post to get comments for
+            cursor: str - optional next_cursor to resume from
+            chunk: int - comments loaded per round trip
+        Returns:
+            generator of enriched comment dicts
+        """
+        if not post_id:
+            raise ValidationException(Message.POST_ID_REQUIRED)
+        after = CursorUtils.decode(cursor) if cursor else None
+        if not db.session.query(Post.id).filter_by(id=post_id).first():
+            raise ValidationException(Message.POST_NOT_FOUND)
+
+        def generate(after):
+            while True:
+                comments = cls._query_post_comments(post_id, after, chunk)
+                yield from cls.build_comment_dicts(comments)
+                if len(comments) < chunk:
+                    return
+                after = (comments[-1].created_at, comments[-1].id)
 
-        return comments
+        return generate(after)
+
+    @classmethod
+    def _query_post_comments(cls, post_id: int, after, limit: int):
+        """Keyset query: comments of a post strictly after the cursor, oldest first."""
+        query = db.session.query(Comment)\
+            .join(PostComment, PostComment.comment_id == Comment.id)\
+            .filter(PostComment.post_id == post_id)
+        if after:
+            created_at, comment_id = after
+            query = query.filter(or_(Comment.created_at > created_at,
+                                     and_(Comment.created_at == created_at, Comment.id > comment_id)))
+        return query.order_by(Comment.created_at, Comment.id).limit(limit).all()
 
     @classmethod
     def update_user_post(cls, user_id: int, post_id: int, update_data: dict):
@@ -399,27 +506,18 @@ class PostService:
             post.content = content
 
         # Update tags if provided
+        old_tag_ids = new_tag_ids = None
         if 'tags' in update_data:
             tags = update_data['tags'] or []
-            # Remove existing tag relationships
-            from models.relations_models import PostTag
-            db.session.query(PostTag).filter_by(post_id=post_id).delete()
-
-            # Add new tags
-            for tag_name in tags:
-                if not tag_name:
-                    continue
-                tag = db.session.query(Tag).filter_by(name=tag_name).first()
-                if not tag:
-                    tag = Tag(name=tag_name)
-                    db.session.add(tag)
-                    db.session.flush()
-                rel = PostTag(post_id=post_id, tag_id=tag.id)
-                db.session.add(rel)
+            # Replace existing tag relationships
+            old_tag_ids = cls._get_tag_ids(post_id)
+            new_tag_ids = TagService.set_post_tags(post_id, tags, replace=True)
 
         post.updated_at = datetime.now()
         db.session.commit()
-        LogService.log_action(user_id, f"Updated post {post_id}")
+        if new_tag_ids is not None:
+            cls._sync_tag_feeds(post, old_tag_ids, new_tag_ids)
+        LogService.log_action(user_id, LogAction.POST_UPDATE, post_id)
 
         # Return updated post data
         return cls._build_post_dict(post_id)
@@ -455,7 +553,7 @@ class PostService:
             comment.updated_at = datetime.now()
 
         db.session.commit()
-        LogService.log_action(user_id, f"Updated comment {comment_id}")
+        LogService.log_action(user_id, LogAction.COMMENT_UPDATE, comment_id)
 
         # Return updated comment data
         return cls._build_comment_dict(comment_id)
@@ -470,38 +568,111 @@ class PostService:
         Returns:
             dict
         """
-        post = db.session.query(Post).get(post_id)
-        if not post:
-            return {}
-        user = db.session.query(User).get(post.user_id)
-        user_info = user.to_dict() if user else {}
+        posts = cls.build_post_dicts([post_id], current_user_id)
+        return posts[0] if posts else {}
+
+    @classmethod
+    def build_post_dicts(cls, post_ids: list, viewer_id: int = None):
+        """
+        Build enriched post dicts for a page of posts with a fixed number of
+        grouped queries (posts, authors, tags, viewer likes) instead of several
+        queries per post. comment_count is read from the denormalized column.
+
+        Args:
+            post_ids: list of int, output keeps this order
+            viewer_id: optional int, fills is_like
+        Returns:
+            list of dict (missing posts are skipped)
+        """
+        post_ids = list(dict.fromkeys(post_ids))
+        if not post_ids:
+            return []
+
+        posts = {p.id: p for p in db.session.query(Post).filter(Post.id.in_(post_ids)).all()}
+        if not posts:
+            return []
+
+        author_ids = {p.user_id for p in posts.values()}
+        users = {u.id: u for u in db.session.query(User).filter(User.id.in_(author_ids)).all()}
 
         # tags
-        tag_rows = db.session.query(Tag.name).join(PostTag, Tag.id == PostTag.tag_id).filter(PostTag.post_id == post_id).all()
-        tags = [r[0] for r in tag_rows] if tag_rows else []
-
-        # comment count (for display purposes)
-        comment_count = db.session.query(PostComment).filter_by(post_id=post_id).count()
-
-        # check if current user liked this post (if provided)
-        is_liked = False
-        if current_user_id:
-            like_exists = db.session.query(PostLike).filter_by(post_id=post_id, user_id=current_user_id).first()
-            is_liked = bool(like_exists)
-
-        return {
-            "post_id": post.id,
-            "user_id": post.user_id,
-            "user_info": user_info,
-            "title": post.title,
-            "content": post.content,
-            "tags": tags,
-            "created_at": post.created_at.isoformat() if getattr(post, "created_at", None) else None,
-            "updated_at": post.updated_at.isoformat() if getattr(post, "updated_at", None) else None,
-            "like_count": post.like_count or 0,
-            "comment_count": comment_count,
-            "is_like": is_liked
-        }
+        tags = {}
+        tag_rows = db.session.query(PostTag.post_id, Tag.name)\
+            .join(Tag, Tag.id == PostTag.tag_id)\
+            .filter(PostTag.post_id.in_(posts.keys()))\
+            .order_by(PostTag.id)\
+            .all()
+        for post_id, name in tag_rows:
+            tags.setdefault(post_id, []).append(name)
+
+        # posts liked by the viewer (if provided)
+        liked = set()
+        if viewer_id:
+            liked = {r[0] for r in db.session.query(PostLike.post_id)
+                     .filter(PostLike.user_id == viewer_id, PostLike.post_id.in_(posts.keys()))
+                     .all()}
+
+        result = []
+        for post_id in post_ids:
+            post = posts.get(post_id)
+            if not post:
+                continue
+            user = users.get(post.user_id)
+            result.append({
+                "post_id": post.id,
+                "user_id": post.user_id,
+                "user_info": user.to_dict() if user else {},
+                "title": post.title,
+                "content": post.content,
+                "tags": tags.get(post.id, []),
+                "created_at": post.created_at.isoformat() if getattr(post, "created_at", None) else None,
+                "updated_at": post.updated_at.isoformat() if getattr(post, "updated_at", None) else None,
+                "like_count": max(0, (post.like_count or 0) + LikeCounterService.pending_delta(post.id)),
+                "comment_count": post.comment_count or 0,
+                "is_like": post.id in liked
+            })
+        return result
+
+    @classmethod
+    def _delete_comments(cls, comment_ids: list):
+        """
+        Delete comments and their post relations, decrementing comment_count
+        of the posts they belonged to. Does not commit.
+
+        Args:
+            comment_ids: list of int
+        """
+        if not comment_ids:
+            return
+        per_post = db.session.query(PostComment.post_id, func.count(PostComment.id))\
+            .filter(PostComment.comment_id.in_(comment_ids))\
+            .group_by(PostComment.post_id)\
+            .all()
+        for post_id, removed in per_post:
+            db.session.query(Post).filter(Post.id == post_id).update(
+                {Post.comment_count: case((Post.comment_count > removed, Post.comment_count - removed), else_=0)},
+                synchronize_session=False)
+        db.session.query(PostComment).filter(PostComment.comment_id.in_(comment_ids)).delete(synchronize_session=False)
+        removed = db.session.query(Comment).filter(Comment.id.in_(comment_ids)).delete(synchronize_session=False)
+        StatCounterService.add(comments=-removed)
+
+    @classmethod
+    def _delete_post_children(cls, post_ids: list):
+        """
+        Delete tags, comments and likes of posts about to be deleted. Does not commit.
+
+        Args:
+            post_ids: list of int
+        """
+        if not post_ids:
+            return
+        db.session.query(PostTag).filter(PostTag.post_id.in_(post_ids)).delete(synchronize_session=False)
+        comment_ids = [r[0] for r in db.session.query(PostComment.comment_id).filter(PostComment.post_id.in_(post_ids)).all()]
+        if comment_ids:
+            removed = db.session.query(Comment).filter(Comment.id.in_(comment_ids)).delete(synchronize_session=False)
+            StatCounterService.add(comments=-removed)
+        db.session.query(PostComment).filter(PostComment.post_id.in_(post_ids)).delete(synchronize_session=False)
+        db.session.query(PostLike).filter(PostLike.post_id.in_(post_ids)).delete(synchronize_session=False)
 
     @classmethod
     def _build_comment_dict(cls, comment_id: int):
@@ -513,18 +684,34 @@ class PostService:
         Returns:
             dict
         """
-        c = db.session.query(Comment).get(comment_id)
-        if not c:
-            return {}
-        cu = db.session.query(User).get(c.user_id)
-        return {
-            "comment_id": c.id,
-            "user_id": c.user_id,
-            "user_info": cu.to_dict() if cu else {},
-            "content": c.content,
-            "created_at": c.created_at.isoformat() if getattr(c, "created_at", None) else None,
-            "updated_at": c.updated_at.isoformat() if getattr(c, "updated_at", None) else None,
-        }
+        comments = cls.build_comment_dicts(db.session.query(Comment).filter(Comment.id == comment_id).all())
+        return comments[0] if comments else {}
+
+    @classmethod
+    def build_comment_dicts(cls, comments: list):
+        """
+        Build enriched comment dicts with one query for all authors.
+
+        Args:
+            comments: list of Comment, output keeps this order
+        Returns:
+            list of dict
+        """
+        if not comments:
+            return []
+        users = {u.id: u for u in db.session.query(User).filter(User.id.in_({c.user_id for c in comments})).all()}
+        result = []
+        for c in comments:
+            cu = users.get(c.user_id)
+            result.append({
+                "comment_id": c.id,
+                "user_id": c.user_id,
+                "user_info": cu.to_dict() if cu else {},
+                "content": c.content,
+                "created_at": c.created_at.isoformat() if getattr(c, "created_at", None) else None,
+                "updated_at": c.updated_at.isoformat() if getattr(c, "updated_at", None) else None,
+            })
+        return result
 
     @classmethod
     def get_user_posts(cls, user_id: int, offset: int = 0, limit: int = 20):
@@ -538,49 +725,14 @@ class PostService:
         Returns:
             list: List of post dictionaries with tags, user_id, user_info
         """
-        posts = db.session.query(Post)\
+        post_ids = db.session.query(Post.id)\
             .filter_by(user_id=user_id)\
             .order_by(Post.created_at.desc())\
             .offset(offset)\
             .limit(limit)\
             .all()
 
-        result = []
-        for post in posts:
-            # Get user info
-            user = db.session.query(User).get(post.user_id)
-
-            # Get tags
-            from models.relations_models import PostTag
-            tags = db.session.query(Tag)\
-                .join(PostTag)\
-                .filter(PostTag.post_id == post.id)\
-                .all()
-            tags_list = [tag.name for tag in tags]
-
-            # Count comments and likes
-            comment_count = db.session.query(PostComment)\
-                .filter_by(post_id=post.id)\
-                .count()
-            like_count = db.session.query(PostLike)\
-                .filter_by(post_id=post.id)\
-                .count()
-
-            post_dict = {
-                "post_id": post.id,
-                "user_id": post.user_id,
-                "user_info": user.to_dict() if user else {},
-                "title": post.title,
-                "content": post.content,
-                "tags": tags_list,
-                "created_at": post.created_at.isoformat() if getattr(post, "created_at", None) else None,
-                "updated_at": post.updated_at.isoformat() if getattr(post, "updated_at", None) else None,
-                "comment_count": comment_count,
-                "like_count": like_count,
-            }
-            result.append(post_dict)
-
-        return result
+        return cls.build_post_dicts([r[0] for r in post_ids], user_id)
 
     @classmethod
     def get_user_comments(cls, user_id: int, offset: int = 0, limit: int = 20):
@@ -594,36 +746,4 @@ class PostService:
         Returns:
             list: List of comment dictionaries with user_id, user_info
         """
-        comments = db.session.query(Comment)\
-            .filter_by(user_id=user_id)\
-            .order_by(Comment.created_at.desc())\
-            .offset(offset)\
-            .limit(limit)\
-            .all()
-
-        result = []
-        for comment in comments:
-            # Get user info
-            user = db.session.query(User).get(comment.user_id)
-
-            # Get post info through PostComment relationship
-            from models.relations_models import PostComment
-            post_comment = db.session.query(PostComment).filter_by(comment_id=comment.id).first()
-            post_title = None
-            if post_comment:
-                post = db.session.query(Post).get(post_comment.post_id)
-                post_title = post.title if post else None
-
-            comment_dict = {
-                "comment_id": comment.id,
-                "user_id": comment.user_id,
-                "user_info": user.to_dict() if user else {},
-                "content": comment.content,
-                "post_id": post_comment.post_id if post_comment else None,
-                "post_title": post_title,
-                "created_at": comment.created_at.isoformat() if getattr(comment, "created_at", None) else None,
-                "updated_at": comment.updated_at.isoformat() if getattr(comment, "updated_at", None) else None,
-            }
-            result.append(comment_dict)
-
-        return result
+        return CommentProjectionService.get_user_comments(user_id, offset, limit)
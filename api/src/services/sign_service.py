@@ -5,6 +5,8 @@ from models.core_models import User
 from common.validation import SignValidation
 from common.uilts import JWTUtils
 from services.log_service import LogService
+from services.stat_counter_service import StatCounterService
+from common.log_actions import LogAction
 
 
 class SignService:
@@ -27,9 +29,10 @@ class SignService:
         # create user
         user = User(username=username, email=email, password=password)
         db.session.add(user)
+        StatCounterService.add(users=1)
         db.session.commit()
 
-        LogService.log_action(user.id, f"Registered successfully")
+        LogService.log_action(user.id, LogAction.REGISTER)
         return user
 
     @classmethod
@@ -49,7 +52,7 @@ class SignService:
 
         token = JWTUtils.create_token(user)
 
-        LogService.log_action(user.id, f"Signed in successfully")
+        LogService.log_action(user.id, LogAction.SIGN_IN)
         return {
             'user': {
                 'id': user.id,
@@ -0,0 +1,103 @@
+import atexit
+import threading
+from sqlalchemy import func, select, update
+from flask import current_app as app
+from db import db
+from models.core_models import Comment, Film, Post, StatCounter, User
+from common.uilts import DBUtils
+from config import STATS_RECONCILE_SECONDS
+
+
+class StatCounterService:
+    """
+    Totals shown on the admin dashboard, kept in the stat_counters table.
+
+    Create and delete paths add +n/-n deltas in the same transaction as the
+    change itself, so reading the totals is a primary-key read of four rows
+    instead of four COUNT(*) scans. Rows created outside these paths (imports,
+    manual SQL) are picked up when the counters are reconciled with real
+    counts. That happens on a background thread of each worker every
+    STATS.RECONCILE_SECONDS, or with `maintenance.py reconcile-stat-counters`.
+    It never happens inside a request.
+    """
+
+    NAMES = ('users', 'posts', 'comments', 'films')
+    _MODELS = {'users': User, 'posts': Post, 'comments': Comment, 'films': Film}
+
+    _app = None
+    _thread = None
+    _stop = threading.Event()
+
+    @classmethod
+    def init_app(cls, app):
+        """
+        Start the reconcile thread when periodic reconciling is enabled.
+
+        Args:
+            app: Flask app whose context the reconcile thread uses
+        """
+        cls._app = app
+        if STATS_RECONCILE_SECONDS <= 0 or cls._thread is not None:
+            return
+        cls._stop.clear()
+        cls._thread = threading.Thread(target=cls._run, name='stat-counter-reconcile', daemon=True)
+        cls._thread.start()
+        atexit.register(cls._stop.set)
+
+    @classmethod
+    def _run(cls):
+        while not cls._stop.wait(STATS_RECONCILE_SECONDS):
+            try:
+                with cls._app.app_context():
+                    cls.reconcile()
+            except Exception as e:
+                print(f"Stat counter reconcile failed: {e}")
+
+    @classmethod
+    def add(cls, **deltas):
+        """
+        Add deltas to counters in the caller's transaction, e.g. add(posts=1, comments=-3).
+        """
+        rows = [{'name': name, 'value': int(delta)} for name, delta in sorted(deltas.items()) if delta]
+        DBUtils.increment_counters(StatCounter, ['name'], rows)
+
+    @classmethod
+    def get_totals(cls):
+        """
+        Current totals, one read of the counter rows. A missing row reads as 0
+        until the next reconcile creates it.
+
+        Returns:
+            dict: { 'users': int, 'posts': int, 'comments': int, 'films': int }
+        """
+        values = dict(db.session.query(StatCounter.name, StatCounter.value).all())
+        return {name: max(0, int(values.get(name, 0))) for name in cls.NAMES}
+
+    @classmethod
+    def reconcile(cls):
+        """
+        Overwrite the counters with real counts, in one transaction.
+
+        The counter rows are write-locked first with a no-op UPDATE. On MySQL
+        that takes their row locks; on SQLite it takes the database write lock.
+        A delta from a concurrent create or delete then waits for this commit
+        and applies on top of the new value. It is neither lost nor counted
+        twice.
+
+        Returns:
+            dict: the counted totals
+        """
+        db.session.execute(update(StatCounter).values(value=StatCounter.value))
+        stored = dict(db.session.query(StatCounter.name, StatCounter.value).all())
+        counts = db.session.execute(select(*[
+            select(func.count()).select_from(model).scalar_subquery().label(name)
+            for name, model in cls._MODELS.items()])).one()._asdict()
+        for name, value in counts.items():
+            db.session.merge(StatCounter(name=name, value=value))
+        db.session.commit()
+
+        drift = {name: value - stored[name] for name, value in counts.items()
+                 if name in stored and stored[name] != value}
+        if drift:
+            app.logger.info(f"Reconciled stat counters, drift: {drift}")
+        return counts
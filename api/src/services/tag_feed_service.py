@@ -0,0 +1,205 @@
+import bisect
+import heapq
+import threading
+from sqlalchemy import and_, or_
+from db import db
+from models.core_models import Post
+from models.relations_models import PostTag
+from common.uilts import LRUCache, CursorUtils
+from config import POST_TAG_FEED_CACHE_SIZE, POST_TAG_FEED_CACHE_DEPTH, POST_TAG_FEED_CACHE_TTL
+
+
+class TagFeedService:
+    """
+    Keyset-paginated tag feeds ordered by (created_at, id), newest first.
+
+    Pages are read from post_tags (indexed on tag_id, post_id) joined to posts
+    with no COUNT and no OFFSET. The most recent ids of the hottest tags are
+    cached per worker (LRU, bounded depth, TTL) and patched on post create,
+    update and delete, so the first pages of a popular tag cost no query.
+    """
+
+    _lock = threading.Lock()
+    # tag_id -> (keys, complete): keys are the newest (created_at, post_id) pairs in ascending
+    # order; complete means the tag has no posts older than the cached ones
+    _recent = LRUCache(POST_TAG_FEED_CACHE_SIZE, POST_TAG_FEED_CACHE_TTL)
+
+    @classmethod
+    def get_page(cls, tag_id: int, cursor: str = None, limit: int = 10, offset: int = 0):
+        """
+        Get one page of post ids for a tag.
+
+        Args:
+            tag_id: int
+            cursor: optional opaque cursor from a previous page
+            limit: page size
+            offset: rows to skip when no cursor is given (legacy page numbers)
+        Returns:
+            tuple: (post_ids list, has_more bool, next_cursor str or None)
+        """
+        after = CursorUtils.decode(cursor) if cursor else None
+        if after:
+            offset = 0
+
+        entry = cls._recent.get(tag_id)
+        if entry is None:
+            entry = cls._load(tag_id)
+        keys, complete = entry
+
+        # keys[:end] are the cached posts strictly older than the cursor
+        end = (bisect.bisect_left(keys, after) if after else len(keys)) - offset
+        if complete or end >= limit + 1:
+            rows = keys[max(0, end - limit - 1):max(0, end)][::-1]
+        else:
+            rows = cls._query(tag_id, after, limit + 1, offset)
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = CursorUtils.encode(*rows[-1]) if has_more else None
+        return [post_id for _, post_id in rows], has_more, next_cursor
+
+    @classmethod
+    def get_merged_page(cls, tag_ids, cursor: str = None, limit: int = 20):
+        """
+        Get one page of the newest posts across several tags: a lazy k-way
+        merge of the per-tag lists by (created_at, id), with posts carrying
+        more than one of the tags returned once.
+
+        Args:
+            tag_ids: iterable of int
+            cursor: optional opaque cursor from a previous page
+            limit: page size
+        Returns:
+            tuple: (post_ids list, has_more bool, next_cursor str or None)
+        """
+        after = CursorUtils.decode(cursor) if cursor else None
+        streams = [cls._iter_tag(tag_id, after, limit + 1) for tag_id in set(tag_ids)]
+
+        rows = []
+        seen = set()
+        for created_at, post_id in heapq.merge(*streams, reverse=True):
+            if post_id in seen:
+                continue
+            seen.add(post_id)
+            rows.append((created_at, post_id))
+            if len(rows) > limit:
+                break
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = CursorUtils.encode(*rows[-1]) if has_more else None
+        return [post_id for _, post_id in rows], has_more, next_cursor
+
+    @classmethod
+    def _iter_tag(cls, tag_id: int, after, chunk: int):
+        """Yield a tag's (created_at, post_id) pairs older than `after`, newest first."""
+        entry = cls._recent.get(tag_id)
+        if entry is None:
+            entry = cls._load(tag_id)
+        keys, complete = entry
+
+        end = bisect.bisect_left(keys, after) if after else len(keys)
+        for i in range(end - 1, -1, -1):
+            yield keys[i]
+        if complete:
+            return
+
+        # past the cached window: continue from the database in chunks
+        last = keys[0] if end > 0 else after
+        while True:
+            rows = cls._query(tag_id, last, chunk)
+            for created_at, post_id in rows:
+                yield created_at, post_id
+            if len(rows) < chunk:
+                return
+            last = (rows[-1][0], rows[-1][1])
+
+    @classmethod
+    def _query(cls, tag_id: int, after, limit: int, offset: int = 0):
+        """Keyset query: rows strictly after the cursor, newest first."""
+        query = db.session.query(Post.created_at, Post.id)\
+            .join(PostTag, PostTag.post_id == Post.id)\
+            .filter(PostTag.tag_id == tag_id)
+        if after:
+            created_at, post_id = after
+            query = query.filter(or_(Post.created_at < created_at,
+                                     and_(Post.created_at == created_at, Post.id < post_id)))
+        return query.distinct()\
+            .order_by(Post.created_at.desc(), Post.id.desc())\
+            .offset(offset)\
+            .limit(limit)\
+            .all()
+
+    @classmethod
+    def _load(cls, tag_id: int):
+        rows = cls._query(tag_id, None, POST_TAG_FEED_CACHE_DEPTH + 1)
+        complete = len(rows) <= POST_TAG_FEED_CACHE_DEPTH
+        entry = ([(created_at, post_id) for created_at, post_id in reversed(rows[:POST_TAG_FEED_CACHE_DEPTH])], complete)
+        cls._recent.set(tag_id, entry)
+        return entry
+
+    @classmethod
+    def add_post(cls, post_id: int, created_at, tag_ids):
+        """
+        Insert a post into the cached lists of its tags. Call after commit.
+
+        Args:
+            post_id: int
+            created_at: datetime
+            tag_ids: iterable of int
+        """
+        key = (created_at, int(post_id))
+        with cls._lock:
+            for tag_id in set(tag_ids):
+                entry = cls._recent.get(tag_id)
+                if entry is None:
+                    continue
+                keys, complete = entry
+                if any(k[1] == key[1] for k in keys):
+                    continue
+                if not complete and keys and key < keys[0]:
+                    # older than the cached window, served from the database anyway
+                    continue
+                keys = list(keys)
+                bisect.insort(keys, key)
+                if len(keys) > POST_TAG_FEED_CACHE_DEPTH:
+                    keys = keys[-POST_TAG_FEED_CACHE_DEPTH:]
+                    complete = False
+                cls._recent.set(tag_id, (keys, complete))
+
+    @classmethod
+    def remove_post(cls, post_id: int, tag_ids):
+        """
+        Remove a post from the cached lists of the given tags. Call after commit.
+
+        Args:
+            post_id: int
+            tag_ids: iterable of int
+        """
+        with cls._lock:
+            for tag_id in set(tag_ids):
+                entry = cls._recent.get(tag_id)
+                if entry is None:
+                    continue
+                keys, complete = entry
+                kept = [k for k in keys if k[1] != int(post_id)]
+                if len(kept) != len(keys):
+                    if not complete:
+                        # the next post beyond the cached depth is unknown, reload lazily
+                        cls._recent.pop(tag_id)
+                    else:
+                        cls._recent.set(tag_id, (kept, complete))
+
+    @classmethod
+    def invalidate(cls, tag_ids=None):
+        """
+        Drop cached lists for some tags, or all of them.
+
+        Args:
+            tag_ids: optional iterable of int
+        """
+        if tag_ids is None:
+            cls._recent.clear()
+            return
+        for tag_id in set(tag_ids):
+            cls._recent.pop(tag_id)
@@ -0,0 +1,106 @@
+from sqlalchemy import insert
+from db import db
+from models.core_models import Tag
+from models.relations_models import PostTag
+from common.uilts import LRUCache
+from config import POST_TAG_NAME_CACHE_SIZE
+
+
+class TagService:
+    """
+    Bulk tag get-or-create and post tagging.
+
+    Names are resolved with one IN query; missing tags are inserted in one
+    INSERT that ignores rows already present (OR IGNORE on SQLite, IGNORE on
+    MySQL), so concurrent requests creating the same tag do not fail on the
+    unique name. Ids of tags that were already committed are cached per
+    worker; tags are never renamed or deleted, so cached ids stay valid.
+
+    The database may compare names without regard to case or trailing spaces
+    (MySQL's default collation), so a row can come back under another spelling
+    than the submitted name. Rows are matched back to names through a
+    normalized key, and a name still unmatched is looked up on its own, so the
+    database collation decides.
+    """
+
+    # tag name -> tag id
+    _ids = LRUCache(POST_TAG_NAME_CACHE_SIZE)
+
+    @classmethod
+    def resolve_ids(cls, names):
+        """
+        Get the ids of tags by name, creating missing tags in the current transaction.
+
+        Args:
+            names: iterable of str, empty names are skipped
+        Returns:
+            list: distinct tag ids in the order of the first occurrence of each name
+        """
+        names = list(dict.fromkeys(name for name in names if name))
+        ids = {}
+        for name in names:
+            tag_id = cls._ids.get(name)
+            if tag_id is not None:
+                ids[name] = tag_id
+
+        missing = [name for name in names if name not in ids]
+        if missing:
+            rows = db.session.query(Tag.id, Tag.name).filter(Tag.name.in_(missing)).all()
+            for name, tag_id in cls._match(missing, rows).items():
+                ids[name] = tag_id
+                cls._ids.set(name, tag_id)
+
+        missing = [name for name in names if name not in ids]
+        if missing:
+            db.session.execute(
+                insert(Tag).prefix_with('OR IGNORE', dialect='sqlite').prefix_with('IGNORE', dialect='mysql'),
+                [{'name': name} for name in missing])
+            # locking read, so MySQL sees rows committed by a concurrent insert of the same name;
+            # these ids are not cached until committed, in case this transaction rolls back
+            rows = db.session.query(Tag.id, Tag.name)\
+                .filter(Tag.name.in_(missing)).with_for_update().all()
+            ids.update(cls._match(missing, rows))
+            for name in missing:
+                if name not in ids:
+                    ids[name] = db.session.query(Tag.id).filter_by(name=name).with_for_update().scalar()
+
+        # names the database considers equal resolve to one tag
+        return list(dict.fromkeys(ids[name] for name in names if ids[name] is not None))
+
+    @staticmethod
+    def _key(name: str):
+        return name.rstrip(' ').casefold()
+
+    @classmethod
+    def _match(cls, names, rows):
+        """
+        Map submitted names to the ids of returned (id, name) rows, exactly
+        or else by normalized key. Names without a matching row are left out.
+        """
+        exact = {name: tag_id for tag_id, name in rows}
+        by_key = {cls._key(name): tag_id for tag_id, name in rows}
+        matched = {}
+        for name in names:
+            tag_id = exact.get(name, by_key.get(cls._key(name)))
+            if tag_id is not None:
+                matched[name] = tag_id
+        return matched
+
+    @classmethod
+    def set_post_tags(cls, post_id: int, names, replace: bool = False):
+        """
+        Tag a post by name with bulk queries. Does not commit.
+
+        Args:
+            post_id: int
+            names: iterable of str
+            replace: remove the post's current tags first
+        Returns:
+            list: tag ids attached to the post
+        """
+        if replace:
+            db.session.query(PostTag).filter_by(post_id=post_id).delete(synchronize_session=False)
+        tag_ids = cls.resolve_ids(names)
+        if tag_ids:
+            db.session.execute(insert(PostTag), [{'post_id': post_id, 'tag_id': tag_id} for tag_id in tag_ids])
+        return tag_ids
@@ -0,0 +1,294 @@
+import heapq
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from db import db
+from models.core_models import Post
+from models.relations_models import PostTag
+from config import (TRENDING_HALF_LIFE_HOURS, TRENDING_TOP_K, TRENDING_WINDOW_DAYS,
+                    TRENDING_REBUILD_SECONDS, TRENDING_POST_WEIGHT, TRENDING_LIKE_WEIGHT,
+                    TRENDING_COMMENT_WEIGHT)
+
+# rescale once the growth factor exp(rate * (now - anchor)) reaches e^32 (~8e13),
+# far below float overflow and fine-grained enough to keep relative precision
+_RESCALE_EXPONENT = 32.0
+# entries whose current score decayed below this are dropped on rescale
+_PRUNE_SCORE = 0.01
+
+
+class DecayedRanking:
+    """
+    Exponentially decayed scores with a bounded top-k.
+
+    A score decays as score * 2^(-age / half_life). Instead of touching every
+    entry as time passes, each event adds weight * e^(rate * (t - anchor)) to
+    a stored value; the current score is stored * e^(-rate * (now - anchor)),
+    the same factor for every entry, so stored values rank exactly like
+    current scores. When the growth factor gets large the stored values are
+    multiplied back down and the anchor moves to now.
+
+    The top k entries are kept in a dict with their minimum as a floor: an
+    update that does not beat the floor costs O(1). Only a decrease of a
+    member makes the top-k stale, and it is then rebuilt from all scores.
+    """
+
+    def __init__(self, half_life_seconds: float, k: int):
+        self.rate = math.log(2) / half_life_seconds
+        self.k = k
+        self.anchor = time.time()
+        self.scores = {}
+        self._top = {}
+        self._floor = 0.0
+        self._stale = False
+
+    def _growth(self, t: float):
+        exponent = self.rate * (t - self.anchor)
+        if exponent > _RESCALE_EXPONENT:
+            self.rescale(t)
+            exponent = 0.0
+        return math.exp(exponent)
+
+    def add(self, key, weight: float, t: float = None):
+        """
+        Add a weighted event at time t (default now). A negative weight retracts
+        an earlier event: it never removes the entry, the score is floored at 0
+        and the entry is pruned once it decays away.
+        """
+        if weight < 0 and key not in self.scores:
+            return
+        growth = self._growth(time.time() if t is None else t)  # may rescale stored values
+        value = self.scores.get(key, 0.0) + weight * growth
+        if value <= 0:
+            if weight >= 0:
+                self.remove(key)
+                return
+            value = 0.0
+        self.scores[key] = value
+        self._offer(key, value, decreased=weight < 0)
+
+    def _offer(self, key, value: float, decreased: bool = False):
+        # the floor only has to stay <= the smallest member; it is exact after an eviction
+        if key in self._top:
+            if decreased:
+                # something outside the top-k may now rank higher
+                self._stale = True
+            self._top[key] = value
+            self._floor = min(self._floor, value)
+        elif len(self._top) < self.k:
+            self._top[key] = value
+            self._floor = min(self._floor, value)
+        elif value > self._floor:
+            self._top[key] = value
+            del self._top[min(self._top, key=self._top.get)]
+            self._floor = min(self._top.values())
+
+    def remove(self, key):
+        self.scores.pop(key, None)
+        if self._top.pop(key, None) is not None:
+            self._stale = True
+
+    def rescale(self, t: float = None):
+        """Move the anchor to t and drop entries that decayed away."""
+        t = time.time() if t is None else t
+        factor = math.exp(-self.rate * (t - self.anchor))
+        self.anchor = t
+        self.scores = {key: value * factor for key, value in self.scores.items() if value * factor >= _PRUNE_SCORE}
+        self._top = {key: value * factor for key, value in self._top.items() if key in self.scores}
+        self._floor = min(self._top.values()) if self._top else 0.0
+        self._stale = self._stale or len(self._top) < min(self.k, len(self.scores))
+
+    def top(self, limit: int, now: float = None):
+        """
+        Highest current scores.
+
+        Returns:
+            list: [(key, score)] ordered by score desc
+        """
+        if self._stale:
+            self._top = dict(heapq.nlargest(self.k, self.scores.items(), key=lambda item: item[1]))
+            self._floor = min(self._top.values()) if self._top else 0.0
+            self._stale = False
+        decay = math.exp(-self.rate * ((time.time() if now is None else now) - self.anchor))
+        ranked = sorted(self._top.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [(key, value * decay) for key, value in ranked]
+
+
+class TrendingService:
+    """
+    Trending posts and tags for this worker.
+
+    Likes, comments and new posts add weighted events to a post's decayed
+    score and to the scores of its tags, in O(1) and without a query when the
+    post's tags are already known. The ranking is seeded on first use from
+    the posts of the last TRENDING.WINDOW_DAYS days, using their stored like
+    and comment counts as of their creation time; after that each worker
+    ranks from the events it serves itself. TRENDING.REBUILD_SECONDS > 0
+    re-seeds periodically so workers converge on shared counts.
+
+    An unlike cannot know when the like it undoes happened, so it subtracts
+    the like weight as of the post's creation time, which is when seeding
+    counts likes. This is the least the like can still be worth, so an unlike
+    never takes more than its like added.
+    """
+
+    _lock = threading.RLock()
+    _posts = None
+    _tags = None
+    _post_tags = {}     # post_id -> tuple of tag ids, for posts being ranked
+    _post_created = {}  # post_id -> creation timestamp, for posts being ranked
+    _seeded_at = None
+
+    @classmethod
+    def _ensure_seeded(cls):
+        if cls._posts is not None and (TRENDING_REBUILD_SECONDS <= 0
+                                       or time.monotonic() - cls._seeded_at < TRENDING_REBUILD_SECONDS):
+            return
+        cls.rebuild()
+
+    @classmethod
+    def rebuild(cls):
+        """Seed the rankings from recent posts: one query for posts and one for their tags."""
+        half_life = TRENDING_HALF_LIFE_HOURS * 3600
+        posts = DecayedRanking(half_life, TRENDING_TOP_K)
+        tags = DecayedRanking(half_life, TRENDING_TOP_K)
+        since = datetime.now() - timedelta(days=TRENDING_WINDOW_DAYS)
+        rows = db.session.query(Post.id, Post.created_at, Post.like_count, Post.comment_count)\
+            .filter(Post.created_at >= since).all()
+
+        post_tags = {}
+        if rows:
+            for post_id, tag_id in db.session.query(PostTag.post_id, PostTag.tag_id)\
+                    .filter(PostTag.post_id.in_([r[0] for r in rows])).all():
+                post_tags.setdefault(post_id, []).append(tag_id)
+
+        for post_id, created_at, like_count, comment_count in rows:
+            weight = (TRENDING_POST_WEIGHT + TRENDING_LIKE_WEIGHT * (like_count or 0)
+                      + TRENDING_COMMENT_WEIGHT * (comment_count or 0))
+            t = created_at.timestamp()
+            posts.add(post_id, weight, t)
+            for tag_id in post_tags.get(post_id, ()):
+                tags.add(tag_id, weight, t)
+
+        with cls._lock:
+            cls._posts, cls._tags = posts, tags
+            cls._post_tags = {post_id: tuple(tag_ids) for post_id, tag_ids in post_tags.items()}
+            cls._post_created = {post_id: created_at.timestamp() for post_id, created_at, _, _ in rows}
+            cls._seeded_at = time.monotonic()
+
+    @classmethod
+    def _record(cls, post_id: int, weight: float, tag_ids=None):
+        post_id = int(post_id)
+        with cls._lock:
+            cls._ensure_seeded()
+            now = time.time()
+            if tag_ids is not None:
+                cls._post_tags[post_id] = tuple(set(tag_ids))
+                cls._post_created[post_id] = now
+            elif post_id not in cls._post_tags:
+                cls._post_tags[post_id] = tuple(r[0] for r in db.session.query(PostTag.tag_id)
+                                                .filter(PostTag.post_id == post_id).distinct().all())
+            t = now
+            if weight < 0:
+                t = cls._created_at(post_id)
+                if t is None:
+                    return
+            cls._posts.add(post_id, weight, t)
+            for tag_id in cls._post_tags[post_id]:
+                cls._tags.add(tag_id, weight, t)
+            if len(cls._post_tags) > 2 * len(cls._posts.scores) + TRENDING_TOP_K:
+                # forget tags of posts that decayed out of the ranking
+                cls._post_tags = {pid: tids for pid, tids in cls._post_tags.items() if pid in cls._posts.scores}
+                cls._post_created = {pid: ts for pid, ts in cls._post_created.items() if pid in cls._posts.scores}
+
+    @classmethod
+    def _created_at(cls, post_id: int):
+        """Creation timestamp of a post, read once and kept while the post is ranked; None if it is gone."""
+        if post_id not in cls._post_created:
+            created_at = db.session.query(Post.created_at).filter(Post.id == post_id).scalar()
+            if created_at is None:
+                return None
+            cls._post_created[post_id] = created_at.timestamp()
+        return cls._post_created[post_id]
+
+    @classmethod
+    def record_post(cls, post_id: int, tag_ids):
+        """
+        Record a new post. Call after commit.
+
+        Args:
+            post_id: int
+            tag_ids: iterable of int
+        """
+        cls._record(post_id, TRENDING_POST_WEIGHT, tag_ids)
+
+    @classmethod
+    def record_like(cls, post_id: int, delta: int = 1):
+        """
+        Record a like (+1) or unlike (-1). Call after commit.
+
+        Args:
+            post_id: int
+            delta: +1 / -1
+        """
+        cls._record(post_id, TRENDING_LIKE_WEIGHT * delta)
+
+    @classmethod
+    def record_comment(cls, post_id: int):
+        """
+        Record a new comment. Call after commit.
+
+        Args:
+            post_id: int
+        """
+        cls._record(post_id, TRENDING_COMMENT_WEIGHT)
+
+    @classmethod
+    def update_tags(cls, post_id: int, tag_ids):
+        """
+        Update the tags future events of a post count towards. Past events stay
+        with the old tags and decay away.
+
+        Args:
+            post_id: int
+            tag_ids: iterable of int
+        """
+        with cls._lock:
+            if int(post_id) in cls._post_tags:
+                cls._post_tags[int(post_id)] = tuple(set(tag_ids))
+
+    @classmethod
+    def remove_posts(cls, post_ids):
+        """
+        Drop deleted posts from the ranking. Tag scores keep their past events.
+
+        Args:
+            post_ids: iterable of int
+        """
+        with cls._lock:
+            if cls._posts is None:
+                return
+            for post_id in post_ids:
+                cls._posts.remove(int(post_id))
+                cls._post_tags.pop(int(post_id), None)
+                cls._post_created.pop(int(post_id), None)
+
+    @classmethod
+    def top_posts(cls, limit: int = 20):
+        """
+        Returns:
+            list: [(post_id, score)] ordered by score desc
+        """
+        with cls._lock:
+            cls._ensure_seeded()
+            return cls._posts.top(limit)
+
+    @classmethod
+    def top_tags(cls, limit: int = 20):
+        """
+        Returns:
+            list: [(tag_id, score)] ordered by score desc
+        """
+        with cls._lock:
+            cls._ensure_seeded()
+            return cls._tags.top(limit)
@@ -11,6 +11,9 @@ from common.validation import UserValidation, TagValidation
 from sqlalchemy import func
 from models.relations_models import PostTag
 from services.log_service import LogService
+from services.stat_counter_service import StatCounterService
+from common.log_actions import LogAction
+from services.item_cf_service import ItemCFService
 
 class UserService:
 
@@ -111,7 +114,7 @@ class UserService:
         db.session.add(user)
         db.session.commit()
 
-        LogService.log_action(user_id, f"Updated user info successfully")
+        LogService.log_action(user_id, LogAction.USER_UPDATE)
         return user
 
     @classmethod
@@ -134,7 +137,7 @@ class UserService:
         db.session.add(user)
         db.session.commit()
 
-        LogService.log_action(user_id, f"Changed password successfully")
+        LogService.log_action(user_id, LogAction.PASSWORD_CHANGE)
         return True
 
     @classmethod
@@ -159,9 +162,10 @@ class UserService:
                 os.remove(avatar_path)
 
         db.session.delete(user)
+        StatCounterService.add(users=-1)
         db.session.commit()
 
-        LogService.log_action(user_id, f"Deleted account successfully")
+        LogService.log_action(user_id, LogAction.ACCOUNT_DELETE)
         return True
 
 
@@ -212,7 +216,7 @@ class UserService:
         db.session.commit()
 
         user = cls.get_user_by_id(user_id)
-        LogService.log_action(user_id, f"Added tag {tag_id} successfully")
+        LogService.log_action(user_id, LogAction.TAG_ADD, tag_id)
         return tag
 
     @classmethod
@@ -300,7 +304,7 @@ class UserService:
         if rel:
             db.session.delete(rel)
             db.session.commit()
-            LogService.log_action(user_id, f"Removed tag {tag_id} successfully")
+            LogService.log_action(user_id, LogAction.TAG_REMOVE, tag_id)
         else:
             raise ValidationException(Message.TAG_NOT_FOUND)
 
@@ -364,9 +368,10 @@ class UserService:
         fav = FilmFavorite(user_id=user_id, film_id=film_id)
         db.session.add(fav)
         db.session.commit()
+        ItemCFService.refresh_user(user_id)
 
         user = cls.get_user_by_id(user_id)
-        LogService.log_action(user_id, f"Added favorite film {film_id}")
+        LogService.log_action(user_id, LogAction.FAVORITE_ADD, film_id)
         return True
 
     @classmethod
@@ -386,10 +391,11 @@ class UserService:
         if existing:
             db.session.delete(existing)
             db.session.commit()
+            ItemCFService.refresh_user(user_id)
         else:
             raise ValidationException(Message.FAVORITE_NOT_FOUND)
 
-        LogService.log_action(user_id, f"Removed favorite film {film_id}")
+        LogService.log_action(user_id, LogAction.FAVORITE_REMOVE, film_id)
         return True
 
     @classmethod
@@ -446,7 +452,8 @@ class UserService:
             db.session.add(fr)
             db.session.add(film)
             db.session.commit()
-            LogService.log_action(user_id, f"Updated rating for film {film_id} to {rating}")
+            ItemCFService.refresh_user(user_id)
+            LogService.log_action(user_id, LogAction.RATING_UPDATE, film_id, {'rating': rating})
             return True
         else:
             # new rating
@@ -458,7 +465,8 @@ class UserService:
             db.session.add(new_fr)
             db.session.add(film)
             db.session.commit()
-            LogService.log_action(user_id, f"Added rating {rating} for film {film_id}")
+            ItemCFService.refresh_user(user_id)
+            LogService.log_action(user_id, LogAction.RATING_ADD, film_id, {'rating': rating})
             return True
 
     @classmethod
@@ -8,6 +8,16 @@ export const getAdminStats = () => {
   return http.get('/admin/stats');
 };
 
+/**
+ * Open a server-sent events stream of live dashboard metrics.
+ * EventSource cannot set headers, so the token is sent as a query parameter.
+ * @param {string} token - JWT of the admin
+ * @returns {EventSource} Stream emitting 'snapshot' and 'delta' events
+ */
+export const openLiveStats = (token) => {
+  return new EventSource(`${http.defaults.baseURL}/admin/stats/live?jwt=${encodeURIComponent(token)}`);
+};
+
 /**
  * Get total users count
  * @returns {Promise} Response containing total users
@@ -210,12 +220,14 @@ export const getLogsStats = () => {
  * Get top active users based on log activity
  * @param {Object} params - Query parameters
  * @param {number} [params.limit=10] - Number of users to return
+ * @param {number} [params.days] - Rank over the last 7 or 30 days instead of all time
  * @returns {Promise} Response containing top active users
  */
 export const getTopActiveUsers = (params = {}) => {
   const queryParams = new URLSearchParams();
 
   if (params.limit) queryParams.append('limit', params.limit);
+  if (params.days) queryParams.append('days', params.days);
 
   const queryString = queryParams.toString();
   const url = `/admin/stats/top-active-users${queryString ? '?' + queryString : ''}`;
@@ -224,17 +236,25 @@ export const getTopActiveUsers = (params = {}) => {
 };
 
 /**
- * Get recent logs with pagination
+ * Get recent logs, newest first, with cursor pagination
  * @param {Object} params - Query parameters
- * @param {number} [params.page=1] - Page number
+ * @param {string} [params.cursor] - next_cursor from the previous page
  * @param {number} [params.per_page=50] - Number of logs per page
- * @returns {Promise} Response containing paginated logs
+ * @param {number} [params.user_id] - Only logs of this user
+ * @param {string} [params.action_type] - Only actions of this type, e.g. post_like
+ * @param {string} [params.since] - ISO datetime, only logs at or after it
+ * @param {string} [params.until] - ISO datetime, only logs before it
+ * @returns {Promise} Response containing logs, has_more, next_cursor and total
  */
 export const getRecentLogs = (params = {}) => {
   const queryParams = new URLSearchParams();
 
-  if (params.page) queryParams.append('page', params.page);
+  if (params.cursor) queryParams.append('cursor', params.cursor);
   if (params.per_page) queryParams.append('per_page', params.per_page);
+  if (params.user_id) queryParams.append('user_id', params.user_id);
+  if (params.action_type) queryParams.append('action_type', params.action_type);
+  if (params.since) queryParams.append('since', params.since);
+  if (params.until) queryParams.append('until', params.until);
 
   const queryString = queryParams.toString();
   const url = `/admin/logs/recent${queryString ? '?' + queryString : ''}`;
@@ -258,4 +278,81 @@ export const getUserLogs = (userId, params = {}) => {
   const url = `/admin/logs/users/${userId}${queryString ? '?' + queryString : ''}`;
 
   return http.get(url);
-};
\ No newline at end of file
+};
+
+/**
+ * Get logs moved to the archive by retention, newest first
+ * @param {Object} params - Query parameters
+ * @param {number} [params.user_id] - Only logs of this user
+ * @param {string} [params.since] - ISO datetime, only logs at or after it
+ * @param {string} [params.until] - ISO datetime, only logs before it
+ * @param {string} [params.cursor] - next_cursor from the previous page
+ * @param {number} [params.limit=100] - Number of logs per page
+ * @returns {Promise} Response containing logs, has_more and next_cursor
+ */
+export const getArchivedLogs = (params = {}) => {
+  const queryParams = new URLSearchParams();
+
+  if (params.user_id) queryParams.append('user_id', params.user_id);
+  if (params.since) queryParams.append('since', params.since);
+  if (params.until) queryParams.append('until', params.until);
+  if (params.cursor) queryParams.append('cursor', params.cursor);
+  if (params.limit) queryParams.append('limit', params.limit);
+
+  const queryString = queryParams.toString();
+  const url = `/admin/logs/archive${queryString ? '?' + queryString : ''}`;
+
+  return http.get(url);
+};
+
+/**
+ * Download a whole table as a file
+ * @param {string} entity - logs, users, posts or ratings
+ * @param {Object} params - Query parameters
+ * @param {string} [params.format='csv'] - csv or ndjson
+ * @param {string} [params.since] - ISO datetime, only rows created at or after it
+ * @param {string} [params.until] - ISO datetime, only rows created before it
+ * @param {number} [params.user_id] - Only rows of this user
+ * @param {boolean} [params.gzip] - Compress the file
+ * @returns {Promise} Blob with the file content
+ */
+export const exportData = (entity, params = {}) => {
+  const queryParams = new URLSearchParams();
+
+  if (params.format) queryParams.append('format', params.format);
+  if (params.since) queryParams.append('since', params.since);
+  if (params.until) queryParams.append('until', params.until);
+  if (params.user_id) queryParams.append('user_id', params.user_id);
+  if (params.gzip) queryParams.append('gzip', '1');
+
+  const queryString = queryParams.toString();
+  const url = `/admin/export/${entity}${queryString ? '?' + queryString : ''}`;
+
+  // exports can take longer than the default timeout
+  return http.get(url, { responseType: 'blob', timeout: 0 });
+};
+
+/**
+ * Get time series of activity metrics from the daily rollups
+ * @param {Object} params - Query parameters
+ * @param {string} [params.metrics] - Comma-separated metrics, e.g. dau,signups,posts
+ * @param {string} [params.since] - ISO date, first day included
+ * @param {string} [params.until] - ISO date, first day excluded
+ * @param {string} [params.granularity='day'] - day, week or month
+ * @param {number} [params.window] - Buckets in the trailing moving average
+ * @returns {Promise} Response containing buckets and series
+ */
+export const getTimeseries = (params = {}) => {
+  const queryParams = new URLSearchParams();
+
+  if (params.metrics) queryParams.append('metrics', params.metrics);
+  if (params.since) queryParams.append('since', params.since);
+  if (params.until) queryParams.append('until', params.until);
+  if (params.granularity) queryParams.append('granularity', params.granularity);
+  if (params.window) queryParams.append('window', params.window);
+
+  const queryString = queryParams.toString();
+  const url = `/admin/analytics/timeseries${queryString ? '?' + queryString : ''}`;
+
+  return http.get(url);
+};
@@ -46,6 +46,16 @@ export const getFilmById = (filmId) => {
   return http.get(`/films/${filmId}`);
 };
 
+/**
+ * Get films similar to a film ("more like this")
+ * @param {number} filmId - Film ID
+ * @param {number} [limit=10] - Max number of similar films
+ * @returns {Promise} Response with similar films
+ */
+export const getSimilarFilms = (filmId, limit = 10) => {
+  return http.get(`/films/${filmId}/similar`, { params: { limit } });
+};
+
 /**
  * Get film details by title
  * @param {string} title - Film title
@@ -56,16 +66,17 @@ export const getFilmByTitle = (title) => {
 };
 
 /**
- * Get posts related to a film
+ * Get posts related to a film, newest first
  * @param {number} filmId - Film ID
  * @param {Object} params - Pagination parameters
- * @param {number} params.page - Page number (default: 1)
+ * @param {string|null} params.cursor - next_cursor from the previous page (preferred)
+ * @param {number} params.page - Page number when no cursor is given (default: 1)
  * @param {number} params.per_page - Items per page (default: 10)
- * @returns {Promise} Response with film posts
+ * @returns {Promise} Response with posts, has_more and next_cursor
  */
 export const getFilmPosts = (filmId, params = {}) => {
-  const { page = 1, per_page = 10 } = params;
-  return http.post(`/films/${filmId}/posts`, { page, per_page });
+  const { cursor = null, page = 1, per_page = 10 } = params;
+  return http.post(`/films/${filmId}/posts`, { cursor, page, per_page });
 };
 
 /**
@@ -55,12 +55,14 @@ export const getFilmPosts = (filmId) => {
 };
 
 /**
- * Get posts by tag
+ * Get posts by tag, newest first
  * @param {number} tagId - Tag ID
- * @returns {Promise} Response containing posts array
+ * @param {string|null} [cursor] - next_cursor from the previous page
+ * @param {number} [pageSize=10] - Number of posts per page
+ * @returns {Promise} Response containing posts array, has_more and next_cursor
  */
-export const getTagPosts = (tagId) => {
-  return http.post(`/tags/${tagId}/posts`, {});
+export const getTagPosts = (tagId, cursor = null, pageSize = 10) => {
+  return http.post(`/tags/${tagId}/posts`, { cursor, page_size: pageSize });
 };
 
 /**
@@ -103,4 +105,34 @@ export const likePost = (postId) => {
  */
 export const unlikePost = (unlikeData) => {
   return http.delete('/posts/like', { data: unlikeData });
-};
\ No newline at end of file
+};
+/**
+ * Get trending posts, ranked by time-decayed likes, comments and recency
+ * @param {number} [limit=20] - Number of posts to fetch
+ * @returns {Promise} Response containing posts with trending_score
+ */
+export const getTrendingPosts = (limit = 20) => {
+  return http.get('/posts/trending', { params: { limit } });
+};
+
+/**
+ * Get trending tags, ranked by the time-decayed activity of their posts
+ * @param {number} [limit=20] - Number of tags to fetch
+ * @returns {Promise} Response containing tags with tag_id, name and score
+ */
+export const getTrendingTags = (limit = 20) => {
+  return http.get('/tags/trending', { params: { limit } });
+};
+
+/**
+ * Get a page of a post's comments, oldest first
+ * @param {number} postId - Post ID
+ * @param {string|null} [cursor] - next_cursor from the previous page
+ * @param {number} [limit=20] - Number of comments to fetch
+ * @returns {Promise} Response containing comments, has_more and next_cursor
+ */
+export const getPostComments = (postId, cursor = null, limit = 20) => {
+  const params = { limit };
+  if (cursor) params.cursor = cursor;
+  return http.get(`/posts/${postId}/comments`, { params });
+};
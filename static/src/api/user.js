@@ -254,6 +254,18 @@ export const updateUserComment = (commentId, commentData) => {
   return http.put(`/users/me/comments/${commentId}`, commentData);
 };
 
+/**
+ * Get the newest posts across the tags the authenticated user follows
+ * @param {string|null} [cursor] - next_cursor from the previous page
+ * @param {number} [limit=20] - Number of posts to fetch
+ * @returns {Promise} Response containing posts, has_more and next_cursor
+ */
+export const getUserFeed = (cursor = null, limit = 20) => {
+  const params = { limit };
+  if (cursor) params.cursor = cursor;
+  return http.get('/users/me/feed', { params });
+};
+
 /**
  * Generic edit function for user content (posts, comments, etc.)
  * @param {string} type - Type of content to edit ('post' or 'comment')